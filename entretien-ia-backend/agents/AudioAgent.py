@@ -1,110 +1,155 @@
-import librosa
 import numpy as np
 import torch
-import torchaudio
 import os
+import threading
+from utils.decoded_audio import DecodedAudio, load_signal
+from utils.pitch import yin_f0, PitchTrack
+from utils.vad import batched_speech_probabilities, probabilities_to_segments
+from utils.vocal_metrics import vocal_metrics, fluency_score, default_vocal_metrics
+from utils import model_store
+
+# 'yin' : f0 vectorisée calculée une fois par enregistrement ; 'piptrack' : comportement historique
+PITCH_ENGINES = ('yin', 'piptrack')
+PITCH_HOP_LENGTH = 256
+# 'iterator' (défaut) : get_speech_timestamps de torch.hub ; 'batched' : inférence Silero par lots de flux
+# parallèles, à activer une fois mesurés son gain et son écart avec scripts/benchmark_vad.py
+VAD_BACKENDS = ('iterator', 'batched')
 
 class AudioAgent:
-    def __init__(self, sample_rate=16000, pause_threshold=0.5):
+    def __init__(self, sample_rate=16000, pause_threshold=0.5, pitch_engine='yin', vad_backend='iterator',
+                 vad_torch_threads=0, vad_batch_streams=64):
         print("Initialisation de AudioAgent avec Silero-VAD...")
         self.sr = sample_rate
         self.pause_threshold = pause_threshold
+        if pitch_engine not in PITCH_ENGINES:
+            print(f"AVERTISSEMENT: Moteur de pitch '{pitch_engine}' inconnu. Utilisation de 'yin'.")
+            pitch_engine = 'yin'
+        self.pitch_engine = pitch_engine
+        if vad_backend not in VAD_BACKENDS:
+            print(f"AVERTISSEMENT: Backend VAD '{vad_backend}' inconnu. Utilisation de 'iterator'.")
+            vad_backend = 'iterator'
+        self.vad_backend = vad_backend
+        self.vad_batch_streams = vad_batch_streams
+        # Réglage par processus worker : évite que chaque worker Celery réserve tous les cœurs
+        if vad_torch_threads > 0:
+            torch.set_num_threads(vad_torch_threads)
+        # Silero-VAD garde un état interne entre les fenêtres : un seul appel à la fois
+        self._vad_lock = threading.Lock()
         
         try:
-            self.model, self.utils = torch.hub.load(
-                repo_or_dir='snakers4/silero-vad',
-                model='silero_vad',
-                force_reload=False
-            )
+            # Copie locale du dépôt (models/silero-vad) si elle existe : aucune résolution réseau
+            silero_path = model_store.resolve('silero_vad', None)
+            if silero_path:
+                self.model, self.utils = torch.hub.load(repo_or_dir=silero_path, model='silero_vad', source='local')
+            else:
+                self.model, self.utils = torch.hub.load(
+                    repo_or_dir='snakers4/silero-vad',
+                    model='silero_vad',
+                    force_reload=False
+                )
             print("AudioAgent initialisé avec succès.")
         except Exception as e:
             self.model = None
             print(f"ERREUR FATALE: Impossible de charger le modèle Silero-VAD. L'analyse vocale sera désactivée. Erreur: {e}")
 
-    def analyze_audio_chunk(self, audio_chunk_tensor: torch.Tensor, transcription_chunk: str) -> dict:
+    def compute_pitch_track(self, audio):
+        """
+        Calcule la courbe de f0 (YIN vectorisé) une seule fois pour tout l'enregistrement.
+        Retourne None avec le moteur 'piptrack', qui reste calculé segment par segment.
+        """
+        if self.pitch_engine != 'yin':
+            return None
+        if isinstance(audio, torch.Tensor):
+            y = audio.squeeze().numpy()
+        else:
+            y = load_signal(audio, self.sr)
+        return PitchTrack(yin_f0(y, self.sr, fmin=75, fmax=400, hop_length=PITCH_HOP_LENGTH), self.sr, PITCH_HOP_LENGTH)
+
+    def _to_tensor(self, audio) -> torch.Tensor:
+        if isinstance(audio, torch.Tensor):
+            return audio
+        if isinstance(audio, DecodedAudio) and audio.sample_rate == self.sr:
+            return audio.tensor()
+        return torch.from_numpy(load_signal(audio, self.sr)).unsqueeze(0)
+
+    def detect_speech(self, audio) -> np.ndarray:
         """
-        Analyse un segment audio (tenseur PyTorch) au lieu d'un fichier complet.
-        C'est la méthode principale pour l'analyse par réponse.
+        Passe VAD unique sur tout l'enregistrement (DecodedAudio, tenseur ou chemin).
+        Retourne les intervalles de parole (n, 2) en échantillons, utilisés ensuite par
+        vocal_metrics pour chaque question comme pour l'analyse globale.
         """
         if not self.model:
-            return self._default_results()
-        
-        try:
-            # === ÉTAPE 1 : OBTENIR LES DURÉES ===
-            total_duration_seconds = audio_chunk_tensor.shape[1] / self.sr
-            if total_duration_seconds < 1.0: return self._default_results()
+            return np.zeros((0, 2), dtype=np.int64)
+        wav = self._to_tensor(audio)
 
-            # === ÉTAPE 2 : DÉTECTION VAD SUR LE SEGMENT ===
-            (get_speech_timestamps, *_) = self.utils
-            speech_timestamps = get_speech_timestamps(audio_chunk_tensor, self.model, sampling_rate=self.sr)
-            if not speech_timestamps: return self._default_results()
-            
-            # === ÉTAPE 3 : CALCUL DES MÉTRIQUES SUR LE SEGMENT ===
-            word_count = len(transcription_chunk.strip().split())
-            speech_duration_seconds = sum([ts['end'] - ts['start'] for ts in speech_timestamps]) / self.sr
-            if speech_duration_seconds < 0.5: return self._default_results()
+        if self.vad_backend == 'batched':
+            try:
+                with self._vad_lock:
+                    probabilities = batched_speech_probabilities(self.model, wav, self.sr, max_streams=self.vad_batch_streams)
+                return probabilities_to_segments(probabilities, self.sr, total_samples=wav.shape[-1])
+            except Exception as e:
+                print(f"AVERTISSEMENT: VAD par lots impossible ({e}). Utilisation de get_speech_timestamps.")
 
-            speech_rate = word_count / (speech_duration_seconds / 60)
-            
-            pauses = [ (speech_timestamps[i+1]['start'] - speech_timestamps[i]['end']) / self.sr 
-                       for i in range(len(speech_timestamps) - 1) 
-                       if (speech_timestamps[i+1]['start'] - speech_timestamps[i]['end']) / self.sr > self.pause_threshold ]
-            
-            pause_count = len(pauses)
-            average_pause_duration = np.mean(pauses) if pauses else 0.0
-            
-            y_mono_numpy = audio_chunk_tensor.squeeze().numpy()
-            pitches, _ = librosa.piptrack(y=y_mono_numpy, sr=self.sr, fmin=75, fmax=400)
-            valid_pitches = pitches[pitches > 0]
-            pitch_mean = np.mean(valid_pitches) if len(valid_pitches) > 0 else 0.0
-            pitch_std = np.std(valid_pitches) if len(valid_pitches) > 0 else 0.0
-            
-            fluency_score = self._calculate_fluency_score(speech_duration_seconds, total_duration_seconds, pause_count, average_pause_duration)
+        (get_speech_timestamps, *_) = self.utils
+        with self._vad_lock:
+            speech_timestamps = get_speech_timestamps(wav, self.model, sampling_rate=self.sr)
+        return np.array([[ts['start'], ts['end']] for ts in speech_timestamps], dtype=np.int64).reshape(-1, 2)
+
+    def vocal_metrics(self, speech_intervals: np.ndarray, start_sample: int, end_sample: int, transcription_chunk: str,
+                      pitch_track=None, audio_chunk_tensor: torch.Tensor = None) -> dict:
+        """
+        utils.vocal_metrics.vocal_metrics avec les réglages de l'agent. Sans `pitch_track`, le pitch est
+        calculé sur `audio_chunk_tensor` selon le moteur de l'agent ('yin' ou 'piptrack').
+        """
+        audio_chunk = None
+        if pitch_track is None and audio_chunk_tensor is not None:
+            pitch_track = self.compute_pitch_track(audio_chunk_tensor)
+            if pitch_track is None:
+                audio_chunk = audio_chunk_tensor.squeeze().numpy()
+        return vocal_metrics(speech_intervals, start_sample, end_sample, transcription_chunk, self.sr,
+                             self.pause_threshold, pitch_track=pitch_track, audio_chunk=audio_chunk)
 
-            return {
-                "speech_rate": float(round(speech_rate, 2)),
-                "pause_count": int(pause_count),
-                "average_pause_duration": float(round(average_pause_duration, 2)),
-                "pitch_mean": float(round(pitch_mean, 2)),
-                "pitch_std": float(round(pitch_std, 2)),
-                "fluency_score": float(round(fluency_score, 2))
-            }
+    def analyze_audio_chunk(self, audio_chunk_tensor: torch.Tensor, transcription_chunk: str, pitch_track=None) -> dict:
+        """
+        Analyse un segment audio isolé (tenseur PyTorch) : VAD sur le segment puis vocal_metrics.
+        Le pipeline d'analyse préfère une passe VAD globale suivie de vocal_metrics par question.
+        """
+        if not self.model:
+            return self._default_results()
+        try:
+            speech_intervals = self.detect_speech(audio_chunk_tensor)
+            return self.vocal_metrics(speech_intervals, 0, audio_chunk_tensor.shape[1], transcription_chunk,
+                                      pitch_track=pitch_track, audio_chunk_tensor=audio_chunk_tensor)
         except Exception as e:
             print(f" ERREUR critique dans analyze_audio_chunk : {e}")
             return self._default_results()
 
-    def analyze_speech_vocal_characteristics(self, audio_path: str, transcription: str) -> dict:
+    def analyze_speech_vocal_characteristics(self, audio, transcription: str, pitch_track=None, speech_intervals=None) -> dict:
         """
-        Analyse un fichier audio complet pour extraire des métriques vocales globales.
-        Cette méthode est maintenant un "wrapper" qui charge le fichier et appelle analyze_audio_chunk.
+        Analyse l'enregistrement complet pour extraire des métriques vocales globales.
+        `audio` est le DecodedAudio de la session (ou un chemin de fichier pour les tests manuels).
+        Si `speech_intervals` (passe VAD globale) est fourni, aucune nouvelle inférence VAD n'est faite.
         """
         if not self.model:
             return self._default_results()
         try:
-            wav, sr = torchaudio.load(audio_path)
-            if sr != self.sr: wav = torchaudio.transforms.Resample(sr, self.sr)(wav)
-            if wav.shape[0] > 1: wav = torch.mean(wav, dim=0, keepdim=True)
-            wav = wav.float()
+            wav = self._to_tensor(audio)
+            if speech_intervals is None:
+                speech_intervals = self.detect_speech(wav)
+            audio_chunk_tensor = wav if pitch_track is None else None
             
-            return self.analyze_audio_chunk(wav, transcription)
+            return self.vocal_metrics(speech_intervals, 0, wav.shape[1], transcription,
+                                      pitch_track=pitch_track, audio_chunk_tensor=audio_chunk_tensor)
 
         except Exception as e:
             print(f" ERREUR critique dans analyze_speech_vocal_characteristics : {e}")
             return self._default_results()
 
     def _calculate_fluency_score(self, speech_duration, total_duration, pause_count, avg_pause_duration):
-        if total_duration == 0: return 0
-        speech_ratio_score = (speech_duration / total_duration) * 100
-        pause_count_penalty = min(25, pause_count * 1.5)
-        pause_duration_penalty = min(25, avg_pause_duration * 5)
-        final_score = max(0, speech_ratio_score - pause_count_penalty - pause_duration_penalty)
-        return final_score
+        return fluency_score(speech_duration, total_duration, pause_count, avg_pause_duration)
 
     def _default_results(self):
-        return {
-            "speech_rate": 0.0, "pause_count": 0, "average_pause_duration": 0.0,
-            "pitch_mean": 0.0, "pitch_std": 0.0, "fluency_score": 0.0
-        }
+        return default_vocal_metrics()
 
 if __name__ == '__main__':
     test_audio = "data/datasets/RAVDESS/Actor_01/03-01-01-01-01-01-01.wav"
@@ -2,44 +2,114 @@ import os
 import librosa
 import numpy as np
 import joblib
-from tensorflow.keras.models import load_model
+from utils.decoded_audio import DecodedAudio, load_signal
+from utils.audio_windows import window_starts
 
 BASE_DIR = os.path.dirname(__file__)
 CNN_MODEL_PATH = os.path.join(BASE_DIR, '..', 'models', 'emotion_cnn_model.h5')
+# Export ONNX du même CNN (scripts/export_emotion_onnx.py) : évite d'importer TensorFlow dans les workers
+ONNX_MODEL_PATH = os.path.join(BASE_DIR, '..', 'models', 'emotion_cnn_model.onnx')
+CNN_BACKENDS = ('auto', 'onnx', 'keras')
 LABEL_ENCODER_PATH = os.path.join(BASE_DIR, '..', 'models', 'emotion_label_encoder.joblib')
+HOP_LENGTH = 512
+# Nombre de fenêtres envoyées au CNN par appel à predict (borne la mémoire sur les longs entretiens)
+TIMELINE_BATCH_SIZE = 256
+
+class OnnxCNNModel:
+    """
+    Exécute l'export ONNX du CNN avec onnxruntime sur CPU, avec la même interface predict que Keras.
+    """
+    def __init__(self, onnx_path: str):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray, verbose=0) -> np.ndarray:
+        return self.session.run(None, {self.input_name: np.asarray(batch, dtype=np.float32)})[0]
+
+
+def load_cnn_model(backend: str = 'auto'):
+    """
+    Charge le CNN avec le backend demandé : 'onnx' (onnxruntime), 'keras' (TensorFlow, importé
+    seulement ici) ou 'auto' (ONNX si l'export et onnxruntime sont disponibles, sinon Keras).
+    """
+    if backend not in CNN_BACKENDS:
+        print(f"AVERTISSEMENT: Backend CNN '{backend}' inconnu. Utilisation du mode 'auto'.")
+        backend = 'auto'
+
+    if backend in ('auto', 'onnx'):
+        try:
+            if not os.path.exists(ONNX_MODEL_PATH):
+                raise FileNotFoundError(f"Export ONNX introuvable : {ONNX_MODEL_PATH}. Lancez 'scripts/export_emotion_onnx.py'.")
+            model = OnnxCNNModel(ONNX_MODEL_PATH)
+            print("-> CNN chargé avec onnxruntime.")
+            return model
+        except (ImportError, FileNotFoundError) as e:
+            if backend == 'onnx':
+                raise
+            print(f"AVERTISSEMENT: Backend ONNX indisponible ({e}). Utilisation de Keras.")
+
+    from tensorflow.keras.models import load_model
+    return load_model(CNN_MODEL_PATH)
+
 
 class EmotionAgent:
-    def __init__(self, sample_rate=22050):
+    def __init__(self, sample_rate=22050, inference_client=None, backend='auto'):
         self.sr = sample_rate
+        self.backend = backend
         self.cnn_model = None
         self.label_encoder = None
+        # Client optionnel du serveur d'inférence partagé (services/inference_server.py) :
+        # le CNN n'est alors chargé localement qu'en cas d'indisponibilité du serveur.
+        self.inference_client = inference_client
         print("EmotionAgent initialisé.")
 
     def _load_model(self):
-        if self.cnn_model and self.label_encoder:
+        if self.label_encoder and (self.cnn_model or self.inference_client):
             return
             
         print("Chargement du modèle de détection d'émotions CNN...")
-        if not os.path.exists(CNN_MODEL_PATH) or not os.path.exists(LABEL_ENCODER_PATH):
+        model_available = os.path.exists(CNN_MODEL_PATH) or (self.backend != 'keras' and os.path.exists(ONNX_MODEL_PATH))
+        if not model_available or not os.path.exists(LABEL_ENCODER_PATH):
             raise FileNotFoundError(f"Modèle CNN ou LabelEncoder non trouvé. Veuillez d'abord entraîner le modèle avec le script 'train_emotion_cnn.py'.")
         
         try:
-            self.cnn_model = load_model(CNN_MODEL_PATH)
+            if not self.inference_client:
+                self.cnn_model = load_cnn_model(self.backend)
             self.label_encoder = joblib.load(LABEL_ENCODER_PATH)
             print("Modèle CNN et LabelEncoder prêts.")
         except Exception as e:
             print(f"ERREUR lors du chargement du modèle CNN : {e}")
 
-    def extract_mel_spectrogram(self, audio_path: str, max_pad_len=174) -> np.ndarray:
+    def _is_ready(self) -> bool:
+        return bool(self.label_encoder) and bool(self.cnn_model or self.inference_client)
+
+    def _predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Probabilités pour un lot (n, 128, 174, 1), via le serveur d'inférence s'il est configuré.
+        """
+        if self.inference_client:
+            try:
+                return self.inference_client.predict(batch)
+            except (OSError, EOFError) as e:
+                print(f"AVERTISSEMENT: Serveur d'inférence indisponible ({e}). Chargement du CNN en local.")
+                self.inference_client = None
+                self._load_model()
+        return self.cnn_model.predict(batch, verbose=0)
+
+    def extract_mel_spectrogram(self, audio, max_pad_len=174) -> np.ndarray:
         """
         Extrait le spectrogramme Mel (notre "image" audio) et le normalise en taille.
         """
-        if not os.path.exists(audio_path):
-            print(f"ERREUR (EmotionAgent): Fichier non trouvé {audio_path}")
+        if not isinstance(audio, DecodedAudio) and not os.path.exists(audio):
+            print(f"ERREUR (EmotionAgent): Fichier non trouvé {audio}")
             return None
             
         try:
-            y, sr = librosa.load(audio_path, sr=self.sr)
+            # Le DecodedAudio de la session fournit sa vue à 22.05 kHz, calculée une seule fois
+            y, sr = load_signal(audio, self.sr), self.sr
             
             mel_spec = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=128)
             log_mel_spec = librosa.power_to_db(mel_spec, ref=np.max)
@@ -54,15 +124,15 @@ class EmotionAgent:
             return log_mel_spec
 
         except Exception as e:
-            print(f"ERREUR (EmotionAgent) lors de l'extraction du spectrogramme de {audio_path}: {e}")
+            print(f"ERREUR (EmotionAgent) lors de l'extraction du spectrogramme : {e}")
             return None
 
-    def predict_emotion(self, audio_path: str) -> dict:
+    def predict_emotion(self, audio) -> dict:
         self._load_model()
-        if not self.cnn_model or not self.label_encoder:
+        if not self._is_ready():
             return {"dominant_emotion": "erreur_modele", "scores": {}}
 
-        spectrogram = self.extract_mel_spectrogram(audio_path)
+        spectrogram = self.extract_mel_spectrogram(audio)
         if spectrogram is None:
             return {"dominant_emotion": "erreur_extraction", "scores": {}}
 
@@ -71,7 +141,7 @@ class EmotionAgent:
         spectrogram = np.expand_dims(spectrogram, axis=-1)
         
         try:
-            probabilities = self.cnn_model.predict(spectrogram)[0]
+            probabilities = self._predict_batch(spectrogram)[0]
             predicted_index = np.argmax(probabilities)
             dominant_emotion = self.label_encoder.inverse_transform([predicted_index])[0]
             scores = {label: float(prob) for label, prob in zip(self.label_encoder.classes_, probabilities)}
@@ -81,6 +151,66 @@ class EmotionAgent:
             print(f"ERREUR lors de la prédiction d'émotion : {e}")
             return {"dominant_emotion": "erreur_prediction", "scores": {}}
 
+    @staticmethod
+    def _windows_power_to_db(mel_windows: np.ndarray, amin=1e-10, top_db=80.0) -> np.ndarray:
+        """
+        Équivalent vectorisé de librosa.power_to_db(S, ref=np.max) appliqué à chaque fenêtre
+        (n_fenêtres, n_mels, n_trames) indépendamment, comme lors de l'entraînement.
+        """
+        log_spec = 10.0 * np.log10(np.maximum(amin, mel_windows))
+        log_spec -= 10.0 * np.log10(np.maximum(amin, mel_windows.max(axis=(1, 2), keepdims=True)))
+        return np.maximum(log_spec, log_spec.max(axis=(1, 2), keepdims=True) - top_db)
+
+    def predict_emotion_timeline(self, audio, window_seconds: float = None, hop_seconds: float = 1.5, max_pad_len=174) -> dict:
+        """
+        Mode fenêtré : le Mel-spectrogram est calculé une seule fois sur tout l'enregistrement,
+        découpé en fenêtres de `window_seconds` puis classé par lots. Comme dans predict_emotion,
+        chaque fenêtre est complétée par des zéros jusqu'à `max_pad_len` trames (taille d'entrée du CNN,
+        ~4 s), qui borne aussi la durée d'une fenêtre ; sans `window_seconds`, la fenêtre fait cette taille.
+        Retourne les débuts de fenêtres (s) et la matrice (n_fenêtres, n_émotions), ou None en cas d'échec.
+        """
+        self._load_model()
+        if not self._is_ready():
+            return None
+
+        window_frames = max_pad_len
+        if window_seconds is not None:
+            window_frames = max(1, int(round(window_seconds * self.sr / HOP_LENGTH)))
+            if window_frames > max_pad_len:
+                print(f"AVERTISSEMENT: Fenêtre émotionnelle de {window_seconds} s plus longue que l'entrée du CNN. "
+                      f"Fenêtre ramenée à {max_pad_len * HOP_LENGTH / self.sr:.2f} s.")
+                window_frames = max_pad_len
+
+        try:
+            y = load_signal(audio, self.sr)
+            mel_spec = librosa.feature.melspectrogram(y=y, sr=self.sr, n_mels=128)
+            hop_frames = max(1, int(round(hop_seconds * self.sr / HOP_LENGTH)))
+            starts = window_starts(mel_spec.shape[1], window_frames, hop_frames)
+
+            probabilities = []
+            if mel_spec.shape[1] < window_frames:
+                # Enregistrement plus court qu'une fenêtre : même traitement (padding) que predict_emotion
+                spectrogram = self.extract_mel_spectrogram(DecodedAudio(y, self.sr), max_pad_len=max_pad_len)
+                probabilities.append(self._predict_batch(spectrogram[np.newaxis, ..., np.newaxis]))
+            else:
+                all_windows = np.lib.stride_tricks.sliding_window_view(mel_spec, window_frames, axis=1)
+                for batch_start in range(0, len(starts), TIMELINE_BATCH_SIZE):
+                    batch_starts = starts[batch_start:batch_start + TIMELINE_BATCH_SIZE]
+                    batch = self._windows_power_to_db(all_windows[:, batch_starts].transpose(1, 0, 2))
+                    batch = np.pad(batch, ((0, 0), (0, 0), (0, max_pad_len - window_frames)), mode='constant')
+                    probabilities.append(self._predict_batch(batch[..., np.newaxis]))
+
+            return {
+                "labels": [str(label) for label in self.label_encoder.classes_],
+                "starts": starts * HOP_LENGTH / self.sr,
+                "window_seconds": window_frames * HOP_LENGTH / self.sr,
+                "hop_seconds": hop_frames * HOP_LENGTH / self.sr,
+                "probabilities": np.concatenate(probabilities, axis=0)
+            }
+        except Exception as e:
+            print(f"ERREUR lors de la prédiction fenêtrée des émotions : {e}")
+            return None
+
     @staticmethod
     def get_emotion_label_from_filename(filename: str) -> str:
         try:
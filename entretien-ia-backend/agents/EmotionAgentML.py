@@ -2,11 +2,16 @@ import os
 import librosa
 import numpy as np
 import joblib
+from utils.decoded_audio import DecodedAudio, load_signal
+from utils.audio_windows import window_starts, window_means
 
 
 BASE_DIR = os.path.dirname(__file__)
 MODEL_PATH = os.path.join(BASE_DIR, '..', 'models', 'emotion_model.joblib')
 SCALER_PATH = os.path.join(BASE_DIR, '..', 'models', 'emotion_scaler.joblib')
+# Paramètres STFT par défaut de librosa, utilisés lors de l'entraînement du modèle
+N_FFT = 2048
+HOP_LENGTH = 512
 
 class EmotionAgent:
     """
@@ -43,50 +48,63 @@ class EmotionAgent:
         except Exception as e:
             print(f"ERREUR lors du chargement du modèle ou du scaler : {e}")
 
-    def extract_features(self, audio_path: str) -> np.ndarray:
+    def extract_feature_frames(self, y: np.ndarray, sr: int) -> np.ndarray:
         """
-        Charge un fichier audio et extrait un ensemble enrichi de caractéristiques acoustiques
+        Calcule les caractéristiques trame par trame, matrice (40 + 12 + 128 + 7, n_trames),
+        à partir d'une seule STFT : le spectre de puissance est partagé par le Mel-spectrogram,
+        les MFCC et le Chroma, le spectre d'amplitude par le Contraste Spectral.
+        Les valeurs sont identiques aux appels librosa.feature.* indépendants.
+        """
+        magnitude = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH))
+        power = magnitude ** 2
+
+        # 1. Mel-spectrogram
+        mel = librosa.feature.melspectrogram(S=power, sr=sr)
+
+        # 2. MFCC (calculés sur le Mel-spectrogram en dB, comme librosa.feature.mfcc(y=...))
+        mfccs = librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=self.n_mfcc)
+
+        # 3. Chroma
+        chroma = librosa.feature.chroma_stft(S=power, sr=sr)
+
+        # 4. Contraste Spectral
+        contrast = librosa.feature.spectral_contrast(S=magnitude, sr=sr)
+
+        return np.vstack((mfccs, chroma, mel, contrast))
+
+    def extract_features(self, audio) -> np.ndarray:
+        """
+        Extrait, à partir du DecodedAudio de la session ou d'un fichier, un ensemble enrichi de caractéristiques acoustiques
         (MFCC, Chroma, Mel-spectrogram, Contraste Spectral).
         """
-        if not os.path.exists(audio_path):
-            print(f"ERREUR (EmotionAgent): Fichier non trouvé {audio_path}")
+        if not isinstance(audio, DecodedAudio) and not os.path.exists(audio):
+            print(f"ERREUR (EmotionAgent): Fichier non trouvé {audio}")
             return None
             
         try:
-            y, sr = librosa.load(audio_path, sr=self.sr)
-            
-            # 1. MFCC
-            mfccs = np.mean(librosa.feature.mfcc(y=y, sr=sr, n_mfcc=self.n_mfcc).T, axis=0)
-            
-            # 2. Chroma
-            chroma = np.mean(librosa.feature.chroma_stft(y=y, sr=sr).T, axis=0)
+            # Le DecodedAudio de la session fournit sa vue à 22.05 kHz, calculée une seule fois
+            y, sr = load_signal(audio, self.sr), self.sr
             
-            # 3. Mel-spectrogram
-            mel = np.mean(librosa.feature.melspectrogram(y=y, sr=sr).T, axis=0)
-            
-            # 4. Contraste Spectral
-            contrast = np.mean(librosa.feature.spectral_contrast(y=y, sr=sr).T, axis=0)
-            
-            # On combine toutes ces caractéristiques en un seul grand vecteur
-            combined_features = np.hstack((mfccs, chroma, mel, contrast))
+            # On combine toutes ces caractéristiques en un seul grand vecteur (moyenne sur les trames)
+            combined_features = np.mean(self.extract_feature_frames(y, sr), axis=1)
 
             return combined_features
 
         except Exception as e:
-            print(f"ERREUR (EmotionAgent) lors de l'extraction des features de {audio_path}: {e}")
+            print(f"ERREUR (EmotionAgent) lors de l'extraction des features : {e}")
             return None
 
-    def predict_emotion(self, audio_path: str) -> dict:
+    def predict_emotion(self, audio) -> dict:
         """
         Prédit l'émotion dominante et les probabilités pour chaque émotion
-        à partir d'un fichier audio.
+        à partir du DecodedAudio de la session ou d'un fichier audio.
         """
         self._load_model_and_scaler()
         if not self.model or not self.scaler:
             return {"dominant_emotion": "erreur_chargement_modele", "scores": {}}
 
         # 1. Extraire les features de l'audio d'entrée
-        features = self.extract_features(audio_path)
+        features = self.extract_features(audio)
         if features is None:
             return {"dominant_emotion": "erreur_extraction_features", "scores": {}}
 
@@ -108,6 +126,38 @@ class EmotionAgent:
             print(f"ERREUR lors de la prédiction d'émotion : {e}")
             return {"dominant_emotion": "erreur_prediction", "scores": {}}
 
+    def predict_emotion_timeline(self, audio, window_seconds: float = 3.0, hop_seconds: float = 1.5) -> dict:
+        """
+        Mode fenêtré : les caractéristiques trame par trame sont calculées une seule fois sur tout
+        l'enregistrement, moyennées par fenêtre (somme cumulée), puis classées en un seul appel
+        à predict_proba. Retourne les débuts de fenêtres (s) et la matrice (n_fenêtres, n_émotions),
+        ou None en cas d'échec.
+        """
+        self._load_model_and_scaler()
+        if not self.model or not self.scaler:
+            return None
+
+        try:
+            y = load_signal(audio, self.sr)
+            frames = self.extract_feature_frames(y, self.sr)
+
+            window_frames = max(1, int(round(window_seconds * self.sr / HOP_LENGTH)))
+            hop_frames = max(1, int(round(hop_seconds * self.sr / HOP_LENGTH)))
+            starts = window_starts(frames.shape[1], window_frames, hop_frames)
+            features = window_means(frames, starts, window_frames)
+
+            probabilities = self.model.predict_proba(self.scaler.transform(features))
+            return {
+                "labels": [str(label) for label in self.model.classes_],
+                "starts": starts * HOP_LENGTH / self.sr,
+                "window_seconds": window_frames * HOP_LENGTH / self.sr,
+                "hop_seconds": hop_frames * HOP_LENGTH / self.sr,
+                "probabilities": probabilities
+            }
+        except Exception as e:
+            print(f"ERREUR lors de la prédiction fenêtrée des émotions : {e}")
+            return None
+
     @staticmethod
     def get_emotion_label_from_filename(filename: str) -> str:
         """Utilitaire pour le dataset RAVDESS."""
@@ -1,7 +1,9 @@
 import os
+import threading
+import numpy as np
 import language_tool_python
 from faster_whisper import WhisperModel
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import SentenceTransformer
 
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
@@ -9,6 +11,18 @@ from langchain.prompts import PromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_huggingface import HuggingFacePipeline
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+from utils.vector_db import read_vector_db_version
+from utils.decoded_audio import DecodedAudio
+from utils.languagetool_client import LanguageToolClient, normalize_text
+from utils import model_store
+
+SEMANTIC_MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+# faster-whisper attend un tableau float32 mono à 16 kHz
+WHISPER_SAMPLE_RATE = 16000
+# 'sequential' : WhisperModel.transcribe (historique) ; 'batched' : BatchedInferencePipeline,
+# qui décode plusieurs tronçons de 30 s en un seul lot CTranslate2. Le moteur 'batched' découpe
+# l'audio avec son filtre VAD : sans lui, faster-whisper refuse tout audio de plus de 30 s
+TRANSCRIPTION_ENGINES = ('sequential', 'batched')
 
 def format_docs(docs):
     """
@@ -23,20 +37,51 @@ class NLPAgent:
     Gère la transcription, l'analyse grammaticale, la similarité sémantique (simple)
     et la pertinence factuelle (RAG).
     """
-    def __init__(self, model_size="small"):
+    def __init__(self, model_size="small", engine='sequential', beam_size=5, vad_filter=False,
+                 cpu_threads=0, num_workers=1, batch_size=8):
         print(f"Initialisation du NLPAgent avec le modèle Whisper '{model_size}'...")
-        # 1. Modèle de transcription
-        self.model = WhisperModel(model_size, device="cpu", compute_type="int8")
+        # 1. Modèle de transcription (cpu_threads=0 : réglage par défaut de CTranslate2)
+        self.model_size = model_size
+        self.model = WhisperModel(model_store.resolve(f"whisper_{model_size}", model_size), device="cpu", compute_type="int8",
+                                  cpu_threads=cpu_threads, num_workers=num_workers)
+        if engine not in TRANSCRIPTION_ENGINES:
+            print(f"AVERTISSEMENT: Moteur de transcription '{engine}' inconnu. Utilisation du moteur 'sequential'.")
+            engine = 'sequential'
+        self.transcription_engine = engine
+        self.batched_model = None
+        if engine == 'batched':
+            from faster_whisper import BatchedInferencePipeline
+            self.batched_model = BatchedInferencePipeline(model=self.model)
+        self.beam_size = beam_size
+        # Filtre VAD intégré de faster-whisper : les silences ne sont pas envoyés au décodeur
+        if engine == 'batched' and not vad_filter:
+            print("AVERTISSEMENT: Le moteur 'batched' nécessite le filtre VAD. Filtre VAD activé.")
+            vad_filter = True
+        self.vad_filter = vad_filter
+        self.batch_size = batch_size
 
-        # 2. Modèles pour les autres analyses (initialisés de manière paresseuse)
+        # 2. Modèles pour les autres analyses (initialisés de manière paresseuse). L'agent étant
+        # partagé entre threads (registre), chaque initialisation est protégée par un verrou
+        self._init_lock = threading.RLock()
         self.grammar_tool = None
+        self.grammar_client = None
+        # URL d'un serveur LanguageTool partagé (ex: 'http://localhost:8081') : évite de lancer
+        # une JVM par processus. Sans URL ou serveur injoignable, LanguageTool est lancé localement.
+        self.grammar_server_url = None
         self.semantic_model = None
         self.rag_chain = None
+        self.rag_chain_version = None
+        # Cache optionnel des réponses de référence RAG : objet exposant
+        # get(question, version) et put(question, version, reference)
+        self.rag_reference_cache = None
+        # Cache optionnel des erreurs grammaticales : objet exposant
+        # get_many(textes, version) et put_many(textes, version, erreurs)
+        self.grammar_cache = None
         
         # 3. Noms des modèles et chemins de configuration
         self.grammar_tool_lang = 'fr-FR'
-        self.semantic_model_name = 'paraphrase-multilingual-MiniLM-L12-v2'
-        self.embedding_model_name_rag = 'paraphrase-multilingual-MiniLM-L12-v2'
+        self.semantic_model_name = SEMANTIC_MODEL_NAME
+        self.embedding_model_name_rag = SEMANTIC_MODEL_NAME
         self.llm_model_name_rag = "google/flan-t5-base" # Utilisation du modèle 'base' plus performant
         
         base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -47,66 +92,106 @@ class NLPAgent:
     # --- MÉTHODES D'INITIALISATION PARESSEUSE ---
 
     def _initialize_grammar_tool(self):
-        if self.grammar_tool: return
-        print("Initialisation de LanguageTool (à la première demande)...")
-        try:
-            self.grammar_tool = language_tool_python.LanguageTool(self.grammar_tool_lang)
-            print("LanguageTool prêt.")
-        except Exception as e:
-            print(f"AVERTISSEMENT: Échec de l'initialisation de LanguageTool: {e}")
+        if self.grammar_tool or self.grammar_client: return
+        with self._init_lock:
+            if self.grammar_tool or self.grammar_client: return
+            if self.grammar_server_url:
+                client = LanguageToolClient(self.grammar_server_url, language=self.grammar_tool_lang)
+                if client.ping():
+                    self.grammar_client = client
+                    print(f"LanguageTool prêt (serveur {self.grammar_server_url}).")
+                    return
+                client.close()
+                print(f"AVERTISSEMENT: Serveur LanguageTool injoignable ({self.grammar_server_url}). Lancement local.")
+            print("Initialisation de LanguageTool (à la première demande)...")
+            try:
+                languagetool_path = model_store.resolve('languagetool', None)
+                if languagetool_path:
+                    os.environ.setdefault('LTP_PATH', languagetool_path)
+                self.grammar_tool = language_tool_python.LanguageTool(self.grammar_tool_lang)
+                print("LanguageTool prêt.")
+            except Exception as e:
+                print(f"AVERTISSEMENT: Échec de l'initialisation de LanguageTool: {e}")
 
     def _initialize_semantic_model(self):
         if self.semantic_model: return
-        print(f"Chargement du modèle sémantique '{self.semantic_model_name}'...")
-        try:
-            self.semantic_model = SentenceTransformer(self.semantic_model_name)
-            print("Modèle sémantique prêt.")
-        except Exception as e:
-            print(f"ERREUR: Impossible de charger le modèle sémantique: {e}")
+        with self._init_lock:
+            if self.semantic_model: return
+            print(f"Chargement du modèle sémantique '{self.semantic_model_name}'...")
+            try:
+                self.semantic_model = SentenceTransformer(model_store.resolve('semantic', self.semantic_model_name))
+                print("Modèle sémantique prêt.")
+            except Exception as e:
+                print(f"ERREUR: Impossible de charger le modèle sémantique: {e}")
 
     def _initialize_rag_chain(self):
-        """Initialise le pipeline RAG complet à la première demande."""
-        if self.rag_chain: return
+        """
+        Initialise le pipeline RAG complet à la première demande,
+        et le recharge si la base vectorielle a été reconstruite entre-temps.
+        """
+        current_version = read_vector_db_version(self.vector_db_path)
+        if self.rag_chain and self.rag_chain_version == current_version: return
+        with self._init_lock:
+            if self.rag_chain and self.rag_chain_version == current_version: return
         
-        print(f"Initialisation du pipeline RAG avec le modèle '{self.llm_model_name_rag}'...")
-        try:
-            if not os.path.exists(self.vector_db_path):
-                raise FileNotFoundError(f"Base de données vectorielle non trouvée. Veuillez lancer 'scripts/create_vector_db.py'.")
+            print(f"Initialisation du pipeline RAG avec le modèle '{self.llm_model_name_rag}'...")
+            try:
+                if not os.path.exists(self.vector_db_path):
+                    raise FileNotFoundError(f"Base de données vectorielle non trouvée. Veuillez lancer 'scripts/create_vector_db.py'.")
             
-            embeddings = HuggingFaceEmbeddings(model_name=self.embedding_model_name_rag)
-            vector_db = FAISS.load_local(self.vector_db_path, embeddings, allow_dangerous_deserialization=True)
-            retriever = vector_db.as_retriever(search_kwargs={"k": 2})
+                embeddings = HuggingFaceEmbeddings(model_name=model_store.resolve('semantic', self.embedding_model_name_rag))
+                vector_db = FAISS.load_local(self.vector_db_path, embeddings, allow_dangerous_deserialization=True)
+                retriever = vector_db.as_retriever(search_kwargs={"k": 2})
 
-            tokenizer = AutoTokenizer.from_pretrained(self.llm_model_name_rag)
-            model = AutoModelForSeq2SeqLM.from_pretrained(self.llm_model_name_rag)
-            pipe = pipeline("text2text-generation", model=model, tokenizer=tokenizer, max_length=150)
-            llm = HuggingFacePipeline(pipeline=pipe)
+                llm_path = model_store.resolve('rag_llm', self.llm_model_name_rag)
+                tokenizer = AutoTokenizer.from_pretrained(llm_path)
+                model = AutoModelForSeq2SeqLM.from_pretrained(llm_path)
+                pipe = pipeline("text2text-generation", model=model, tokenizer=tokenizer, max_length=150)
+                llm = HuggingFacePipeline(pipeline=pipe)
 
-            template = """
+                template = """
            Contexte: {context}
             Question: {question}
 
             Réponse:
             """
-            prompt = PromptTemplate.from_template(template)
+                prompt = PromptTemplate.from_template(template)
             
-            # La chaîne reste la même
-            self.rag_chain = (
-                {"context": retriever | format_docs, "question": RunnablePassthrough()}
-                | prompt
-                | llm
-            )
-            print("Pipeline RAG prêt.")
-        except Exception as e:
-            print(f"ERREUR FATALE lors de l'initialisation du RAG : {e}")
+                # La chaîne reste la même
+                self.rag_chain = (
+                    {"context": retriever | format_docs, "question": RunnablePassthrough()}
+                    | prompt
+                    | llm
+                )
+                self.rag_chain_version = current_version
+                print(f"Pipeline RAG prêt (base vectorielle version {current_version}).")
+            except Exception as e:
+                print(f"ERREUR FATALE lors de l'initialisation du RAG : {e}")
 
 
-    def transcribe_media(self, media_path: str):
-        if not os.path.exists(media_path):
-            print(f"ERREUR: Fichier média non trouvé : {media_path}")
+    def transcribe_media(self, media, word_timestamps: bool = False):
+        """
+        Transcrit un DecodedAudio (buffer 16 kHz déjà en mémoire, sans nouveau décodage par Whisper)
+        ou un chemin de fichier média. Les timestamps par mot (alignement supplémentaire coûteux)
+        ne sont calculés que si l'appelant les demande.
+        """
+        if isinstance(media, DecodedAudio):
+            audio_input = media.at_rate(WHISPER_SAMPLE_RATE)
+        elif not os.path.exists(media):
+            print(f"ERREUR: Fichier média non trouvé : {media}")
             return None, None
+        else:
+            audio_input = media
         try:
-            segments, info = self.model.transcribe(media_path, word_timestamps=True)
+            options = {"beam_size": self.beam_size, "vad_filter": self.vad_filter, "word_timestamps": word_timestamps}
+            if self.batched_model:
+                # Timestamps de segment conservés : sans eux, un segment couvre tout un tronçon VAD
+                # (jusqu'à 30 s, silences entre questions compris) et le routage par question se décale
+                options["vad_filter"] = True
+                segments, info = self.batched_model.transcribe(audio_input, batch_size=self.batch_size,
+                                                               without_timestamps=False, **options)
+            else:
+                segments, info = self.model.transcribe(audio_input, **options)
             print(f"[INFO] Langue détectée : '{info.language}' avec une probabilité de {info.language_probability:.2f}")
             return segments, info
         except Exception as e:
@@ -114,72 +199,183 @@ class NLPAgent:
             return None, None
         
     def analyze_grammar(self, text: str) -> dict:
+        return self.analyze_grammar_batch([text])[0]
+
+    @staticmethod
+    def _grammar_result(text: str, errors: list) -> dict:
+        word_count = len(text.split())
+        if word_count == 0: return {"grammar_score": 1.0, "error_count": 0, "errors": []}
+        score = max(0, 100 - (len(errors) * 5)) / 100.0
+        return {"grammar_score": round(score, 2), "error_count": len(errors), "errors": errors}
+
+    def _check_locally(self, text: str) -> list:
+        return [
+            {
+                "message": match.message,
+                "correction": match.replacements[0] if match.replacements else "N/A",
+                "context": match.context,
+                "offset": match.offset,
+                "length": match.errorLength
+            }
+            for match in self.grammar_tool.check(text)
+        ]
+
+    def grammar_tool_version(self) -> str:
+        """
+        Version de LanguageTool utilisée, intégrée à la clé du cache grammatical.
+        """
+        if self.grammar_client:
+            return self.grammar_client.version()
+        try:
+            from language_tool_python.utils import get_language_tool_directory
+            return os.path.basename(get_language_tool_directory())
+        except Exception:
+            return 'local'
+
+    def analyze_grammar_batch(self, texts: list) -> list:
+        """
+        Analyse grammaticale de toutes les réponses d'une session, sur le texte normalisé.
+        Les réponses déjà vérifiées sont servies par le cache grammatical ; les autres partent
+        en une seule requête HTTP au serveur LanguageTool, ou sont vérifiées une à une par l'instance locale.
+        """
         self._initialize_grammar_tool()
-        if not self.grammar_tool or not text.strip():
-            return {"grammar_score": 0.0, "error_count": 0, "errors": []}
+        results = [{"grammar_score": 0.0, "error_count": 0, "errors": []} for _ in texts]
+        indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        if not indices or not (self.grammar_tool or self.grammar_client):
+            return results
         try:
-            matches = self.grammar_tool.check(text)
-            word_count = len(text.split())
-            if word_count == 0: return {"grammar_score": 1.0, "error_count": 0, "errors": []}
-            score = max(0, 100 - (len(matches) * 5)) / 100.0
-            detailed_errors = [
-                {
-                    "message": match.message,
-                    "correction": match.replacements[0] if match.replacements else "N/A",
-                    "context": match.context,
-                    "offset": match.offset,
-                    "length": match.errorLength
-                }
-                for match in matches
-            ]
-            return {"grammar_score": round(score, 2), "error_count": len(matches), "errors": detailed_errors}
+            normalized = [normalize_text(texts[i]) for i in indices]
+            version = self.grammar_tool_version() if self.grammar_cache else None
+            errors_per_text = self.grammar_cache.get_many(normalized, version) if self.grammar_cache else [None] * len(normalized)
+
+            to_check = [k for k, errors in enumerate(errors_per_text) if errors is None]
+            if to_check:
+                texts_to_check = [normalized[k] for k in to_check]
+                if self.grammar_client:
+                    checked = self.grammar_client.check_many(texts_to_check)
+                else:
+                    checked = [self._check_locally(text) for text in texts_to_check]
+                for k, errors in zip(to_check, checked):
+                    errors_per_text[k] = errors
+                if self.grammar_cache:
+                    self.grammar_cache.put_many(texts_to_check, version, checked)
+                    print(f"-> Grammaire : {len(normalized) - len(to_check)}/{len(normalized)} réponse(s) servie(s) par le cache.")
+
+            for i, text, errors in zip(indices, normalized, errors_per_text):
+                results[i] = self._grammar_result(text, errors)
         except Exception as e:
             print(f"ERREUR lors de l'analyse grammaticale : {e}")
-            return {"grammar_score": 0.0, "error_count": -1, "errors": []}
+            for i in indices:
+                results[i] = {"grammar_score": 0.0, "error_count": -1, "errors": []}
+        return results
     
     def analyze_relevance(self, text1: str, text2: str) -> float:
+        return self.analyze_relevance_batch([(text1, text2)])[0]
+
+    def encode_texts(self, texts: list):
+        """
+        Encode des textes en embeddings normalisés (matrice float32), ou None si le modèle est indisponible.
+        """
+        self._initialize_semantic_model()
+        if not self.semantic_model:
+            return None
+        return self.semantic_model.encode(list(texts), convert_to_numpy=True, normalize_embeddings=True, batch_size=max(1, len(texts))).astype(np.float32)
+
+    def analyze_relevance_batch(self, pairs: list, reference_embeddings: list = None) -> list:
+        """
+        Calcule la similarité sémantique de toutes les paires (référence, réponse) d'une session :
+        un seul encodage de tous les textes, puis un produit scalaire ligne à ligne
+        sur les embeddings normalisés. Les paires incomplètes obtiennent 0.0.
+        reference_embeddings (optionnel) fournit, paire par paire, l'embedding déjà calculé
+        de la référence : seul le texte de la réponse est alors encodé.
+        """
         self._initialize_semantic_model()
-        if not self.semantic_model or not text1 or not text2:
-            return 0.0
+        scores = [0.0] * len(pairs)
+        valid_indices = [i for i, (reference, response) in enumerate(pairs) if reference and response]
+        if not self.semantic_model or not valid_indices:
+            return scores
         try:
-            embedding1 = self.semantic_model.encode(text1, convert_to_tensor=True)
-            embedding2 = self.semantic_model.encode(text2, convert_to_tensor=True)
-            cosine_score = util.pytorch_cos_sim(embedding1, embedding2)
-            relevance_score = max(0, min(1, cosine_score.item()))
-            return round(relevance_score, 2)
+            if reference_embeddings is None:
+                reference_embeddings = [None] * len(pairs)
+            to_encode = [i for i in valid_indices if reference_embeddings[i] is None]
+            texts = [pairs[i][0] for i in to_encode] + [pairs[i][1] for i in valid_indices]
+            embeddings = self.encode_texts(texts)
+
+            encoded_references = dict(zip(to_encode, embeddings[:len(to_encode)]))
+            reference_matrix = np.stack([
+                encoded_references[i] if i in encoded_references else reference_embeddings[i]
+                for i in valid_indices
+            ])
+            response_matrix = embeddings[len(to_encode):]
+            cosine_scores = np.clip(np.einsum('ij,ij->i', reference_matrix, response_matrix), 0, 1)
+            for i, cosine_score in zip(valid_indices, cosine_scores.tolist()):
+                scores[i] = round(cosine_score, 2)
+            return scores
         except Exception as e:
             print(f"ERREUR lors de l'analyse de la pertinence : {e}")
-            return 0.0
+            return [0.0] * len(pairs)
 
-    def analyze_relevance_with_rag(self, question: str, response: str) -> dict:
+    def generate_rag_references(self, questions: list) -> list:
+        """
+        Retourne la réponse de référence RAG de chaque question. La référence ne dépend que
+        de la question et de la base vectorielle : elle est lue dans rag_reference_cache
+        quand c'est possible, et seules les questions manquantes passent par la génération.
+        """
+        version = self.rag_chain_version
+        references = [None] * len(questions)
+        if self.rag_reference_cache is not None:
+            references = [self.rag_reference_cache.get(question, version) for question in questions]
+
+        missing_questions = list(dict.fromkeys(q for q, reference in zip(questions, references) if reference is None))
+        if missing_questions:
+            print(f"  -> RAG : Génération des réponses idéales pour {len(missing_questions)} question(s)...")
+            generated = dict(zip(missing_questions, [r.strip() for r in self.rag_chain.batch(missing_questions)]))
+            for question, reference in generated.items():
+                if reference and self.rag_reference_cache is not None:
+                    self.rag_reference_cache.put(question, version, reference)
+            references = [generated[q] if reference is None else reference for q, reference in zip(questions, references)]
+        else:
+            print(f"  -> RAG : {len(questions)} réponse(s) idéale(s) lue(s) depuis le cache.")
+        return references
+
+    def build_rag_pairs(self, questions: list, responses: list) -> tuple:
+        """
+        Génère les réponses de référence RAG des questions (en un seul batch) et retourne
+        les paires à scorer avec analyze_relevance_batch, ainsi que l'explication de chaque score.
+        Une paire (None, None) correspond à un score de 0.0.
+        """
         self._initialize_rag_chain()
         self._initialize_semantic_model()
-        
+
         if not self.rag_chain or not self.semantic_model:
-            return {"score_pertinence_factuelle": 0.0, "explication": "Le système RAG n'est pas disponible."}
-        
+            return [(None, None)] * len(questions), ["Le système RAG n'est pas disponible."] * len(questions)
+
         try:
-            print(f"  -> RAG : Génération de la réponse idéale pour la question...")
-            ideal_response_from_llm = self.rag_chain.invoke(question).strip()
-            
+            ideal_responses = self.generate_rag_references(questions)
+        except Exception as e:
+            print(f"ERREUR lors de l'invocation du RAG: {e}")
+            return [(None, None)] * len(questions), ["Une erreur technique est survenue lors de l'analyse RAG."] * len(questions)
+
+        pairs, explanations = [], []
+        for question, response, ideal_response_from_llm in zip(questions, responses, ideal_responses):
             if not ideal_response_from_llm:
                 print("  -> RAG AVERTISSEMENT: Le LLM n'a pas pu générer de réponse idéale. Basculement en mode sémantique simple.")
-                score = self.analyze_relevance(question, response)
-                explication = "L'IA n'a pas pu générer de réponse idéale à partir de la base de connaissances. Le score est basé sur la similarité sémantique générale."
-                return {"score_pertinence_factuelle": score, "explication": explication}
+                pairs.append((question, response))
+                explanations.append("L'IA n'a pas pu générer de réponse idéale à partir de la base de connaissances. Le score est basé sur la similarité sémantique générale.")
+                continue
 
             print(f"  -> RAG : Réponse idéale générée : '{ideal_response_from_llm}'")
-            score = self.analyze_relevance(response, ideal_response_from_llm)
-            
-            explication = (
+            pairs.append((response, ideal_response_from_llm))
+            explanations.append(
                 f"L'IA a généré la réponse de référence suivante à partir de la base de connaissances : '{ideal_response_from_llm}'. "
                 f"La réponse du candidat a été comparée sémantiquement à cette référence."
             )
-            
-            return {"score_pertinence_factuelle": score, "explication": explication}
-        except Exception as e:
-            print(f"ERREUR lors de l'invocation du RAG: {e}")
-            return {"score_pertinence_factuelle": 0.0, "explication": "Une erreur technique est survenue lors de l'analyse RAG."}
+        return pairs, explanations
+
+    def analyze_relevance_with_rag(self, question: str, response: str) -> dict:
+        pairs, explanations = self.build_rag_pairs([question], [response])
+        score = self.analyze_relevance_batch(pairs)[0]
+        return {"score_pertinence_factuelle": score, "explication": explanations[0]}
 
 if __name__ == '__main__':
     print("\n" + "="*50)
@@ -7,6 +7,36 @@ try:
 except ImportError:
     HTML = None
 
+# Poids par défaut (en pourcentages) et composantes de la note globale, partagés avec
+# services/rescoring_service.py qui recalcule les notes en lot
+DEFAULT_WEIGHTS = {'relevance': 40, 'clarity': 30, 'fluency': 15, 'engagement': 15}
+SCORE_COMPONENTS = ('relevance', 'clarity', 'fluency', 'engagement')
+
+
+def merge_weights(poids) -> dict:
+    """
+    Poids d'un profil fusionnés avec les défauts, ou les défauts seuls si le profil est invalide.
+    """
+    if not isinstance(poids, dict):
+        return dict(DEFAULT_WEIGHTS)
+    return {**DEFAULT_WEIGHTS, **poids}
+
+
+def engagement_score(calm_happy, anger_fear):
+    """
+    Engagement sur 100 à partir des probabilités (calme + heureux) et (colère + peur),
+    pour des scalaires comme pour des tableaux NumPy.
+    """
+    return np.clip((calm_happy - anger_fear + 1) / 2 * 100, 0, 100)
+
+
+def combine_scores(components: dict, weights_percent: dict):
+    """
+    Note globale : combinaison linéaire des composantes sur 100 (scalaires ou tableaux NumPy).
+    """
+    return sum(components[key] * (weights_percent[key] / 100.0) for key in SCORE_COMPONENTS)
+
+
 class RapportAgent:
     def __init__(self):
         print("RapportAgent instancié.")
@@ -19,19 +49,14 @@ class RapportAgent:
         Retourne des poids par défaut si aucun profil n'est trouvé.
         Les poids sont retournés en tant que POURCENTAGES (ex: 40, 30...).
         """
-        default_weights = {
-            'relevance': 40, 'clarity': 30, 
-            'fluency': 15, 'engagement': 15
-        }
-        
         if not session or not session.profil_ponderation or not isinstance(session.profil_ponderation.poids, dict):
             print("AVERTISSEMENT: Aucun profil de pondération valide trouvé. Utilisation des poids par défaut.")
-            return default_weights
+            return dict(DEFAULT_WEIGHTS)
         
         weights = session.profil_ponderation.poids
         print(f"Utilisation des poids du profil '{session.profil_ponderation.nom_profil}': {weights}")
         # On fusionne avec les défauts pour s'assurer que toutes les clés sont présentes
-        return {**default_weights, **weights}
+        return merge_weights(weights)
 
     def _normalize_score(self, value, min_val, max_val):
         if value is None: return 0
@@ -48,8 +73,6 @@ class RapportAgent:
         session = db.session.get(Sessions, session_id)
         weights_percent = self._load_weights_for_session(session)
 
-        weights_proportion = {key: value / 100.0 for key, value in weights_percent.items()}
-        
         # 2. Extraction et calcul des scores de base (sur 100) - (déjà correct)
         relevance_scores = [a.get('score_pertinence') for a in analysis_results.get('answers_analysis', []) if a.get('score_pertinence') is not None]
         avg_relevance = np.mean(relevance_scores) if relevance_scores else 0
@@ -64,17 +87,14 @@ class RapportAgent:
         emotion_scores = analysis_results.get('emotion_analysis', {}).get('scores', {})
         calm_happy = (emotion_scores.get('calme', 0) + emotion_scores.get('heureux', 0))
         anger_fear = (emotion_scores.get('colère', 0) + emotion_scores.get('peur', 0))
-        engagement_score_raw = calm_happy - anger_fear
-        engagement_score_100 = self._normalize_score(engagement_score_raw, -1, 1)
+        engagement_score_100 = float(engagement_score(calm_happy, anger_fear))
 
         print(f"Scores intermédiaires (sur 100) : Pertinence={relevance_score_100:.2f}, Clarté={clarity_score_100:.2f}, Fluidité={fluency_score_100:.2f}, Engagement={engagement_score_100:.2f}")
         
-        final_score = (
-            relevance_score_100 * weights_proportion.get('relevance', 0.4) +
-            clarity_score_100 * weights_proportion.get('clarity', 0.3) +
-            fluency_score_100 * weights_proportion.get('fluency', 0.15) +
-            engagement_score_100 * weights_proportion.get('engagement', 0.15)
-        )
+        final_score = combine_scores({
+            'relevance': relevance_score_100, 'clarity': clarity_score_100,
+            'fluency': fluency_score_100, 'engagement': engagement_score_100
+        }, weights_percent)
         
         return round(final_score, 2)
 
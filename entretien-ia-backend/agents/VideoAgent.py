@@ -1,17 +1,23 @@
+import subprocess
 import cv2
 import mediapipe as mp
 import numpy as np
 from tqdm import tqdm
 
+SAMPLING_MODES = ('read', 'grab', 'ffmpeg')
+
 class VideoAgent:
     """
     Agent d'analyse visuelle utilisant MediaPipe.
     Implémente une détection du regard robuste, basée sur la position
     globale du visage, optimisée pour des conditions vidéo variables.
     """
-    def __init__(self, frames_per_second_to_analyze=2):
+    def __init__(self, frames_per_second_to_analyze=2, sampling_mode='read', ffmpeg_frame_width=640):
         """
         Initialise l'agent en chargeant le modèle FaceMesh de MediaPipe.
+        sampling_mode : 'read' (décodage + conversion de chaque frame), 'grab' (seules les
+        frames retenues sont converties) ou 'ffmpeg' (filtre fps + redimensionnement,
+        ffmpeg ne livre que les frames analysées, déjà en RGB).
         """
         print("Initialisation du VideoAgent avec MediaPipe (mode robuste)...")
         self.mp_face_mesh = mp.solutions.face_mesh
@@ -23,7 +29,12 @@ class VideoAgent:
             min_tracking_confidence=0.4 # Seuil de suivi tolérant
         )
         self.fps_analyze = frames_per_second_to_analyze
-        print("VideoAgent prêt.")
+        if sampling_mode not in SAMPLING_MODES:
+            print(f"AVERTISSEMENT (VideoAgent): Mode d'échantillonnage '{sampling_mode}' inconnu. Utilisation de 'read'.")
+            sampling_mode = 'read'
+        self.sampling_mode = sampling_mode
+        self.ffmpeg_frame_width = ffmpeg_frame_width
+        print(f"VideoAgent prêt (échantillonnage '{self.sampling_mode}').")
 
     def _classify_gaze_direction_by_face_center(self, face_landmarks) -> str:
         """
@@ -52,58 +63,153 @@ class VideoAgent:
         }
         return mapping.get(direction, "Inconnu")
 
-    def analyze_gaze(self, video_path: str, events_timeline: list):
+    def _iter_opencv_frames(self, cap, use_grab: bool):
+        """
+        Parcourt la vidéo avec OpenCV et ne retourne que une frame sur `frame_interval`.
+        Avec use_grab, les frames ignorées sont seulement avancées (grab) : ni retrieve,
+        ni conversion de couleur.
         """
-        Analyse le regard en lisant la vidéo de manière séquentielle et robuste.
+        video_fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        frame_interval = max(1, int(video_fps / self.fps_analyze))
+        current_frame_idx = 0
+
+        try:
+            # Boucle de lecture avec barre de progression
+            with tqdm(total=total_frames, desc="Analyse Vidéo (Regard)", unit="frame") as pbar:
+                while cap.isOpened():
+                    is_sampled = current_frame_idx % frame_interval == 0
+                    if use_grab:
+                        success = cap.grab()
+                        image = None
+                        if success and is_sampled:
+                            success, image = cap.retrieve()
+                    else:
+                        success, image = cap.read()
+                    if not success:
+                        break
+
+                    if is_sampled:
+                        yield current_frame_idx / video_fps, cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+                    current_frame_idx += 1
+                    pbar.update(1)
+        finally:
+            cap.release()
+
+    def _iter_ffmpeg_frames(self, video_path: str, width: int, height: int):
+        """
+        Laisse ffmpeg échantillonner (filtre fps) et réduire les frames, puis lit
+        directement des images RGB brutes sur stdout.
+        """
+        out_width = min(self.ffmpeg_frame_width, width) // 2 * 2
+        out_height = max(2, int(round(height * out_width / width / 2)) * 2)
+        frame_size = out_width * out_height * 3
+        command = [
+            "ffmpeg", "-v", "error", "-i", video_path,
+            "-vf", f"fps={self.fps_analyze},scale={out_width}:{out_height}",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1"
+        ]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        frame_idx = 0
+        try:
+            with tqdm(desc="Analyse Vidéo (Regard, ffmpeg)", unit="frame") as pbar:
+                while True:
+                    buffer = process.stdout.read(frame_size)
+                    if len(buffer) < frame_size:
+                        break
+                    yield frame_idx / self.fps_analyze, np.frombuffer(buffer, dtype=np.uint8).reshape(out_height, out_width, 3)
+                    frame_idx += 1
+                    pbar.update(1)
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+
+    def _sample_frames(self, video_path: str):
+        """
+        Retourne un itérateur de (timestamp, image_rgb) selon le mode d'échantillonnage,
+        ou None si la vidéo ne peut pas être ouverte.
         """
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
             print(f"ERREUR (VideoAgent): Impossible d'ouvrir la vidéo {video_path}")
             return None
 
-        video_fps = cap.get(cv2.CAP_PROP_FPS) or 30
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        frame_interval = max(1, int(video_fps / self.fps_analyze))
-        
+        if self.sampling_mode == 'ffmpeg':
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if width > 0 and height > 0:
+                try:
+                    frames = self._iter_ffmpeg_frames(video_path, width, height)
+                    first_frame = next(frames, None)
+                    if first_frame is not None:
+                        cap.release()
+                        return self._prepend(first_frame, frames)
+                    print("AVERTISSEMENT (VideoAgent): ffmpeg n'a livré aucune frame. Bascule en mode 'grab'.")
+                except FileNotFoundError:
+                    print("AVERTISSEMENT (VideoAgent): ffmpeg introuvable. Bascule en mode 'grab'.")
+            else:
+                print("AVERTISSEMENT (VideoAgent): Dimensions de la vidéo inconnues. Bascule en mode 'grab'.")
+
+        return self._iter_opencv_frames(cap, use_grab=self.sampling_mode != 'read')
+
+    @staticmethod
+    def _prepend(first_item, iterator):
+        yield first_item
+        yield from iterator
+
+    def analyze_gaze(self, video_path: str, events_timeline: list, stop_event=None):
+        """
+        Analyse le regard sur les frames échantillonnées de la vidéo.
+        `stop_event` (threading.Event) est vérifié entre deux frames : l'analyse lancée dans un thread
+        s'arrête dès qu'il est levé et rend la main, FaceMesh n'étant pas utilisable par deux threads.
+        """
+        frames = self._sample_frames(video_path)
+        if frames is None:
+            return None
+
+        gaze_events = self._gaze_events(frames, stop_event)
+        if gaze_events is None:
+            return None
+        return self._aggregate_gaze(gaze_events, events_timeline)
+
+    def _gaze_events(self, frames, stop_event=None):
+        """
+        Comportement du regard de chaque frame (timestamp, image_rgb) fournie par _sample_frames.
+        Retourne None si `stop_event` est levé en cours de route.
+        """
         gaze_events = []
-        current_frame_idx = 0
+        for timestamp, image_rgb in frames:
+            if stop_event is not None and stop_event.is_set():
+                print("AVERTISSEMENT (VideoAgent): Analyse du regard interrompue.")
+                frames.close()
+                return None
+            image_rgb.flags.writeable = False
+            results = self.face_mesh.process(image_rgb)
 
-        # Boucle de lecture avec barre de progression
-        with tqdm(total=total_frames, desc="Analyse Vidéo (Regard)", unit="frame") as pbar:
-            while cap.isOpened():
-                success, image = cap.read()
-                if not success:
-                    break
-
-                if current_frame_idx % frame_interval == 0:
-                    timestamp = current_frame_idx / video_fps
-                    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                    image_rgb.flags.writeable = False
-                    results = self.face_mesh.process(image_rgb)
-                    
-                    direction = "hors_champ"
-                    if results.multi_face_landmarks:
-                        direction = self._classify_gaze_direction_by_face_center(results.multi_face_landmarks[0])
-
-                    gaze_events.append({"timestamp": timestamp, "behavior": self._interpret_gaze_direction(direction)})
-                
-                current_frame_idx += 1
-                pbar.update(1)
-        
-        cap.release()
-        
+            direction = "hors_champ"
+            if results.multi_face_landmarks:
+                direction = self._classify_gaze_direction_by_face_center(results.multi_face_landmarks[0])
+
+            gaze_events.append({"timestamp": timestamp, "behavior": self._interpret_gaze_direction(direction)})
+        return gaze_events
+
+    def _aggregate_gaze(self, gaze_events: list, events_timeline: list):
+        """
+        Agrège les comportements du regard globalement et par question.
+        """
         if not gaze_events:
             print("AVERTISSEMENT (VideoAgent): Aucun événement de regard n'a pu être extrait.")
             return None
 
-        # --- DÉBUT DE LA MODIFICATION DANS L'AGRÉGATION ---
-
-        # Agrégation globale des comportements (inchangé)
+        # Agrégation globale des comportements
         global_behaviors = [event['behavior'] for event in gaze_events]
         total_frames_analyzed = len(global_behaviors)
         gaze_global_distribution = {b: round((global_behaviors.count(b) / total_frames_analyzed) * 100, 2) for b in set(global_behaviors)}
         
-        # Agrégation contextuelle par question (corrigée)
+        # Agrégation contextuelle par question
         gaze_by_question = {}
         
         # On détermine la fin réelle de l'analyse du regard à partir des données extraites
@@ -125,6 +231,4 @@ class VideoAgent:
             else:
                  gaze_by_question[question_id] = {"Distraction": 100.0}
 
-        # --- FIN DE LA MODIFICATION ---
-
-        return { "gaze_global_distribution": gaze_global_distribution, "gaze_by_question": gaze_by_question }
\ No newline at end of file
+        return { "gaze_global_distribution": gaze_global_distribution, "gaze_by_question": gaze_by_question }
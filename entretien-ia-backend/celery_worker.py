@@ -1,4 +1,17 @@
+from celery.signals import worker_process_init
 from app import create_app
 from extensions import celery
 
 app = create_app()
+
+
+@worker_process_init.connect
+def preload_analysis_models(**kwargs):
+    """
+    Charge les agents une fois par processus worker, avant la première tâche.
+    """
+    if not app.config.get('AGENTS_PRELOAD', True):
+        return
+    from services import model_registry
+    with app.app_context():
+        model_registry.warm_up()
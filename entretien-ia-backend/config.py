@@ -32,5 +32,51 @@ class Config:
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER')
+
+    # ---------------- Pipeline d'analyse ----------------
+    AGENTS_PRELOAD = os.getenv('AGENTS_PRELOAD', 'True').lower() in ['true', 'on', '1']
+    # Checkpoints des étapes de run_analysis (table pipeline_artifacts) : une relance ne refait que les étapes invalidées
+    PIPELINE_CHECKPOINTS = os.getenv('PIPELINE_CHECKPOINTS', 'True').lower() in ['true', 'on', '1']
+    # Magasin local de modèles (models/manifest.json, lu par utils/model_store.py) : en mode hors ligne,
+    # aucun téléchargement n'est tenté et un modèle manquant fait échouer le démarrage du worker
+    MODELS_OFFLINE = os.getenv('MODELS_OFFLINE', 'False').lower() in ['true', 'on', '1']
+    ANALYSIS_EXECUTOR = os.getenv('ANALYSIS_EXECUTOR', 'sequential')  # 'sequential', 'thread' ou 'process'
+    ANALYSIS_MAX_WORKERS = int(os.getenv('ANALYSIS_MAX_WORKERS', 4))
+    ANALYSIS_VIDEO_BRANCH = os.getenv('ANALYSIS_VIDEO_BRANCH', 'thread')  # 'inline', 'thread' ou 'process'
+    VIDEO_SAMPLING_MODE = os.getenv('VIDEO_SAMPLING_MODE', 'read')  # 'read', 'grab' ou 'ffmpeg' (à mesurer avec scripts/benchmark_gaze_sampling.py)
+    RAG_REFERENCE_CACHE_SIZE = int(os.getenv('RAG_REFERENCE_CACHE_SIZE', 512))
+    # Serveur LanguageTool partagé (scripts/run_languagetool_server.py), ex: 'http://localhost:8081'.
+    # Vide = une JVM LanguageTool par worker (comportement historique)
+    LANGUAGETOOL_URL = os.getenv('LANGUAGETOOL_URL', '')
+    GRAMMAR_CACHE_SIZE = int(os.getenv('GRAMMAR_CACHE_SIZE', 2048))
+    GRAMMAR_CACHE_PERSIST = os.getenv('GRAMMAR_CACHE_PERSIST', 'True').lower() in ['true', 'on', '1']  # table grammar_results
+    MEDIA_DECODE_MODE = os.getenv('MEDIA_DECODE_MODE', 'pipe')  # 'pipe', 'memmap' ou 'wav'
+    MEDIA_TMPFS_DIR = os.getenv('MEDIA_TMPFS_DIR', '/dev/shm')  # utilisé par le mode 'memmap'
+    MEDIA_TEMP_DIR = os.getenv('MEDIA_TEMP_DIR') or None  # WAV de repli (None = répertoire temporaire système)
+    WHISPER_MODEL_SIZE = os.getenv('WHISPER_MODEL_SIZE', 'small')
+    WHISPER_ENGINE = os.getenv('WHISPER_ENGINE', 'sequential')  # 'sequential' ou 'batched' (BatchedInferencePipeline, impose le filtre VAD)
+    WHISPER_BEAM_SIZE = int(os.getenv('WHISPER_BEAM_SIZE', 5))
+    WHISPER_VAD_FILTER = os.getenv('WHISPER_VAD_FILTER', 'True').lower() in ['true', 'on', '1']
+    WHISPER_CPU_THREADS = int(os.getenv('WHISPER_CPU_THREADS', 0))  # 0 = réglage par défaut de CTranslate2
+    WHISPER_NUM_WORKERS = int(os.getenv('WHISPER_NUM_WORKERS', 1))
+    WHISPER_BATCH_SIZE = int(os.getenv('WHISPER_BATCH_SIZE', 8))  # moteur 'batched' uniquement
+    TRANSCRIPTION_MODE = os.getenv('TRANSCRIPTION_MODE', 'global')  # 'global' ou 'windowed' (une fenêtre par question)
+    TRANSCRIPTION_WINDOW_OVERLAP = float(os.getenv('TRANSCRIPTION_WINDOW_OVERLAP', 0.5))  # secondes, de chaque côté
+    PITCH_ENGINE = os.getenv('PITCH_ENGINE', 'yin')  # 'yin' (vectorisé, une passe) ou 'piptrack'
+    VAD_BACKEND = os.getenv('VAD_BACKEND', 'iterator')  # 'iterator' (get_speech_timestamps) ou 'batched', à activer après scripts/benchmark_vad.py
+    VAD_TORCH_THREADS = int(os.getenv('VAD_TORCH_THREADS', 0))  # 0 = réglage par défaut de torch
+    VAD_BATCH_STREAMS = int(os.getenv('VAD_BATCH_STREAMS', 64))
+    EMOTION_MODE = os.getenv('EMOTION_MODE', 'global')  # 'global' ou 'windowed'
+    EMOTION_WINDOW_SECONDS = float(os.getenv('EMOTION_WINDOW_SECONDS', 3.0))  # bornée à l'entrée du CNN (~4 s)
+    EMOTION_HOP_SECONDS = float(os.getenv('EMOTION_HOP_SECONDS', 1.5))
+    EMOTION_CNN_BACKEND = os.getenv('EMOTION_CNN_BACKEND', 'auto')  # 'auto', 'onnx' ou 'keras'
+    # Serveur d'inférence partagé du CNN émotionnel (scripts/run_inference_server.py), ex: 'localhost:6010'
+    EMOTION_INFERENCE_ADDRESS = os.getenv('EMOTION_INFERENCE_ADDRESS', '')
+    # Clé partagée serveur/workers, sans valeur par défaut : les messages sont désérialisés avec pickle
+    EMOTION_INFERENCE_AUTHKEY = os.getenv('EMOTION_INFERENCE_AUTHKEY')
+    if EMOTION_INFERENCE_ADDRESS and not EMOTION_INFERENCE_AUTHKEY:
+        raise ValueError("Erreur fatale: 'EMOTION_INFERENCE_ADDRESS' est définie mais pas 'EMOTION_INFERENCE_AUTHKEY'. Veuillez la définir dans le fichier .env.")
+    INFERENCE_MAX_BATCH_SIZE = int(os.getenv('INFERENCE_MAX_BATCH_SIZE', 32))
+    INFERENCE_MAX_WAIT_MS = float(os.getenv('INFERENCE_MAX_WAIT_MS', 10))
     
     
\ No newline at end of file
@@ -1,7 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import (
-    CheckConstraint, ForeignKey, Integer, String, Text, Boolean, DateTime, Float, text, JSON
+    CheckConstraint, ForeignKey, Integer, String, Text, Boolean, DateTime, Float, text, JSON, LargeBinary, UniqueConstraint
 )
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from typing import List, Optional
@@ -68,6 +68,8 @@ class Sessions(db.Model):
     audio_features: Mapped[Optional['AudioFeatures']] = relationship('AudioFeatures', uselist=False, back_populates='session', cascade="all, delete-orphan")
     emotion_scores: Mapped[Optional['EmotionScores']] = relationship('EmotionScores', uselist=False, back_populates='session', cascade="all, delete-orphan")
     facial_features: Mapped[Optional['FacialFeatures']] = relationship('FacialFeatures', uselist=False, back_populates='session', cascade="all, delete-orphan")
+    segments: Mapped[List['InterviewSegments']] = relationship('InterviewSegments', back_populates='session', cascade="all, delete-orphan")
+    artifacts: Mapped[List['PipelineArtifacts']] = relationship('PipelineArtifacts', cascade="all, delete-orphan")
 
 class Questions(db.Model):
     __tablename__ = 'questions'
@@ -88,6 +90,72 @@ class Questions(db.Model):
     # Relations
     recruteur: Mapped[Optional['Users']] = relationship('Users', back_populates='questions_creees')
     answers: Mapped[List['Answers']] = relationship('Answers', back_populates='question')
+    embedding: Mapped[Optional['QuestionEmbeddings']] = relationship('QuestionEmbeddings', uselist=False, back_populates='question', cascade="all, delete-orphan")
+
+class QuestionEmbeddings(db.Model):
+    __tablename__ = 'question_embeddings'
+    question_id: Mapped[int] = mapped_column(ForeignKey('questions.id', ondelete='CASCADE'), primary_key=True)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # SHA-256 de ideal_answer
+    model_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    embedding: Mapped[Optional[bytes]] = mapped_column(LargeBinary)  # Vecteur float32 normalisé
+    is_stale: Mapped[bool] = mapped_column(Boolean, default=False)
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, server_default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+    question: Mapped['Questions'] = relationship('Questions', back_populates='embedding')
+
+class RagReferences(db.Model):
+    __tablename__ = 'rag_references'
+    __table_args__ = (UniqueConstraint('question_hash', 'vector_db_version', 'llm_model'),)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    question_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # SHA-256 de l'intitulé
+    vector_db_version: Mapped[str] = mapped_column(String(64), nullable=False)
+    llm_model: Mapped[str] = mapped_column(String(255), nullable=False)
+    reference_text: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, server_default=db.func.current_timestamp())
+
+class InterviewSegments(db.Model):
+    __tablename__ = 'interview_segments'
+    __table_args__ = (UniqueConstraint('session_id', 'tentative', 'question_index'),)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    session_id: Mapped[int] = mapped_column(ForeignKey('sessions.id'), nullable=False)
+    question_id: Mapped[int] = mapped_column(ForeignKey('questions.id'), nullable=False)
+    tentative: Mapped[int] = mapped_column(Integer, nullable=False)  # Numéro de la tentative en cours d'enregistrement
+    question_index: Mapped[int] = mapped_column(Integer, nullable=False)  # Position dans events_timeline
+    timestamp: Mapped[float] = mapped_column(Float, nullable=False)  # Début de la question dans l'enregistrement complet (s)
+    fichier: Mapped[str] = mapped_column(Text, nullable=False)
+    statut: Mapped[str] = mapped_column(String(20), CheckConstraint("statut IN ('uploaded', 'analyzing', 'analyzed', 'failed')"), nullable=False, default='uploaded')
+    transcription: Mapped[Optional[str]] = mapped_column(Text)
+    score_pertinence: Mapped[Optional[float]] = mapped_column(Float)
+    pertinence_explication: Mapped[Optional[str]] = mapped_column(Text)
+    score_grammaire: Mapped[Optional[float]] = mapped_column(Float)
+    erreurs_grammaire: Mapped[Optional[dict]] = mapped_column(JsonVariant)
+    speech_rate: Mapped[Optional[float]] = mapped_column(Float)
+    pause_count: Mapped[Optional[int]] = mapped_column(Integer)
+    average_pause_duration: Mapped[Optional[float]] = mapped_column(Float)
+    created_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, server_default=db.func.current_timestamp())
+
+    session: Mapped['Sessions'] = relationship('Sessions', back_populates='segments')
+
+class PipelineArtifacts(db.Model):
+    __tablename__ = 'pipeline_artifacts'
+    __table_args__ = (UniqueConstraint('session_id', 'stage'),)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    session_id: Mapped[int] = mapped_column(ForeignKey('sessions.id'), nullable=False)
+    stage: Mapped[str] = mapped_column(String(30), nullable=False)
+    media_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # SHA-256 du fichier média analysé
+    inputs_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # SHA-256 des autres entrées de l'étape
+    payload: Mapped[dict] = mapped_column(JsonVariant, nullable=False)
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, server_default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+class GrammarResults(db.Model):
+    __tablename__ = 'grammar_results'
+    __table_args__ = (UniqueConstraint('text_hash', 'language', 'languagetool_version'),)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    text_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # SHA-256 du texte normalisé
+    language: Mapped[str] = mapped_column(String(10), nullable=False)
+    languagetool_version: Mapped[str] = mapped_column(String(64), nullable=False)
+    errors: Mapped[list] = mapped_column(JsonVariant, nullable=False)
+    created_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, server_default=db.func.current_timestamp())
 
 class Answers(db.Model):
     __tablename__ = 'answers'
@@ -143,6 +211,9 @@ class EmotionScores(db.Model):
     session_id: Mapped[int] = mapped_column(ForeignKey('sessions.id'), unique=True, nullable=False)
     dominant_emotion: Mapped[Optional[str]] = mapped_column(String(50))
     scores: Mapped[Optional[dict]] = mapped_column(JsonVariant)
+    # Mode fenêtré (EMOTION_MODE='windowed') : timeline compacte et agrégats par question
+    timeline: Mapped[Optional[dict]] = mapped_column(JsonVariant)
+    scores_by_question: Mapped[Optional[dict]] = mapped_column(JsonVariant)
     
     session: Mapped['Sessions'] = relationship('Sessions', back_populates='emotion_scores')
 
@@ -1,5 +1,5 @@
 -- Suppression des tables dans l'ordre inverse des dépendances pour éviter les erreurs
-DROP TABLE IF EXISTS facial_features, emotion_scores, audio_features, reports, answers, questions, sessions, exports, configurations, users CASCADE;
+DROP TABLE IF EXISTS pipeline_artifacts, interview_segments, grammar_results, rag_references, question_embeddings, facial_features, emotion_scores, audio_features, reports, answers, questions, sessions, exports, configurations, users CASCADE;
 
 -- =================================================================
 -- TABLE: users
@@ -35,6 +35,47 @@ CREATE TABLE questions (
     commentaire_admin TEXT
 );
 
+-- =================================================================
+-- TABLE: question_embeddings
+-- Embeddings précalculés des réponses idéales, invalidés par hash du contenu.
+-- =================================================================
+CREATE TABLE question_embeddings (
+    question_id INTEGER PRIMARY KEY REFERENCES questions(id) ON DELETE CASCADE,
+    content_hash VARCHAR(64) NOT NULL, -- SHA-256 de ideal_answer
+    model_name VARCHAR(255) NOT NULL,
+    embedding BYTEA, -- Vecteur float32 normalisé
+    is_stale BOOLEAN DEFAULT FALSE,
+    updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() at time zone 'utc')
+);
+
+-- =================================================================
+-- TABLE: rag_references
+-- Réponses de référence générées par le RAG, par question et version de la base vectorielle.
+-- =================================================================
+CREATE TABLE rag_references (
+    id SERIAL PRIMARY KEY,
+    question_hash VARCHAR(64) NOT NULL, -- SHA-256 de l'intitulé
+    vector_db_version VARCHAR(64) NOT NULL,
+    llm_model VARCHAR(255) NOT NULL,
+    reference_text TEXT NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() at time zone 'utc'),
+    UNIQUE (question_hash, vector_db_version, llm_model)
+);
+
+-- =================================================================
+-- TABLE: grammar_results
+-- Erreurs LanguageTool par texte de réponse normalisé, langue et version de LanguageTool.
+-- =================================================================
+CREATE TABLE grammar_results (
+    id SERIAL PRIMARY KEY,
+    text_hash VARCHAR(64) NOT NULL, -- SHA-256 du texte normalisé
+    language VARCHAR(10) NOT NULL,
+    languagetool_version VARCHAR(64) NOT NULL,
+    errors JSONB NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() at time zone 'utc'),
+    UNIQUE (text_hash, language, languagetool_version)
+);
+
 -- =================================================================
 -- TABLE: sessions
 -- Représente une session d'entretien, liant un candidat et un recruteur.
@@ -55,6 +96,46 @@ CREATE TABLE sessions (
     questions_ids INTEGER[]
 );
 
+-- =================================================================
+-- TABLE: interview_segments
+-- Segments média par question envoyés pendant l'entretien, analysés au fil de l'eau.
+-- =================================================================
+CREATE TABLE interview_segments (
+    id SERIAL PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+    tentative INTEGER NOT NULL, -- Numéro de la tentative en cours d'enregistrement
+    question_index INTEGER NOT NULL, -- Position dans events_timeline
+    timestamp REAL NOT NULL, -- Début de la question dans l'enregistrement complet (s)
+    fichier TEXT NOT NULL,
+    statut VARCHAR(20) NOT NULL DEFAULT 'uploaded' CHECK (statut IN ('uploaded', 'analyzing', 'analyzed', 'failed')),
+    transcription TEXT,
+    score_pertinence REAL,
+    pertinence_explication TEXT,
+    score_grammaire REAL,
+    erreurs_grammaire JSONB,
+    speech_rate REAL,
+    pause_count INTEGER,
+    average_pause_duration REAL,
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() at time zone 'utc'),
+    UNIQUE (session_id, tentative, question_index)
+);
+
+-- =================================================================
+-- TABLE: pipeline_artifacts
+-- Checkpoints des étapes de run_analysis, valides tant que le média et les entrées de l'étape sont inchangés.
+-- =================================================================
+CREATE TABLE pipeline_artifacts (
+    id SERIAL PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    stage VARCHAR(30) NOT NULL,
+    media_hash VARCHAR(64) NOT NULL, -- SHA-256 du fichier média analysé
+    inputs_hash VARCHAR(64) NOT NULL, -- SHA-256 des autres entrées de l'étape
+    payload JSONB NOT NULL,
+    updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() at time zone 'utc'),
+    UNIQUE (session_id, stage)
+);
+
 -- =================================================================
 -- TABLE: answers
 -- Stocke chaque réponse d'un candidat pour une question spécifique d'une session.
@@ -106,7 +187,9 @@ CREATE TABLE emotion_scores (
     id SERIAL PRIMARY KEY,
     session_id INTEGER NOT NULL UNIQUE REFERENCES sessions(id) ON DELETE CASCADE,
     dominant_emotion VARCHAR(50),
-    scores JSONB
+    scores JSONB,
+    timeline JSONB, -- Ex: {"labels": [...], "window_seconds": 3.0, "hop_seconds": 1.5, "starts": [...], "dominant": [...], "scores": [[...]]}
+    scores_by_question JSONB -- Ex: {"71": {"dominant_emotion": "calme", "scores": {...}, "window_count": 12}}
 );
 
 -- TABLE: facial_features (pour les analyses visuelles)
@@ -148,6 +231,11 @@ CREATE TABLE profils_ponderation (
 -- Supprimez d'abord la contrainte si elle existe, puis ajoutez la colonne
 ALTER TABLE sessions ADD COLUMN profil_ponderation_id INTEGER REFERENCES profils_ponderation(id);
 
+-- MODIFICATION DE LA TABLE emotion_scores (timeline émotionnelle fenêtrée)
+-- IF NOT EXISTS : sans effet après le CREATE TABLE ci-dessus, ajoute les colonnes sur une base existante
+ALTER TABLE emotion_scores ADD COLUMN IF NOT EXISTS timeline JSONB;
+ALTER TABLE emotion_scores ADD COLUMN IF NOT EXISTS scores_by_question JSONB;
+
 -- Création d'index pour améliorer les performances des recherches fréquentes
 CREATE INDEX idx_sessions_user_id ON sessions(user_id);
 CREATE INDEX idx_sessions_recruteur_id ON sessions(recruteur_id);
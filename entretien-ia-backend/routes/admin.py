@@ -6,6 +6,7 @@ from services import auth_service
 from flask import send_file
 from utils import test_runner_service
 from services import export_service
+from services import rescoring_service
 
 admin_bp = Blueprint('admin_bp', __name__)
 
@@ -189,7 +190,12 @@ def update_profile(profile_id):
     profile.description = data.get('description', profile.description)
     profile.poids = data.get('poids', profile.poids)
     db.session.commit()
-    return jsonify({"msg": "Profil mis à jour."})
+    if 'poids' not in data:
+        return jsonify({"msg": "Profil mis à jour."})
+    # Nouveaux poids : seule la fusion des scores est refaite pour les sessions du profil
+    rescored_count = rescoring_service.rescore_profile(profile.id)
+    db.session.commit()
+    return jsonify({"msg": f"Profil mis à jour. {rescored_count} note(s) globale(s) recalculée(s).", "rescored": rescored_count})
 
 @admin_bp.route('/api/admin/profiles/<int:profile_id>', methods=['DELETE'])
 @admin_required()
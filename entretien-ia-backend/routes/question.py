@@ -2,9 +2,21 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt
 from database.models import db, Questions, Users
 from sqlalchemy import or_
+from services import embedding_service
 
 question_bp = Blueprint('question_bp', __name__)
 
+def _schedule_embedding_refresh(question_id: int):
+    """
+    Demande au worker de (re)calculer l'embedding de la réponse idéale.
+    Sans broker disponible, le calcul se fera à la prochaine analyse utilisant la question.
+    """
+    from tasks import refresh_question_embedding_task
+    try:
+        refresh_question_embedding_task.delay(question_id)
+    except Exception as e:
+        print(f"AVERTISSEMENT: Impossible de planifier le calcul de l'embedding de la question {question_id}: {e}")
+
 def recruiter_or_admin_required():
     def wrapper(fn):
         @jwt_required()
@@ -68,6 +80,7 @@ def create_question():
     )
     db.session.add(new_question)
     db.session.commit()
+    _schedule_embedding_refresh(new_question.id)
     return jsonify({"msg": "Question créée avec succès."}), 201
 
 @question_bp.route('/api/recruiter/questions/<int:question_id>', methods=['PUT'])
@@ -90,8 +103,14 @@ def update_question(question_id):
     question.ideal_answer = data.get('ideal_answer', question.ideal_answer)
     question.experience_level = data.get('experience_level', question.experience_level)
     question.keywords = keywords
+
+    embedding_outdated = not embedding_service.is_fresh(question)
+    if embedding_outdated:
+        embedding_service.mark_stale(question)
     
     db.session.commit()
+    if embedding_outdated:
+        _schedule_embedding_refresh(question.id)
     return jsonify({"msg": "Question mise à jour avec succès."})
 
 @question_bp.route('/api/recruiter/questions/<int:question_id>', methods=['DELETE'])
@@ -2,10 +2,15 @@ import json
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
 from services import storage_service
-from database.models import Sessions, db
+from database.models import Sessions, InterviewSegments, db
+from tasks import analyze_segment_task
 
 upload_bp = Blueprint('upload_bp', __name__)
 
+# Signature EBML en tête de tout fichier webm : un fragment pris au milieu d'un flux MediaRecorder
+# (timeslice) ne l'a pas et ne peut pas être décodé seul
+WEBM_MAGIC = b'\x1a\x45\xdf\xa3'
+
 @upload_bp.route('/api/upload/<int:session_id>', methods=['POST'])
 @jwt_required()
 def upload_file(session_id):
@@ -42,6 +47,12 @@ def upload_file(session_id):
     session.tentatives_realisees += 1
     session.events_timeline = events
 
+    # Les segments des tentatives précédentes ne seront plus réutilisés par l'analyse
+    for segment in list(session.segments):
+        if segment.tentative != session.tentatives_realisees:
+            storage_service.delete_file(segment.fichier)
+            db.session.delete(segment)
+
     db.session.commit()
     
     return jsonify({
@@ -49,4 +60,77 @@ def upload_file(session_id):
         "session_id": session.id,
         "tentatives_realisees": session.tentatives_realisees,
         "nombre_tentatives": session.nombre_tentatives
-    }), 200
\ No newline at end of file
+    }), 200
+
+
+@upload_bp.route('/api/upload/<int:session_id>/segment', methods=['POST'])
+@jwt_required()
+def upload_segment(session_id):
+    """
+    Reçoit le segment média d'une question dès qu'elle est close, pendant l'enregistrement de la
+    tentative en cours, et lance aussitôt sa transcription et sa notation en arrière-plan.
+    Le segment doit être un enregistrement autonome (InterviewBox.vue démarre un MediaRecorder
+    audio par question), pas une tranche du flux de l'enregistrement complet.
+    Champs : file, question_id, question_index (position dans la timeline), timestamp (début de
+    la question dans l'enregistrement complet, en secondes, tel que noté par le frontend).
+    """
+    claims = get_jwt()
+    user_id = claims.get('user_id')
+
+    session = db.session.get(Sessions, session_id)
+    if not session or session.user_id != user_id:
+        return jsonify({"msg": "Session non trouvée ou accès non autorisé."}), 404
+
+    if session.statut != 'pending':
+        return jsonify({"msg": "Cet entretien a déjà été soumis."}), 409
+    if session.tentatives_realisees >= session.nombre_tentatives:
+        return jsonify({"msg": "Nombre maximum de tentatives atteint."}), 409
+
+    file = request.files.get('file')
+    try:
+        question_id = int(request.form['question_id'])
+        question_index = int(request.form['question_index'])
+        timestamp = float(request.form['timestamp'])
+    except (KeyError, ValueError):
+        return jsonify({"msg": "Données manquantes."}), 400
+    if not file:
+        return jsonify({"msg": "Données manquantes."}), 400
+    if file.filename.lower().endswith('.webm'):
+        header = file.stream.read(len(WEBM_MAGIC))
+        file.stream.seek(0)
+        if header != WEBM_MAGIC:
+            return jsonify({"msg": "Le segment n'est pas un enregistrement webm autonome."}), 400
+    if question_id not in (session.questions_ids or []):
+        return jsonify({"msg": "Question inconnue pour cette session."}), 400
+
+    saved_path = storage_service.save_file(file, user_id)
+    if not saved_path:
+        return jsonify({"msg": "Erreur de sauvegarde."}), 500
+
+    # Le segment appartient à la tentative en cours d'enregistrement (pas encore comptée)
+    tentative = session.tentatives_realisees + 1
+    segment = db.session.execute(
+        db.select(InterviewSegments).filter_by(session_id=session.id, tentative=tentative, question_index=question_index)
+    ).scalar_one_or_none()
+    if segment:
+        storage_service.delete_file(segment.fichier)
+    else:
+        segment = InterviewSegments(session_id=session.id, tentative=tentative, question_index=question_index)
+        db.session.add(segment)
+
+    segment.question_id = question_id
+    segment.timestamp = timestamp
+    segment.fichier = saved_path
+    segment.statut = 'uploaded'
+    for field in ('transcription', 'score_pertinence', 'pertinence_explication', 'score_grammaire',
+                  'erreurs_grammaire', 'speech_rate', 'pause_count', 'average_pause_duration'):
+        setattr(segment, field, None)
+    db.session.commit()
+
+    analyze_segment_task.delay(segment.id)
+    return jsonify({
+        "msg": "Segment enregistré, analyse lancée.",
+        "segment_id": segment.id,
+        "tentative": tentative,
+        "question_index": question_index
+    }), 202
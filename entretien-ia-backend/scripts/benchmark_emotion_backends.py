@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Usage : python scripts/benchmark_emotion_backends.py
+# Compare les backends du CNN émotionnel (Keras/TensorFlow et ONNX/onnxruntime) :
+# - démarrage à froid : import + chargement + première prédiction dans un interpréteur neuf,
+#   avec la mémoire résidente maximale du processus ;
+# - latence à chaud pour plusieurs tailles de lot.
+
+BACKENDS = ('keras', 'onnx')
+BATCH_SIZES = (1, 8, 64)
+REPEATS = 20
+
+COLD_START_CODE = """
+import os, sys, time, resource
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+sys.path.append({root!r})
+start = time.perf_counter()
+import numpy as np
+from agents.EmotionAgent import load_cnn_model
+model = load_cnn_model({backend!r})
+model.predict(np.zeros((1, 128, 174, 1), dtype=np.float32), verbose=0)
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+"""
+
+
+def measure_cold_start(backend: str):
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    completed = subprocess.run([sys.executable, '-c', COLD_START_CODE.format(root=root, backend=backend)],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(f"- {backend:<6}: ÉCHEC du démarrage à froid\n{completed.stderr.strip()[-500:]}")
+        return
+    elapsed, max_rss_mb = map(float, completed.stdout.strip().splitlines()[-1].split())
+    print(f"- {backend:<6}: démarrage à froid {elapsed:6.2f} s | RSS max {max_rss_mb:7.0f} Mo")
+
+
+def measure_latency(backend: str):
+    from agents.EmotionAgent import load_cnn_model
+    try:
+        model = load_cnn_model(backend)
+    except Exception as e:
+        print(f"- {backend:<6}: indisponible ({e})")
+        return
+    rng = np.random.default_rng(0)
+    for batch_size in BATCH_SIZES:
+        batch = rng.uniform(-80, 0, size=(batch_size, 128, 174, 1)).astype(np.float32)
+        model.predict(batch, verbose=0)
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            model.predict(batch, verbose=0)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"- {backend:<6} | lot de {batch_size:3d} : p50 {np.percentile(timings, 50):8.2f} ms | "
+              f"p99 {np.percentile(timings, 99):8.2f} ms")
+
+
+if __name__ == '__main__':
+    print("=== Démarrage à froid ===")
+    for backend in BACKENDS:
+        measure_cold_start(backend)
+    print("\n=== Latence à chaud ===")
+    for backend in BACKENDS:
+        measure_latency(backend)
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import numpy as np
+import librosa
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.EmotionAgentML import EmotionAgent
+
+# Usage : python scripts/benchmark_emotion_features.py [chemin/audio1.wav ...]
+# Compare l'extraction historique (un appel librosa.feature.* par famille, chacun avec sa STFT)
+# à l'extraction à STFT partagée. Sans argument, utilise un signal synthétique de 5 minutes.
+
+
+def extract_features_separately(y, sr, n_mfcc=40):
+    mfccs = np.mean(librosa.feature.mfcc(y=y, sr=sr, n_mfcc=n_mfcc).T, axis=0)
+    chroma = np.mean(librosa.feature.chroma_stft(y=y, sr=sr).T, axis=0)
+    mel = np.mean(librosa.feature.melspectrogram(y=y, sr=sr).T, axis=0)
+    contrast = np.mean(librosa.feature.spectral_contrast(y=y, sr=sr).T, axis=0)
+    return np.hstack((mfccs, chroma, mel, contrast))
+
+
+def benchmark_signal(label: str, y: np.ndarray, agent: EmotionAgent, repeats: int = 3):
+    print(f"\n=== {label} ({len(y) / agent.sr:.0f} s) ===")
+    timings = {}
+    for name, extractor in (("séparée", lambda: extract_features_separately(y, agent.sr, agent.n_mfcc)),
+                            ("STFT partagée", lambda: np.mean(agent.extract_feature_frames(y, agent.sr), axis=1))):
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            features = extractor()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = (best, features)
+        print(f"- {name:<14}: {best:7.3f} s")
+
+    (old_time, old_features), (new_time, new_features) = timings.values()
+    print(f"-> Accélération x{old_time / new_time:.2f} | écart max {np.max(np.abs(old_features - new_features)):.2e}")
+
+
+if __name__ == '__main__':
+    emotion_agent = EmotionAgent()
+    audio_paths = sys.argv[1:]
+    if not audio_paths:
+        t = np.arange(300 * emotion_agent.sr) / emotion_agent.sr
+        signal = (0.3 * np.sin(2 * np.pi * 180 * t) * (1 + np.sin(2 * np.pi * 0.5 * t))).astype(np.float32)
+        benchmark_signal("signal synthétique", signal, emotion_agent)
+    for path in audio_paths:
+        if os.path.exists(path):
+            signal, _ = librosa.load(path, sr=emotion_agent.sr)
+            benchmark_signal(os.path.basename(path), signal, emotion_agent)
+        else:
+            print(f"!!! Fichier audio non trouvé : {path}")
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.VideoAgent import VideoAgent, SAMPLING_MODES
+
+# Usage : python scripts/benchmark_gaze_sampling.py chemin/video1.webm [chemin/video2.webm ...]
+# Compare le temps d'analyse du regard pour chaque mode d'échantillonnage
+# et l'écart de distribution globale par rapport à la boucle historique ('read').
+
+
+def benchmark_video(video_path: str):
+    print(f"\n=== {os.path.basename(video_path)} ===")
+    reference_distribution = None
+    single_event_timeline = [{"questionId": 0, "timestamp": 0}]
+
+    for mode in SAMPLING_MODES:
+        agent = VideoAgent(sampling_mode=mode)
+        start = time.perf_counter()
+        frames = agent._sample_frames(video_path)
+        if frames is None:
+            return
+        # Même boucle que VideoAgent.analyze_gaze, avant l'agrégation
+        gaze_events = agent._gaze_events(frames)
+        elapsed = time.perf_counter() - start
+        frames_analyzed = len(gaze_events)
+
+        result = agent._aggregate_gaze(gaze_events, single_event_timeline) or {}
+        distribution = result.get('gaze_global_distribution', {})
+        if reference_distribution is None:
+            reference_distribution = distribution
+        max_gap = max([abs(distribution.get(b, 0) - reference_distribution.get(b, 0))
+                       for b in set(distribution) | set(reference_distribution)] or [0])
+
+        print(f"- {mode:<7}: {elapsed:7.2f} s | {frames_analyzed:5d} frames analysées | "
+              f"écart max vs 'read' : {max_gap:.2f} pts")
+
+
+if __name__ == '__main__':
+    video_paths = sys.argv[1:]
+    if not video_paths:
+        print("Usage : python scripts/benchmark_gaze_sampling.py <video.webm> [...]")
+        sys.exit(1)
+    for path in video_paths:
+        if os.path.exists(path):
+            benchmark_video(path)
+        else:
+            print(f"!!! Fichier vidéo non trouvé : {path}")
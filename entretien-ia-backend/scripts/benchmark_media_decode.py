@@ -0,0 +1,59 @@
+import os
+import resource
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.media_service import DECODERS, DECODE_MODES
+
+# Usage : python scripts/benchmark_media_decode.py chemin/entretien1.webm [chemin/entretien2.webm ...]
+# Compare, pour chaque mode de décodage, le temps réel et les octets lus/écrits sur disque
+# (processus courant + ffmpeg), idéalement sur des entretiens de 20 à 40 minutes.
+# Les compteurs de blocs de getrusage sont exprimés en unités de 512 octets sous Linux.
+
+BLOCK_SIZE = 512
+
+
+def _io_blocks():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (own.ru_inblock + children.ru_inblock, own.ru_oublock + children.ru_oublock)
+
+
+def benchmark_media(media_path: str):
+    print(f"\n=== {os.path.basename(media_path)} ({os.path.getsize(media_path) / 1e6:.1f} Mo) ===")
+    reference_length = None
+
+    for mode in DECODE_MODES:
+        in_before, out_before = _io_blocks()
+        start = time.perf_counter()
+        try:
+            decoded_audio = DECODERS[mode](media_path)
+        except Exception as e:
+            print(f"- {mode:<7}: ÉCHEC ({e})")
+            continue
+        elapsed = time.perf_counter() - start
+        in_after, out_after = _io_blocks()
+
+        if reference_length is None:
+            reference_length = len(decoded_audio)
+        read_mb = (in_after - in_before) * BLOCK_SIZE / 1e6
+        written_mb = (out_after - out_before) * BLOCK_SIZE / 1e6
+
+        print(f"- {mode:<7}: {elapsed:7.2f} s | {decoded_audio.duration / 60:5.1f} min d'audio | "
+              f"lu {read_mb:8.1f} Mo | écrit {written_mb:8.1f} Mo | "
+              f"écart de longueur {len(decoded_audio) - reference_length:+d} échantillons")
+        del decoded_audio
+
+
+if __name__ == '__main__':
+    media_paths = sys.argv[1:]
+    if not media_paths:
+        print("Usage : python scripts/benchmark_media_decode.py <entretien.webm> [...]")
+        sys.exit(1)
+    for path in media_paths:
+        if os.path.exists(path):
+            benchmark_media(path)
+        else:
+            print(f"!!! Fichier média non trouvé : {path}")
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.AudioAgent import AudioAgent, VAD_BACKENDS
+from services.media_service import decode_audio
+
+# Usage : python scripts/benchmark_vad.py chemin/entretien1.webm [...] [--threads N]
+# Compare la durée de la passe VAD globale entre get_speech_timestamps ('iterator') et
+# l'inférence Silero par lots ('batched'), ainsi que l'écart sur la durée de parole détectée.
+
+
+def benchmark_media(media_path: str, agents: dict):
+    decoded_audio = decode_audio(media_path)
+    print(f"\n=== {os.path.basename(media_path)} ({decoded_audio.duration / 60:.1f} min) ===")
+    reference_speech = None
+    for backend, agent in agents.items():
+        start = time.perf_counter()
+        intervals = agent.detect_speech(decoded_audio)
+        elapsed = time.perf_counter() - start
+        speech_seconds = float((intervals[:, 1] - intervals[:, 0]).sum()) / agent.sr
+        if reference_speech is None:
+            reference_speech = speech_seconds
+        print(f"- {backend:<8}: {elapsed:7.2f} s | {len(intervals):5d} segments | "
+              f"parole {speech_seconds:8.1f} s (écart {speech_seconds - reference_speech:+.1f} s)")
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    threads = 0
+    if '--threads' in arguments:
+        position = arguments.index('--threads')
+        threads = int(arguments[position + 1])
+        del arguments[position:position + 2]
+    if not arguments:
+        print("Usage : python scripts/benchmark_vad.py <entretien.webm> [...] [--threads N]")
+        sys.exit(1)
+
+    agents = {backend: AudioAgent(vad_backend=backend, vad_torch_threads=threads) for backend in VAD_BACKENDS}
+    for path in arguments:
+        if os.path.exists(path):
+            benchmark_media(path, agents)
+        else:
+            print(f"!!! Fichier média non trouvé : {path}")
@@ -0,0 +1,82 @@
+import itertools
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.NLPAgent import NLPAgent, TRANSCRIPTION_ENGINES
+from services.media_service import decode_audio
+
+# Usage : python scripts/benchmark_whisper.py chemin/entretien1.webm [...] [--threads 4,8] [--beams 1,5]
+# Mesure le facteur temps réel (RTF = temps de transcription / durée de l'audio, plus bas = mieux)
+# de chaque combinaison moteur x filtre VAD x beam size x threads, sur des entretiens réels.
+# Le nombre de mots est affiché pour repérer une configuration qui perdrait du texte.
+# Le moteur 'batched' n'est mesuré qu'avec le filtre VAD, sans lequel il refuse l'audio de plus de 30 s.
+
+
+def _int_list(arguments: list, flag: str, default: list) -> list:
+    if flag not in arguments:
+        return default
+    position = arguments.index(flag)
+    values = [int(value) for value in arguments[position + 1].split(',')]
+    del arguments[position:position + 2]
+    return values
+
+
+def transcribe_timed(nlp_agent: NLPAgent, decoded_audio) -> tuple:
+    """
+    (durée, nombre de mots) de la transcription, ou None si elle a échoué.
+    """
+    start = time.perf_counter()
+    segments, info = nlp_agent.transcribe_media(decoded_audio)
+    if info is None:
+        return None
+    # Les segments sont produits paresseusement : le décodage n'a lieu qu'à l'itération
+    try:
+        word_count = sum(len(segment.text.split()) for segment in segments)
+    except Exception as e:
+        print(f"ERREUR lors de la transcription : {e}")
+        return None
+    return time.perf_counter() - start, word_count
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    thread_counts = _int_list(arguments, '--threads', [0])
+    beam_sizes = _int_list(arguments, '--beams', [1, 5])
+    if not arguments:
+        print("Usage : python scripts/benchmark_whisper.py <entretien.webm> [...] [--threads 4,8] [--beams 1,5]")
+        sys.exit(1)
+
+    recordings = []
+    for path in arguments:
+        if os.path.exists(path):
+            recordings.append((os.path.basename(path), decode_audio(path)))
+        else:
+            print(f"!!! Fichier média non trouvé : {path}")
+    total_duration = sum(decoded_audio.duration for _, decoded_audio in recordings)
+    if not recordings:
+        sys.exit(1)
+    print(f"{len(recordings)} entretien(s), {total_duration / 60:.1f} min d'audio au total.\n")
+
+    for engine, threads in itertools.product(TRANSCRIPTION_ENGINES, thread_counts):
+        nlp_agent = NLPAgent(engine=engine, cpu_threads=threads)
+        for vad_filter, beam_size in itertools.product((False, True), beam_sizes):
+            if engine == 'batched' and not vad_filter:
+                continue
+            nlp_agent.vad_filter, nlp_agent.beam_size = vad_filter, beam_size
+            label = f"- {engine:<10} | threads {threads or 'défaut':>6} | vad {'oui' if vad_filter else 'non'} | beam {beam_size}"
+            elapsed, words, failed = 0.0, 0, []
+            for name, decoded_audio in recordings:
+                result = transcribe_timed(nlp_agent, decoded_audio)
+                if result is None:
+                    failed.append(name)
+                    continue
+                elapsed += result[0]
+                words += result[1]
+            if failed:
+                print(f"{label} : ÉCHEC ({', '.join(failed)})")
+                continue
+            print(f"{label} : RTF {elapsed / total_duration:.3f} ({elapsed:7.1f} s, {words} mots)")
+        del nlp_agent
@@ -1,9 +1,14 @@
 import os
+import sys
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import TextLoader
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.vector_db import write_vector_db_version
+from utils import model_store
+
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 KNOWLEDGE_BASE_PATH = os.path.join(BASE_DIR, 'data', 'knowledge_base.txt')
 VECTOR_DB_PATH = os.path.join(BASE_DIR, 'data', 'vector_db')
@@ -32,7 +37,7 @@ def create_vector_database():
 
     # 3. Charger le modèle d'embedding (celui qui transforme le texte en vecteurs)
     print(f"Chargement du modèle d'embedding : {EMBEDDING_MODEL}...")
-    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    embeddings = HuggingFaceEmbeddings(model_name=model_store.resolve('semantic', EMBEDDING_MODEL))
     print("-> Modèle d'embedding chargé.")
 
     # 4. Créer la base de données vectorielle FAISS à partir des chunks
@@ -43,9 +48,12 @@ def create_vector_database():
     os.makedirs(VECTOR_DB_PATH, exist_ok=True)
     db.save_local(VECTOR_DB_PATH)
 
+    # 6. Nouvelle version : invalide les réponses de référence RAG mises en cache
+    version = write_vector_db_version(VECTOR_DB_PATH)
+
     print("-" * 50)
     print("✅ Base de données vectorielle créée avec succès !")
-    print(f"Sauvegardée dans : {VECTOR_DB_PATH}")
+    print(f"Sauvegardée dans : {VECTOR_DB_PATH} (version {version})")
     print("-" * 50)
 
 if __name__ == '__main__':
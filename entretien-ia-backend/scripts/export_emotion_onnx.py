@@ -0,0 +1,48 @@
+import os
+import sys
+import numpy as np
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.EmotionAgent import CNN_MODEL_PATH, ONNX_MODEL_PATH
+
+# Usage : python scripts/export_emotion_onnx.py
+# Convertit le CNN Keras (.h5) en ONNX, à côté du .h5, puis vérifie que les deux modèles
+# donnent les mêmes probabilités sur des spectrogrammes aléatoires.
+
+INPUT_SHAPE = (128, 174, 1)
+OPSET = 13
+
+
+def export_to_onnx(keras_model, output_path: str = ONNX_MODEL_PATH) -> str:
+    import tensorflow as tf
+    import tf2onnx
+
+    input_signature = [tf.TensorSpec((None,) + INPUT_SHAPE, tf.float32, name='spectrogram')]
+    tf2onnx.convert.from_keras(keras_model, input_signature=input_signature, opset=OPSET, output_path=output_path)
+    print(f"Export ONNX sauvegardé : {output_path}")
+    return output_path
+
+
+def check_parity(keras_model, onnx_path: str = ONNX_MODEL_PATH, samples: int = 16) -> float:
+    from agents.EmotionAgent import OnnxCNNModel
+
+    batch = np.random.default_rng(0).uniform(-80, 0, size=(samples,) + INPUT_SHAPE).astype(np.float32)
+    keras_outputs = keras_model.predict(batch, verbose=0)
+    onnx_outputs = OnnxCNNModel(onnx_path).predict(batch)
+    max_gap = float(np.max(np.abs(keras_outputs - onnx_outputs)))
+    print(f"Écart max Keras / ONNX sur {samples} spectrogrammes : {max_gap:.2e}")
+    return max_gap
+
+
+if __name__ == '__main__':
+    if not os.path.exists(CNN_MODEL_PATH):
+        print(f"!!! Modèle CNN introuvable : {CNN_MODEL_PATH}. Lancez d'abord 'train_emotion_cnn.py'.")
+        sys.exit(1)
+
+    from tensorflow.keras.models import load_model
+    model = load_model(CNN_MODEL_PATH)
+    export_to_onnx(model)
+    if check_parity(model) > 1e-4:
+        print("AVERTISSEMENT: Les sorties ONNX s'écartent des sorties Keras au-delà de 1e-4.")
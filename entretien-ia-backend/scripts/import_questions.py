@@ -6,6 +6,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import create_app, db
 from database.models import Questions
+from services import embedding_service
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
@@ -77,6 +78,15 @@ def import_questions():
         if questions_skipped > 0:
             print(f"{questions_skipped} questions déjà existantes ont été ignorées pour éviter les doublons.")
 
+        # Précalcul des embeddings des réponses idéales (nouvelles questions ou réponses modifiées)
+        all_questions = db.session.execute(db.select(Questions)).scalars().all()
+        embeddings_refreshed = embedding_service.refresh_question_embeddings(all_questions)
+        if embeddings_refreshed > 0:
+            db.session.commit()
+            print(f"{embeddings_refreshed} embeddings de réponses idéales calculés.")
+        else:
+            print("Tous les embeddings de réponses idéales sont à jour.")
+
 
 if __name__ == '__main__':
     import_questions()
\ No newline at end of file
@@ -0,0 +1,79 @@
+import os
+import shutil
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import model_store
+
+# Usage : python scripts/prefetch_models.py [nom_modèle ...]   télécharge dans models/ et met à jour le manifeste
+#         python scripts/prefetch_models.py --verify            vérifie tailles et sha256 de tout le magasin
+# À lancer sur une machine connectée ; le dossier models/ est ensuite copié sur les workers
+# hors ligne, démarrés avec MODELS_OFFLINE=true.
+
+
+def fetch_huggingface(entry: dict, target_dir: str):
+    from huggingface_hub import snapshot_download
+    snapshot_download(repo_id=entry['source'], local_dir=target_dir)
+
+
+def fetch_torch_hub(entry: dict, target_dir: str):
+    import torch
+    torch.hub.load(repo_or_dir=entry['source'], model='silero_vad', trust_repo=True)
+    owner, repository = entry['source'].split('/')
+    hub_checkout = os.path.join(torch.hub.get_dir(), f"{owner}_{repository}_master")
+    shutil.copytree(hub_checkout, target_dir, dirs_exist_ok=True, ignore=shutil.ignore_patterns('.git'))
+
+
+def fetch_languagetool(entry: dict, target_dir: str):
+    os.makedirs(target_dir, exist_ok=True)
+    os.environ['LTP_PATH'] = target_dir
+    import language_tool_python
+    language_tool_python.LanguageTool(entry['source']).close()
+
+
+FETCHERS = {
+    'huggingface': fetch_huggingface,
+    'torch_hub': fetch_torch_hub,
+    'languagetool': fetch_languagetool,
+}
+
+
+def prefetch(names: list):
+    manifest = model_store.load_manifest()
+    for name in names:
+        entry = manifest['models'].get(name)
+        if entry is None:
+            print(f"!!! Modèle inconnu dans le manifeste : {name}")
+            continue
+        target_dir = os.path.join(model_store.MODELS_DIR, entry['path'])
+        print(f"\n[{name}] {entry['source']} -> {target_dir}")
+        start = time.perf_counter()
+        try:
+            FETCHERS[entry['type']](entry, target_dir)
+        except Exception as e:
+            print(f"ERREUR: Téléchargement de '{name}' impossible : {e}")
+            continue
+        entry['files'] = model_store.compute_file_index(target_dir)
+        total_mb = sum(f['size'] for f in entry['files'].values()) / 1e6
+        print(f"-> {len(entry['files'])} fichiers, {total_mb:.1f} Mo en {time.perf_counter() - start:.1f} s")
+        model_store.save_manifest(manifest)
+
+
+def verify_all() -> bool:
+    all_valid = True
+    for name in model_store.load_manifest()['models']:
+        start = time.perf_counter()
+        problems = model_store.verify(name, full_checksum=True)
+        status = "OK" if not problems else "; ".join(problems)
+        print(f"- {name:<15}: {status} ({time.perf_counter() - start:.1f} s)")
+        all_valid = all_valid and not problems
+    return all_valid
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    if arguments == ['--verify']:
+        sys.exit(0 if verify_all() else 1)
+    prefetch(arguments or list(model_store.load_manifest()['models']))
@@ -0,0 +1,57 @@
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from agents.EmotionAgent import EmotionAgent
+from services.inference_server import MicroBatcher, InferenceServer, parse_address
+
+# Usage : python scripts/run_inference_server.py [hôte:port] [--allow-remote]
+# Charge le CNN émotionnel une seule fois et sert les workers Celery configurés avec
+# EMOTION_INFERENCE_ADDRESS. Les métriques (latence p50/p99, taille des lots) sont affichées
+# toutes les METRICS_INTERVAL secondes. EMOTION_INFERENCE_AUTHKEY est obligatoire, et une adresse
+# hors boucle locale n'est acceptée qu'avec --allow-remote.
+
+METRICS_INTERVAL = 60
+
+
+def report_metrics(batcher: MicroBatcher):
+    while True:
+        time.sleep(METRICS_INTERVAL)
+        print(f"[Inférence] Métriques : {batcher.metrics()}")
+
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if arg != '--allow-remote']
+    address = args[0] if args else (Config.EMOTION_INFERENCE_ADDRESS or 'localhost:6010')
+    if not Config.EMOTION_INFERENCE_AUTHKEY:
+        print("ERREUR: EMOTION_INFERENCE_AUTHKEY n'est pas définie, le serveur ne peut pas démarrer.")
+        sys.exit(1)
+
+    emotion_agent = EmotionAgent(backend=Config.EMOTION_CNN_BACKEND)
+    emotion_agent._load_model()
+    if not emotion_agent.cnn_model:
+        print("ERREUR: Modèle CNN indisponible, le serveur ne peut pas démarrer.")
+        sys.exit(1)
+
+    batcher = MicroBatcher(
+        lambda batch: emotion_agent.cnn_model.predict(batch, verbose=0),
+        max_batch_size=Config.INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms=Config.INFERENCE_MAX_WAIT_MS
+    )
+    # Premier appel à blanc : le graphe (TensorFlow ou onnxruntime) est construit avant la première requête réelle
+    batcher.predict(np.zeros((1, 128, 174, 1), dtype=np.float32))
+
+    server = InferenceServer(batcher, Config.EMOTION_INFERENCE_AUTHKEY.encode(), parse_address(address),
+                             allow_remote='--allow-remote' in sys.argv)
+    threading.Thread(target=report_metrics, args=(batcher,), daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n[Inférence] Arrêt du serveur. Métriques finales : {batcher.metrics()}")
+    finally:
+        server.close()
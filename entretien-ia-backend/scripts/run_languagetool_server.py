@@ -0,0 +1,50 @@
+import glob
+import os
+import sys
+from urllib.parse import urlparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from utils import model_store
+
+# Usage : python scripts/run_languagetool_server.py [port] [options du serveur LanguageTool...]
+# Lance un seul serveur LanguageTool (une JVM) partagé par tous les workers configurés avec
+# LANGUAGETOOL_URL=http://localhost:<port>. Les options suivantes sont transmises telles quelles
+# à org.languagetool.server.HTTPServer : sans --public, le serveur n'écoute que sur localhost.
+# Le jar est cherché dans le magasin de modèles (models/languagetool), puis dans LTP_PATH,
+# puis dans le cache de language_tool_python (téléchargé au besoin).
+
+DEFAULT_PORT = 8081
+JAVA_OPTIONS = os.getenv('LANGUAGETOOL_JAVA_OPTS', '-Xmx1g').split()
+
+
+def find_server_jar() -> str:
+    search_dirs = [model_store.resolve('languagetool', None), os.getenv('LTP_PATH'),
+                   os.path.join(os.path.expanduser('~'), '.cache', 'language_tool_python')]
+    for search_dir in filter(None, search_dirs):
+        jars = sorted(glob.glob(os.path.join(search_dir, 'LanguageTool-*', 'languagetool-server.jar')))
+        if jars:
+            return jars[-1]
+    return None
+
+
+if __name__ == '__main__':
+    default_port = urlparse(Config.LANGUAGETOOL_URL).port if Config.LANGUAGETOOL_URL else None
+    server_args = sys.argv[1:]
+    port = int(server_args.pop(0)) if server_args and server_args[0].isdigit() else (default_port or DEFAULT_PORT)
+
+    server_jar = find_server_jar()
+    if server_jar is None:
+        print("-> LanguageTool introuvable localement, téléchargement via language_tool_python...")
+        import language_tool_python
+        language_tool_python.LanguageTool('fr-FR').close()
+        server_jar = find_server_jar()
+    if server_jar is None:
+        print("ERREUR: languagetool-server.jar introuvable, le serveur ne peut pas démarrer.")
+        sys.exit(1)
+
+    command = ['java', *JAVA_OPTIONS, '-cp', server_jar, 'org.languagetool.server.HTTPServer',
+               '--port', str(port), *server_args]
+    print(f"[LanguageTool] Démarrage du serveur sur http://localhost:{port} ({server_jar})...")
+    os.execvp('java', command)
@@ -167,6 +167,14 @@ def train_main():
     model.save(CNN_MODEL_SAVE_PATH)
     joblib.dump(label_encoder, LABEL_ENCODER_PATH)
     print(f"\nModèle CNN et LabelEncoder sauvegardés.")
+
+    # Export ONNX à côté du .h5 : les workers n'ont plus besoin d'importer TensorFlow
+    try:
+        from scripts.export_emotion_onnx import export_to_onnx, check_parity
+        export_to_onnx(model)
+        check_parity(model)
+    except ImportError as e:
+        print(f"AVERTISSEMENT: Export ONNX ignoré ({e}). Installez tf2onnx puis lancez 'scripts/export_emotion_onnx.py'.")
     
     plot_training_history(history, TRAINING_PLOT_PATH)
     
@@ -1,50 +1,399 @@
 import os
-import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import numpy as np
-import torch
-import torchaudio
-from database.models import db, Sessions, Reports, Questions, Answers, AudioFeatures, EmotionScores, FacialFeatures
-from agents.NLPAgent import NLPAgent
-from agents.AudioAgent import AudioAgent
-from agents.EmotionAgent import EmotionAgent
-from agents.RapportAgent import RapportAgent
-from agents.VideoAgent import VideoAgent
+from flask import current_app
+from sqlalchemy import update
+from database.models import db, Sessions, Reports, Questions, Answers, AudioFeatures, EmotionScores, FacialFeatures, InterviewSegments
+from services import model_registry, embedding_service, timeline_service, media_service, checkpoint_service
+from utils.pitch import PitchTrack
+from utils.vocal_metrics import vocal_metrics
+from utils.vector_db import read_vector_db_version
+
+# --- RAG --- Catégories qui nécessitent une vérification factuelle
+RAG_CATEGORIES = ['Motivation', 'Culture d\'entreprise']
+EXECUTOR_MODES = ('sequential', 'thread', 'process')
+VIDEO_BRANCH_MODES = ('inline', 'thread', 'process')
+EMOTION_MODES = ('global', 'windowed')
+TRANSCRIPTION_MODES = ('global', 'windowed')
+# Résultats par réponse communs à Answers et InterviewSegments (segments analysés pendant l'entretien)
+ANSWER_RESULT_FIELDS = ('transcription', 'score_pertinence', 'pertinence_explication', 'score_grammaire',
+                        'erreurs_grammaire', 'speech_rate', 'pause_count')
+# Pools de processus du registre utilisés par ANALYSIS_EXECUTOR='process' et ANALYSIS_VIDEO_BRANCH='process'
+ANSWER_POOL_NAME = 'answers'
+VIDEO_POOL_NAME = 'video'
+# Écart toléré (s) entre le début noté sur un segment et celui de sa question dans events_timeline
+SEGMENT_TIMESTAMP_TOLERANCE = 1.0
+# Réglages dont dépend chaque étape sauvegardée : les modifier invalide le checkpoint correspondant
+TRANSCRIPTION_SETTINGS = ('TRANSCRIPTION_MODE', 'TRANSCRIPTION_WINDOW_OVERLAP', 'WHISPER_MODEL_SIZE', 'WHISPER_ENGINE',
+                          'WHISPER_BEAM_SIZE', 'WHISPER_VAD_FILTER', 'WHISPER_BATCH_SIZE')
+EMOTION_SETTINGS = ('EMOTION_MODE', 'EMOTION_WINDOW_SECONDS', 'EMOTION_HOP_SECONDS', 'EMOTION_CNN_BACKEND')
 
 def get_agents():
-    print("Initialisation des instances d'agents pour cette tâche...")
-    nlp_agent = NLPAgent(model_size="small")
-    audio_agent = AudioAgent()
-    emotion_agent = EmotionAgent()
-    rapport_agent = RapportAgent()
-    video_agent = VideoAgent()
-    return nlp_agent, audio_agent, emotion_agent, rapport_agent, video_agent
+    """
+    Retourne les agents partagés du processus courant (chargés une seule fois par worker).
+    """
+    return model_registry.get_agents()
+
+
+def _score_relevance(nlp_agent, answer_jobs: list, questions_map: dict) -> tuple:
+    """
+    Calcule la pertinence de toutes les réponses de la session en un seul batch d'embeddings.
+    Les questions RAG sont d'abord comparées à une référence générée depuis la base de connaissances,
+    les autres à la réponse idéale de la question, dont l'embedding est lu depuis question_embeddings.
+    Retourne (scores, explications) dans l'ordre des réponses.
+    """
+    pairs = [(job['ideal_answer'], job['response_text']) for job in answer_jobs]
+    explanations = [None] * len(answer_jobs)
+
+    simple_questions = [questions_map[job['question_id']] for job in answer_jobs if job['category'] not in RAG_CATEGORIES]
+    ideal_embeddings = embedding_service.get_ideal_answer_embeddings(simple_questions)
+    reference_embeddings = [
+        ideal_embeddings.get(job['question_id']) if job['category'] not in RAG_CATEGORIES else None
+        for job in answer_jobs
+    ]
+
+    # --- RAG --- Logique Hybride : on remplace la référence pour les catégories factuelles
+    rag_indices = [i for i, job in enumerate(answer_jobs) if job['category'] in RAG_CATEGORIES]
+    if rag_indices:
+        print(f"-> Analyse RAG pour {len(rag_indices)} question(s), sémantique simple pour {len(answer_jobs) - len(rag_indices)}.")
+        rag_pairs, rag_explanations = nlp_agent.build_rag_pairs(
+            [answer_jobs[i]['intitule'] for i in rag_indices],
+            [answer_jobs[i]['response_text'] for i in rag_indices]
+        )
+        for i, pair, explanation in zip(rag_indices, rag_pairs, rag_explanations):
+            pairs[i] = pair
+            explanations[i] = explanation
+
+    return nlp_agent.analyze_relevance_batch(pairs, reference_embeddings=reference_embeddings), explanations
+
+
+def _analyze_answer(job: dict) -> dict:
+    """
+    Analyse vocale d'une réponse. Les appels sont indépendants les uns des autres et n'utilisent
+    aucun modèle (arithmétique d'intervalles sur la passe VAD globale) : la fonction peut tourner
+    dans un thread ou un processus séparé sans y charger d'agent. La grammaire est vérifiée à part,
+    pour toute la session en une fois (analyze_grammar_batch).
+    """
+    return {
+        'vocal_features': vocal_metrics(
+            job['speech_intervals'], *job['window'], job['response_text'], job['sample_rate'],
+            job['pause_threshold'], pitch_track=job['pitch_track'], audio_chunk=job['audio_chunk']
+        )
+    }
+
+
+def _answer_job(question, response_text: str, window_times: tuple, decoded_audio, speech_intervals, pitch_track,
+                sample_rate: int, pause_threshold: float) -> dict:
+    """
+    Données nécessaires à l'analyse d'une réponse dont la fenêtre [début, fin) est donnée en secondes.
+    """
+    start_time, end_time = window_times
+    start_sample, end_sample = int(start_time * sample_rate), int(end_time * sample_rate)
+    in_window = (speech_intervals[:, 1] > start_sample) & (speech_intervals[:, 0] < end_sample)
+    return {
+        'question_id': question.id,
+        'category': question.category,
+        'intitule': question.intitule,
+        'ideal_answer': question.ideal_answer,
+        'response_text': response_text,
+        'window': (start_sample, end_sample),
+        'sample_rate': sample_rate,
+        'pause_threshold': pause_threshold,
+        'speech_intervals': speech_intervals[in_window],
+        'pitch_track': pitch_track.window(start_time, end_time) if pitch_track else None,
+        # Audio brut seulement pour le moteur 'piptrack' ; slice() copie la fenêtre pour ne pas
+        # sérialiser tout le buffer en mode 'process'
+        'audio_chunk': decoded_audio.slice(start_time, end_time).samples if pitch_track is None else None
+    }
+
+
+def _answer_record(job: dict, relevance_score, relevance_explanation, grammar_analysis: dict, vocal_features: dict) -> dict:
+    return {
+        'question_id': job['question_id'],
+        'transcription': job['response_text'],
+        'score_pertinence': relevance_score,
+        'pertinence_explication': relevance_explanation,
+        'score_grammaire': grammar_analysis['grammar_score'],
+        'erreurs_grammaire': grammar_analysis['errors'],
+        'speech_rate': vocal_features.get('speech_rate'),
+        'pause_count': vocal_features.get('pause_count'),
+        'average_pause_duration': vocal_features.get('average_pause_duration')
+    }
+
+
+def _segment_record(segment: InterviewSegments) -> dict:
+    record = {field: getattr(segment, field) for field in ANSWER_RESULT_FIELDS}
+    record.update(question_id=segment.question_id, average_pause_duration=segment.average_pause_duration)
+    return record
+
+
+def _load_analyzed_segments(session: Sessions, events: list) -> dict:
+    """
+    Segments de la tentative courante déjà analysés pendant l'entretien, par position dans la timeline.
+    Un segment n'est réutilisé que s'il porte la question attendue à cette position et s'il a commencé
+    au même instant de l'enregistrement complet (à SEGMENT_TIMESTAMP_TOLERANCE près) ; sinon la
+    question est retranscrite depuis l'enregistrement complet.
+    """
+    segments = db.session.execute(
+        db.select(InterviewSegments).filter_by(session_id=session.id, tentative=session.tentatives_realisees, statut='analyzed')
+    ).scalars().all()
+    return {
+        segment.question_index: segment for segment in segments
+        if segment.question_index < len(events)
+        and events[segment.question_index].get('questionId') == segment.question_id
+        and abs(float(events[segment.question_index].get('timestamp', 0)) - segment.timestamp) <= SEGMENT_TIMESTAMP_TOLERANCE
+    }
+
+
+class _AnswerJobRunner:
+    """
+    Exécute _analyze_answer au fil de l'eau selon ANALYSIS_EXECUTOR ('sequential', 'thread'
+    ou 'process') avec au plus ANALYSIS_MAX_WORKERS workers : chaque réponse est soumise dès que
+    sa fenêtre de transcription est close. results() restitue les résultats dans l'ordre de soumission.
+    """
+    def __init__(self):
+        mode = current_app.config.get('ANALYSIS_EXECUTOR', 'sequential')
+        if mode not in EXECUTOR_MODES:
+            print(f"AVERTISSEMENT: Mode d'exécution '{mode}' inconnu. Utilisation du mode 'sequential'.")
+            mode = 'sequential'
+        self.mode = mode
+        self.max_workers = max(1, current_app.config.get('ANALYSIS_MAX_WORKERS', 4))
+        self.executor = None
+        self.submitted = []
+
+        if self.mode == 'process':
+            # Pool du registre, partagé entre les analyses du worker ; _analyze_answer n'a besoin d'aucun agent
+            self.executor = model_registry.get_process_pool(ANSWER_POOL_NAME, self.max_workers)
+        elif self.mode == 'thread':
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='answer-analysis')
+        if self.executor:
+            print(f"-> Analyse des réponses en mode '{self.mode}' ({self.max_workers} workers).")
 
+    def _fall_back_to_threads(self, error):
+        # Les workers Celery prefork étant démoniques, la création de processus enfants peut être refusée
+        print(f"AVERTISSEMENT: Pool de processus indisponible ({error}). Bascule en mode 'thread'.")
+        model_registry.discard_process_pool(ANSWER_POOL_NAME)
+        self.mode = 'thread'
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='answer-analysis')
+        self.submitted = [(job, self.executor.submit(_analyze_answer, job)) for job, _ in self.submitted]
 
-def convert_to_wav(source_path: str) -> str:
+    def submit(self, job: dict):
+        if self.executor is None:
+            self.submitted.append((job, _analyze_answer(job)))
+            return
+        try:
+            self.submitted.append((job, self.executor.submit(_analyze_answer, job)))
+        except (AssertionError, OSError, BrokenProcessPool) as e:
+            self.submitted.append((job, None))
+            self._fall_back_to_threads(e)
+
+    def results(self) -> list:
+        if self.executor is None:
+            return [result for _, result in self.submitted]
+        try:
+            return [future.result() for _, future in self.submitted]
+        except BrokenProcessPool as e:
+            self._fall_back_to_threads(e)
+            return [future.result() for _, future in self.submitted]
+
+    def shutdown(self):
+        if self.mode == 'process':
+            # Le pool survit à l'analyse : seules les réponses encore en attente sont annulées
+            for _, future in self.submitted:
+                if future is not None:
+                    future.cancel()
+        elif self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _analyze_gaze(media_path: str, events: list, stop_event=None):
+    """
+    Branche vidéo du pipeline : ne dépend que du fichier original et de la timeline.
+    """
+    return model_registry.get_agent('video').analyze_gaze(media_path, events, stop_event=stop_event)
+
+
+def _start_video_branch(media_path: str, events: list, stop_event):
     """
-    Convertit un fichier média en un fichier WAV mono 16kHz temporaire.
+    Lance l'analyse du regard en parallèle de la branche audio/NLP selon ANALYSIS_VIDEO_BRANCH
+    ('inline', 'thread' ou 'process'). Retourne (executor, future) : executor est le pool de thread
+    à arrêter en fin d'analyse, None pour le pool de processus du registre (partagé entre les analyses)
+    et en mode 'inline', où future est aussi None.
+    En mode 'thread', `stop_event` interrompt l'analyse : le VideoAgent du registre est partagé
+    avec les analyses suivantes du worker et ne doit plus être utilisé par ce thread après l'échec.
     """
-    if not os.path.exists(source_path):
-        raise FileNotFoundError(f"Fichier source introuvable pour la conversion: {source_path}")
+    mode = current_app.config.get('ANALYSIS_VIDEO_BRANCH', 'thread')
+    if mode not in VIDEO_BRANCH_MODES:
+        print(f"AVERTISSEMENT: Mode de branche vidéo '{mode}' inconnu. Utilisation du mode 'inline'.")
+        mode = 'inline'
+    if mode == 'inline':
+        return None, None
 
-    directory = os.path.dirname(source_path)
-    filename_without_ext = os.path.splitext(os.path.basename(source_path))[0]
-    temp_wav_path = os.path.join(directory, f"{filename_without_ext}_temp.wav")
+    if mode == 'process':
+        # Processus du registre : MediaPipe y est chargé une fois pour toutes les analyses du worker
+        try:
+            future = model_registry.get_process_pool(VIDEO_POOL_NAME, 1, ('video',)).submit(_analyze_gaze, media_path, events)
+            print("-> Branche vidéo (regard) lancée dans un processus dédié.")
+            return None, future
+        except (AssertionError, OSError, BrokenProcessPool) as e:
+            # Refusé notamment sous Celery prefork, dont les workers démoniques ne peuvent pas avoir d'enfants
+            model_registry.discard_process_pool(VIDEO_POOL_NAME)
+            print(f"AVERTISSEMENT: Processus vidéo indisponible ({e}). Bascule en mode 'thread'.")
 
-    command = ["ffmpeg", "-i", source_path, "-ar", "16000", "-ac", "1", "-y", temp_wav_path]
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='video-branch')
+    future = executor.submit(_analyze_gaze, media_path, events, stop_event)
+    print("-> Branche vidéo (regard) lancée dans un thread dédié.")
+    return executor, future
 
-    print(f"Exécution de la conversion : {' '.join(command)}")
+
+def _join_video_branch(gaze_future, media_path: str, events: list):
+    """
+    Attend le résultat de la branche vidéo. Si le processus dédié a planté,
+    l'analyse est refaite dans le processus courant.
+    """
+    if gaze_future is None:
+        return _analyze_gaze(media_path, events)
     try:
-        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        print(f"Conversion en WAV réussie : {temp_wav_path}")
-        return temp_wav_path
-    except (subprocess.CalledProcessError, FileNotFoundError) as e:
-        raise Exception(f"La conversion avec ffmpeg a échoué. Assurez-vous que ffmpeg est installé et dans le PATH. Erreur: {e}")
+        return gaze_future.result()
+    except BrokenProcessPool as e:
+        model_registry.discard_process_pool(VIDEO_POOL_NAME)
+        print(f"AVERTISSEMENT: Le processus vidéo s'est arrêté ({e}). Nouvelle analyse dans le processus courant.")
+        return _analyze_gaze(media_path, events)
+
+
+def _predict_emotions(emotion_agent, decoded_audio, events: list) -> dict:
+    """
+    Prédiction émotionnelle selon EMOTION_MODE : 'global' (une prédiction sur tout l'enregistrement)
+    ou 'windowed' (fenêtres glissantes classées en lot, agrégées globalement et par question).
+    """
+    mode = current_app.config.get('EMOTION_MODE', 'global')
+    if mode not in EMOTION_MODES:
+        print(f"AVERTISSEMENT: Mode émotionnel '{mode}' inconnu. Utilisation du mode 'global'.")
+        mode = 'global'
+
+    if mode == 'windowed':
+        emotion_timeline = emotion_agent.predict_emotion_timeline(
+            decoded_audio,
+            window_seconds=current_app.config.get('EMOTION_WINDOW_SECONDS', 3.0),
+            hop_seconds=current_app.config.get('EMOTION_HOP_SECONDS', 1.5)
+        )
+        summary = timeline_service.summarize_emotion_timeline(emotion_timeline, events) if emotion_timeline else None
+        if summary:
+            print(f"-> {len(summary['timeline']['starts'])} fenêtres émotionnelles analysées en lot.")
+            return summary
+        print("AVERTISSEMENT: Analyse émotionnelle fenêtrée impossible. Repli sur la prédiction globale.")
+
+    return emotion_agent.predict_emotion(decoded_audio)
+
+
+def _transcribe_window(nlp_agent, decoded_audio, window: tuple, overlap: float) -> list:
+    start_time, end_time = window
+    padded_start = max(0.0, start_time - overlap)
+    padded_end = min(decoded_audio.duration, end_time + overlap)
+    segments, _ = nlp_agent.transcribe_media(decoded_audio.slice(padded_start, padded_end))
+    return timeline_service.stitch_window_segments(segments or [], window, padded_start)
+
+
+def _transcribe_windowed(nlp_agent, decoded_audio, events: list, overlap: float, max_workers: int,
+                         stored_transcriptions: dict = None):
+    """
+    Transcription par question : chaque fenêtre de la timeline (élargie de `overlap` secondes de
+    chaque côté pour ne pas couper un mot) est transcrite en parallèle par des threads partageant
+    le même modèle CTranslate2, qui libère le GIL pendant le décodage (WHISPER_NUM_WORKERS
+    détermine combien de fenêtres il décode réellement en même temps).
+    Les fenêtres présentes dans `stored_transcriptions` ({fenêtre: texte}, segments déjà analysés
+    pendant l'entretien) ne sont pas retranscrites.
+    Générateur de segments en temps absolu, restitués dans l'ordre de la timeline dès que
+    leur fenêtre est prête, pour que le routage des réponses reste en flux.
+    """
+    stored_transcriptions = stored_transcriptions or {}
+    windows = timeline_service.transcription_windows(events, decoded_audio.duration)
+    pending = [window for window in windows if window not in stored_transcriptions]
+    print(f"-> Transcription par question : {len(pending)}/{len(windows)} fenêtre(s) à transcrire, {max_workers} worker(s).")
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='whisper-window')
+    try:
+        futures = {window: executor.submit(_transcribe_window, nlp_agent, decoded_audio, window, overlap) for window in pending}
+        for window in windows:
+            if window in futures:
+                yield from futures[window].result()
+            else:
+                yield timeline_service.TranscriptSegment(window[0], window[1], stored_transcriptions[window] or "")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _transcription_mode(stored_segments: dict = None) -> str:
+    """
+    Mode de transcription effectif selon TRANSCRIPTION_MODE ('global' : un seul décodage de tout
+    l'entretien, 'windowed' : une fenêtre par question en parallèle). Si des segments ont déjà été
+    analysés pendant l'entretien, le mode 'windowed' est imposé pour ne transcrire que les questions manquantes.
+    """
+    mode = current_app.config.get('TRANSCRIPTION_MODE', 'global')
+    if mode not in TRANSCRIPTION_MODES:
+        print(f"AVERTISSEMENT: Mode de transcription '{mode}' inconnu. Utilisation du mode 'global'.")
+        mode = 'global'
+    return 'windowed' if stored_segments else mode
+
+
+def _transcribe(nlp_agent, decoded_audio, events: list, mode: str, stored_segments: dict = None) -> tuple:
+    """
+    Transcription dans le mode donné par _transcription_mode. Retourne (segments, durée du média).
+    """
+    if mode == 'windowed':
+        stored_transcriptions = {
+            timeline_service.question_window(events, index, decoded_audio.duration): segment.transcription
+            for index, segment in (stored_segments or {}).items()
+        }
+        segments = _transcribe_windowed(
+            nlp_agent, decoded_audio, events,
+            overlap=current_app.config.get('TRANSCRIPTION_WINDOW_OVERLAP', 0.5),
+            max_workers=max(1, current_app.config.get('WHISPER_NUM_WORKERS', 1)),
+            stored_transcriptions=stored_transcriptions
+        )
+        return segments, decoded_audio.duration
+
+    segments, info = nlp_agent.transcribe_media(decoded_audio)
+    if info is None:
+        raise RuntimeError("La transcription de l'entretien a échoué (voir l'erreur ci-dessus).")
+    return segments, info.duration
+
+
+def _settings(names: tuple) -> dict:
+    return {name: current_app.config.get(name) for name in names}
+
+
+def _nlp_settings(nlp_agent) -> dict:
+    """
+    Réglages effectifs de l'agent NLP partagé (après ses replis sur les valeurs par défaut) : modèle
+    et options Whisper, LanguageTool et modèles de pertinence, dont dépendent les checkpoints
+    'transcription' et 'answers'.
+    """
+    return {
+        'whisper': {'model_size': nlp_agent.model_size, 'engine': nlp_agent.transcription_engine,
+                    'beam_size': nlp_agent.beam_size, 'vad_filter': nlp_agent.vad_filter,
+                    'batch_size': nlp_agent.batch_size},
+        'grammar': {'language': nlp_agent.grammar_tool_lang, 'server_url': nlp_agent.grammar_server_url},
+        'relevance': {'semantic_model': nlp_agent.semantic_model_name, 'rag_llm': nlp_agent.llm_model_name_rag}
+    }
+
+
+def _recorded(segments, sink: list):
+    """
+    Laisse passer les segments de transcription en flux tout en les copiant dans `sink` pour le checkpoint.
+    """
+    for segment in segments:
+        sink.append((segment.start, segment.end, segment.text))
+        yield segment
 
 
 def run_analysis(session_id: int):
     print(f"--- DÉBUT DE L'ANALYSE COMPLÈTE - SESSION ID: {session_id} ---")
-    nlp_agent, audio_agent, emotion_agent, rapport_agent, videoAgent = get_agents()
+    # L'agent vidéo n'est chargé que par la branche vidéo, dans le processus qui l'exécute
+    nlp_agent, audio_agent, emotion_agent, rapport_agent = (
+        model_registry.get_agent(name) for name in ('nlp', 'audio', 'emotion', 'rapport')
+    )
     session = db.session.get(Sessions, session_id)
     if not session: return None
 
@@ -59,86 +408,159 @@ def run_analysis(session_id: int):
     session.statut = 'analyzing'
     db.session.commit()
     
-    wav_path_for_analysis = None
+    video_executor = None
+    gaze_future = None
+    gaze_stop = threading.Event()
+    decoded_audio = None
+
+    def get_decoded_audio():
+        # ÉTAPE 0 : DÉCODAGE UNIQUE DU MÉDIA, à la première étape qui en a besoin (aucune si tout est en checkpoint)
+        # Un seul appel ffmpeg : le buffer 16 kHz est ensuite partagé par Whisper, le VAD et l'agent émotionnel
+        nonlocal decoded_audio
+        if decoded_audio is None:
+            print("\n[Étape 0/5] Conversion et Chargement Audio...")
+            decoded_audio = media_service.decode_audio(absolute_media_path)
+            print(f"-> Audio chargé en mémoire ({decoded_audio.duration:.1f} s).")
+        return decoded_audio
+
     try:
-        # ÉTAPE 0 : CONVERSION & CHARGEMENT
-        print("\n[Étape 0/5] Conversion et Chargement Audio...")
-        wav_path_for_analysis = convert_to_wav(absolute_media_path)
-        wav_tensor, sr = torchaudio.load(wav_path_for_analysis)
-        if sr != audio_agent.sr: wav_tensor = torchaudio.transforms.Resample(sr, audio_agent.sr)(wav_tensor)
-        if wav_tensor.shape[0] > 1: wav_tensor = torch.mean(wav_tensor, dim=0, keepdim=True)
-        wav_tensor = wav_tensor.float()
-        print("-> Audio chargé en mémoire.")
-
-        # ÉTAPE 1 : TRANSCRIPTION GLOBALE
-        print("\n[Étape 1/6] Transcription globale...")
-        segments, info = nlp_agent.transcribe_media(wav_path_for_analysis)
-        list_of_segments = list(segments)
-        full_transcription = " ".join([s.text.strip() for s in list_of_segments])
-        print("-> Transcription terminée.")
+        # Checkpoints des étapes, valides pour ce fichier média précis (voir checkpoint_service).
+        # Le média n'est haché que si les checkpoints sont activés
+        checkpoints_enabled = current_app.config.get('PIPELINE_CHECKPOINTS', True)
+        checkpoints = checkpoint_service.PipelineCheckpoints(
+            session_id, checkpoint_service.file_hash(absolute_media_path) if checkpoints_enabled else None,
+            enabled=checkpoints_enabled
+        )
+
+        # La branche vidéo n'utilise que le fichier original : elle tourne pendant l'audio/NLP
+        gaze_inputs = {'events': events, 'video': _settings(('VIDEO_SAMPLING_MODE',))}
+        gaze_analysis_results = checkpoints.load('gaze', gaze_inputs)
+        if gaze_analysis_results is None:
+            video_executor, gaze_future = _start_video_branch(absolute_media_path, events, gaze_stop)
+
+        # Passe VAD et courbe de f0 calculées une fois : les métriques par question en sont des tranches
+        audio_inputs = {'vad_backend': audio_agent.vad_backend, 'pitch_engine': audio_agent.pitch_engine}
+        audio_checkpoint = checkpoints.load('audio_features', audio_inputs)
+        if audio_checkpoint:
+            speech_intervals = np.asarray(audio_checkpoint['speech_intervals'], dtype=np.int64).reshape(-1, 2)
+            pitch_track = PitchTrack(np.asarray(audio_checkpoint['f0']), audio_checkpoint['sample_rate'],
+                                     audio_checkpoint['hop_length']) if audio_checkpoint['f0'] is not None else None
+        else:
+            speech_intervals = audio_agent.detect_speech(get_decoded_audio())
+            pitch_track = audio_agent.compute_pitch_track(get_decoded_audio())
+            checkpoints.save('audio_features', audio_inputs, {
+                'speech_intervals': speech_intervals,
+                'f0': np.round(pitch_track.f0, 2) if pitch_track else None,
+                'sample_rate': pitch_track.sample_rate if pitch_track else audio_agent.sr,
+                'hop_length': pitch_track.hop_length if pitch_track else None
+            })
+        print(f"-> {len(speech_intervals)} segments de parole détectés.")
 
-        # ÉTAPE 2 : ANALYSE DÉTAILLÉE PAR QUESTION/RÉPONSE (AVEC LOGIQUE RAG)
-        print("\n[Étape 2/6] Analyse détaillée par question (Logique Hybride RAG)...")
         questions = db.session.execute(db.select(Questions).filter(Questions.id.in_(session.questions_ids))).scalars().all()
         questions_map = {q.id: q for q in questions}
+        # Réponses déjà transcrites et notées pendant l'entretien (upload par segments)
+        stored_segments = _load_analyzed_segments(session, events)
+        if stored_segments:
+            print(f"-> {len(stored_segments)} question(s) déjà analysée(s) pendant l'entretien, résultats réutilisés.")
+
+        transcription_inputs = {
+            'events': events, 'settings': _settings(TRANSCRIPTION_SETTINGS), 'nlp': _nlp_settings(nlp_agent)['whisper'],
+            'stored_segments': sorted((index, segment.id, segment.transcription) for index, segment in stored_segments.items())
+        }
+        answers_inputs = {
+            'transcription': transcription_inputs, 'audio': audio_inputs, 'nlp': _nlp_settings(nlp_agent),
+            'questions': sorted((q.id, q.category, q.intitule, q.ideal_answer) for q in questions),
+            'vector_db_version': read_vector_db_version(nlp_agent.vector_db_path)
+        }
+        answers_checkpoint = checkpoints.load('answers', answers_inputs)
+
+        # ÉTAPE 1 : TRANSCRIPTION (EN FLUX, GLOBALE OU PAR QUESTION)
+        # ÉTAPE 2 : ANALYSE DÉTAILLÉE PAR QUESTION/RÉPONSE (AVEC LOGIQUE RAG)
+        # Les segments sont routés vers leur question au fil du décodage : l'analyse vocale et
+        # grammaticale d'une réponse démarre dès que Whisper a dépassé la fin de sa fenêtre.
+        print("\n[Étape 1/6] Transcription...")
+        print("\n[Étape 2/6] Analyse détaillée par question (Logique Hybride RAG)...")
+        if answers_checkpoint:
+            records = answers_checkpoint['records']
+            full_transcription = answers_checkpoint['full_transcription']
+        else:
+            transcription_mode = _transcription_mode(stored_segments)
+            transcription_checkpoint = checkpoints.load('transcription', transcription_inputs)
+            transcribed_segments = []
+            if transcription_checkpoint:
+                segments = [timeline_service.TranscriptSegment(*segment) for segment in transcription_checkpoint['segments']]
+                media_duration = transcription_checkpoint['duration']
+            else:
+                segments, media_duration = _transcribe(nlp_agent, get_decoded_audio(), events, transcription_mode, stored_segments)
+                segments = _recorded(segments, transcribed_segments)
 
-        # --- RAG --- On définit les catégories qui nécessitent une vérification factuelle
-        RAG_CATEGORIES = ['Motivation', 'Culture d\'entreprise']
+            # Segments recollés par fenêtre : routés par leur centre, comme stitch_window_segments les a gardés
+            segment_router = timeline_service.SegmentRouter(events, media_duration,
+                                                            by_midpoint=transcription_mode == 'windowed')
+            answer_runner = _AnswerJobRunner()
+            answer_jobs = []
+            # Ordre de la timeline : ('job', indice dans answer_jobs) ou ('segment', InterviewSegments)
+            answer_order = []
+            try:
+                for i, response_text in segment_router.route(segments):
+                    question = questions_map.get(events[i]['questionId'])
+                    if not question: continue
+                    if not response_text.strip(): continue
+                    if i in stored_segments:
+                        answer_order.append(('segment', stored_segments[i]))
+                        continue
+
+                    job = _answer_job(question, response_text, segment_router.window(i),
+                                      get_decoded_audio() if pitch_track is None else None,
+                                      speech_intervals, pitch_track, audio_agent.sr, audio_agent.pause_threshold)
+                    answer_order.append(('job', len(answer_jobs)))
+                    answer_jobs.append(job)
+                    answer_runner.submit(job)
+
+                full_transcription = segment_router.full_transcription
+                print("-> Transcription terminée.")
+                if not transcription_checkpoint:
+                    checkpoints.save('transcription', transcription_inputs,
+                                     {'segments': transcribed_segments, 'duration': media_duration})
+
+                relevance_scores, relevance_explanations = _score_relevance(nlp_agent, answer_jobs, questions_map)
+                grammar_analyses = nlp_agent.analyze_grammar_batch([job['response_text'] for job in answer_jobs])
+                answer_results = answer_runner.results()
+            finally:
+                answer_runner.shutdown()
+
+            # Les réponses sont analysées en parallèle mais restituées dans l'ordre de la timeline
+            fresh_records = [
+                _answer_record(job, relevance_score, relevance_explanation, grammar_analysis, result['vocal_features'])
+                for job, relevance_score, relevance_explanation, grammar_analysis, result in zip(
+                    answer_jobs, relevance_scores, relevance_explanations, grammar_analyses, answer_results)
+            ]
+            records = [fresh_records[item] if kind == 'job' else _segment_record(item) for kind, item in answer_order]
+            checkpoints.save('answers', answers_inputs, {'records': records, 'full_transcription': full_transcription})
 
         db.session.query(Answers).filter_by(session_id=session_id).delete()
-        
         answers_analysis_list = []
-        for i, event in enumerate(events):
-            question = questions_map.get(event['questionId'])
-            if not question: continue
-
-            start_time = event['timestamp']
-            end_time = events[i + 1]['timestamp'] if i + 1 < len(events) else info.duration
-            response_text = " ".join([s.text.strip() for s in list_of_segments if s.start >= start_time and s.start < end_time])
-            if not response_text.strip(): continue
-
-            # --- RAG --- Logique Hybride : on choisit la bonne méthode d'analyse
-            if question.category in RAG_CATEGORIES:
-                print(f"-> Analyse RAG pour la question (cat: {question.category})")
-                # On passe maintenant les DEUX arguments : la question ET la réponse.
-                rag_analysis = nlp_agent.analyze_relevance_with_rag(question.intitule, response_text)
-                relevance_score = rag_analysis.get('score_pertinence_factuelle', 0.0)
-                relevance_explanation = rag_analysis.get('explication', '')
-            else:
-                print(f"-> Analyse Sémantique simple pour la question (cat: {question.category})")
-                relevance_score = nlp_agent.analyze_relevance(question.ideal_answer, response_text)
-                relevance_explanation = None
-            
-            # Analyses vocale et grammaticale sur le segment
-            start_sample = int(start_time * audio_agent.sr)
-            end_sample = int(end_time * audio_agent.sr)
-            audio_chunk = wav_tensor[:, start_sample:end_sample]
-            vocal_chunk_features = audio_agent.analyze_audio_chunk(audio_chunk, response_text)
-            grammar_analysis = nlp_agent.analyze_grammar(response_text)
-            
+        for record in records:
             answers_analysis_list.append({
-                'score_pertinence': relevance_score,
-                'score_grammaire': grammar_analysis['grammar_score'],
-                'speech_rate': vocal_chunk_features.get('speech_rate'),
-                'pause_count': vocal_chunk_features.get('pause_count'),
-                'average_pause_duration': vocal_chunk_features.get('average_pause_duration')
+                'score_pertinence': record['score_pertinence'],
+                'score_grammaire': record['score_grammaire'],
+                'speech_rate': record['speech_rate'],
+                'pause_count': record['pause_count'],
+                'average_pause_duration': record['average_pause_duration']
             })
-
             db.session.add(Answers(
-                session_id=session_id, question_id=question.id, transcription=response_text,
-                score_pertinence=relevance_score,
-                pertinence_explication=relevance_explanation, 
-                score_grammaire=grammar_analysis['grammar_score'],
-                erreurs_grammaire=grammar_analysis['errors'],
-                speech_rate=vocal_chunk_features.get('speech_rate'),
-                pause_count=vocal_chunk_features.get('pause_count')
+                session_id=session_id, question_id=record['question_id'],
+                **{field: record[field] for field in ANSWER_RESULT_FIELDS}
             ))
         print(f"-> {len(answers_analysis_list)} réponses analysées en détail.")
         
         # --- ÉTAPE 3 - ANALYSE VISUELLE (REGARD) ---
         print("\n[Étape 3/6] Analyse visuelle du regard (MediaPipe)...")
-        # On utilise le fichier vidéo original, pas le WAV
-        gaze_analysis_results = videoAgent.analyze_gaze(absolute_media_path, events)
+        # On utilise le fichier vidéo original, pas le WAV : on rejoint la branche lancée en parallèle
+        if gaze_analysis_results is None:
+            gaze_analysis_results = _join_video_branch(gaze_future, absolute_media_path, events)
+            if gaze_analysis_results:
+                checkpoints.save('gaze', gaze_inputs, gaze_analysis_results)
         
         if gaze_analysis_results:
             # On sauvegarde les résultats
@@ -163,8 +585,20 @@ def run_analysis(session_id: int):
         global_total_pauses = sum([a['pause_count'] for a in answers_analysis_list if a.get('pause_count') is not None])
 
         # Analyses globales sur le fichier complet (pitch, émotion)
-        global_vocal_features = audio_agent.analyze_speech_vocal_characteristics(wav_path_for_analysis, full_transcription)
-        emotion_prediction = emotion_agent.predict_emotion(wav_path_for_analysis)
+        vocal_emotion_inputs = {'audio': audio_inputs, 'events': events, 'transcription': full_transcription,
+                                'settings': _settings(EMOTION_SETTINGS)}
+        vocal_emotion_checkpoint = checkpoints.load('vocal_emotion', vocal_emotion_inputs)
+        if vocal_emotion_checkpoint:
+            global_vocal_features = vocal_emotion_checkpoint['global_vocal_features']
+            emotion_prediction = vocal_emotion_checkpoint['emotion_prediction']
+        else:
+            global_vocal_features = audio_agent.analyze_speech_vocal_characteristics(
+                get_decoded_audio(), full_transcription, pitch_track=pitch_track, speech_intervals=speech_intervals
+            )
+            emotion_prediction = _predict_emotions(emotion_agent, get_decoded_audio(), events)
+            checkpoints.save('vocal_emotion', vocal_emotion_inputs, {
+                'global_vocal_features': global_vocal_features, 'emotion_prediction': emotion_prediction
+            })
         
         # ON CALCULE LA MOYENNE PONDÉRÉE DES DURÉES DE PAUSE
         total_pause_duration_sum = sum([(a.get('average_pause_duration', 0) or 0) * (a.get('pause_count', 0) or 0) for a in answers_analysis_list])
@@ -188,6 +622,8 @@ def run_analysis(session_id: int):
             db.session.add(emotion_scores_entry)
         emotion_scores_entry.dominant_emotion = emotion_prediction['dominant_emotion']
         emotion_scores_entry.scores = emotion_prediction['scores']
+        emotion_scores_entry.timeline = emotion_prediction.get('timeline')
+        emotion_scores_entry.scores_by_question = emotion_prediction.get('scores_by_question')
         
         print(f"-> Analyse vocale globale terminée : Débit moyen={global_avg_speech_rate:.2f} mots/min, Pauses totales={global_total_pauses}")
         print(f"-> Analyse émotionnelle terminée : Émotion dominante={emotion_prediction['dominant_emotion'].capitalize()}")
@@ -230,6 +666,74 @@ def run_analysis(session_id: int):
         print(f" ERREUR FATALE lors de l’analyse de la session {session_id}: {e}")
         return None
     finally:
-        if wav_path_for_analysis and os.path.exists(wav_path_for_analysis):
-            os.remove(wav_path_for_analysis)
-            print(f" Fichier temporaire supprimé : {wav_path_for_analysis}")
\ No newline at end of file
+        if video_executor:
+            # Le thread s'arrête à la frame suivante : on l'attend pour qu'il ne survive pas à l'analyse
+            gaze_stop.set()
+            video_executor.shutdown(wait=True, cancel_futures=True)
+        elif gaze_future:
+            gaze_future.cancel()
+
+def _update_current_segment(segment_id: int, fichier: str, values: dict) -> bool:
+    """
+    Écrit `values` sur le segment seulement s'il porte encore le fichier analysé : un nouvel envoi
+    de la même question (routes/upload.py) réinitialise la ligne et lance sa propre analyse.
+    """
+    result = db.session.execute(
+        update(InterviewSegments)
+        .where(InterviewSegments.id == segment_id, InterviewSegments.fichier == fichier)
+        .values(**values)
+    )
+    db.session.commit()
+    return result.rowcount > 0
+
+
+def analyze_segment(segment_id: int):
+    """
+    Analyse au fil de l'eau d'un segment envoyé pendant l'entretien (une question close) :
+    transcription, pertinence, grammaire et métriques vocales, stockées sur le segment.
+    run_analysis réutilise ensuite ces résultats et ne garde que l'agrégation globale.
+    """
+    segment = db.session.get(InterviewSegments, segment_id)
+    if not segment: return None
+    fichier = segment.fichier
+    question = db.session.get(Questions, segment.question_id)
+    if not question: raise Exception(f"Question {segment.question_id} introuvable pour le segment {segment_id}.")
+
+    print(f"--- ANALYSE DU SEGMENT {segment_id} (SESSION {segment.session_id}, QUESTION {segment.question_index}) ---")
+    if not _update_current_segment(segment_id, fichier, {'statut': 'analyzing'}):
+        print(f"AVERTISSEMENT: Segment {segment_id} remplacé avant son analyse, rien à faire.")
+        return None
+
+    try:
+        nlp_agent = model_registry.get_agent('nlp')
+        audio_agent = model_registry.get_agent('audio')
+        BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        decoded_audio = media_service.decode_audio(os.path.join(BASE_DIR, 'data', 'uploads', fichier))
+
+        segments, _ = nlp_agent.transcribe_media(decoded_audio)
+        response_text = " ".join(part.text.strip() for part in segments or [])
+        values = {'transcription': response_text}
+
+        if response_text.strip():
+            speech_intervals = audio_agent.detect_speech(decoded_audio)
+            pitch_track = audio_agent.compute_pitch_track(decoded_audio)
+            job = _answer_job(question, response_text, (0.0, decoded_audio.duration), decoded_audio,
+                              speech_intervals, pitch_track, audio_agent.sr, audio_agent.pause_threshold)
+            relevance_scores, relevance_explanations = _score_relevance(nlp_agent, [job], {question.id: question})
+            record = _answer_record(job, relevance_scores[0], relevance_explanations[0],
+                                    nlp_agent.analyze_grammar_batch([response_text])[0],
+                                    _analyze_answer(job)['vocal_features'])
+            values.update({field: record[field] for field in ANSWER_RESULT_FIELDS + ('average_pause_duration',)})
+
+        values['statut'] = 'analyzed'
+        if not _update_current_segment(segment_id, fichier, values):
+            print(f"AVERTISSEMENT: Segment {segment_id} renvoyé pendant son analyse, résultats ignorés.")
+            return None
+        print(f"-> Segment {segment_id} analysé ({len(response_text.split())} mots).")
+        return {"status": "success"}
+
+    except Exception as e:
+        db.session.rollback()
+        _update_current_segment(segment_id, fichier, {'statut': 'failed'})
+        print(f" ERREUR lors de l'analyse du segment {segment_id}: {e}")
+        return None
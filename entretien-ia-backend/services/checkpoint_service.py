@@ -0,0 +1,74 @@
+import hashlib
+import json
+import numpy as np
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from database.models import db, PipelineArtifacts
+
+# Étapes de run_analysis sauvegardées (la fusion des scores, peu coûteuse, est toujours recalculée)
+STAGES = ('audio_features', 'transcription', 'answers', 'gaze', 'vocal_emotion')
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def _to_builtin(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def file_hash(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def inputs_hash(inputs) -> str:
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=_to_builtin).encode('utf-8')).hexdigest()
+
+
+class PipelineCheckpoints:
+    """
+    Checkpoints des étapes d'une analyse dans la table pipeline_artifacts (une ligne par session et étape).
+    Un checkpoint n'est relu que si le hash du média et celui des entrées de l'étape (timeline, réglages,
+    questions...) sont inchangés ; sinon l'étape est recalculée et la ligne remplacée.
+    Les écritures passent par une session SQLAlchemy séparée, validée immédiatement : elles survivent
+    au rollback de run_analysis quand une étape suivante échoue.
+    Désactivés (enabled=False), load() et save() ne font rien et media_hash peut être None.
+    """
+    def __init__(self, session_id: int, media_hash: str, enabled: bool = True):
+        self.session_id = session_id
+        self.media_hash = media_hash
+        self.enabled = enabled
+
+    def _select(self, stage: str):
+        return db.select(PipelineArtifacts).filter_by(session_id=self.session_id, stage=stage)
+
+    def load(self, stage: str, inputs):
+        if not self.enabled:
+            return None
+        with Session(db.engine) as checkpoint_session:
+            artifact = checkpoint_session.execute(self._select(stage)).scalar_one_or_none()
+            if artifact is None or artifact.media_hash != self.media_hash or artifact.inputs_hash != inputs_hash(inputs):
+                return None
+            print(f"-> Étape '{stage}' reprise depuis son checkpoint.")
+            return artifact.payload
+
+    def save(self, stage: str, inputs, payload):
+        if not self.enabled:
+            return
+        payload = json.loads(json.dumps(payload, default=_to_builtin))
+        try:
+            with Session(db.engine) as checkpoint_session, checkpoint_session.begin():
+                artifact = checkpoint_session.execute(self._select(stage)).scalar_one_or_none()
+                if artifact is None:
+                    artifact = PipelineArtifacts(session_id=self.session_id, stage=stage)
+                    checkpoint_session.add(artifact)
+                artifact.media_hash = self.media_hash
+                artifact.inputs_hash = inputs_hash(inputs)
+                artifact.payload = payload
+        except SQLAlchemyError as e:
+            print(f"AVERTISSEMENT: Checkpoint de l'étape '{stage}' non sauvegardé : {e}")
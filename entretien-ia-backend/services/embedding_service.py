@@ -0,0 +1,86 @@
+import hashlib
+import numpy as np
+from database.models import db, QuestionEmbeddings
+from agents.NLPAgent import SEMANTIC_MODEL_NAME
+from services import model_registry
+from utils import model_store
+
+_standalone_model = None
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or '').strip().encode('utf-8')).hexdigest()
+
+
+def _encode(texts: list) -> np.ndarray:
+    """
+    Encode des textes avec le modèle sémantique du NLPAgent déjà chargé (worker Celery),
+    ou avec une instance SentenceTransformer autonome (scripts d'import).
+    """
+    global _standalone_model
+    nlp_agent = model_registry.peek_agent('nlp')
+    if nlp_agent is not None:
+        return nlp_agent.encode_texts(texts)
+
+    if _standalone_model is None:
+        from sentence_transformers import SentenceTransformer
+        print(f"Chargement du modèle sémantique '{SEMANTIC_MODEL_NAME}' pour les embeddings de questions...")
+        _standalone_model = SentenceTransformer(model_store.resolve('semantic', SEMANTIC_MODEL_NAME))
+    return _standalone_model.encode(list(texts), convert_to_numpy=True, normalize_embeddings=True, batch_size=64).astype(np.float32)
+
+
+def is_fresh(question) -> bool:
+    entry = question.embedding
+    return bool(
+        entry is not None and entry.embedding is not None and not entry.is_stale
+        and entry.model_name == SEMANTIC_MODEL_NAME
+        and entry.content_hash == content_hash(question.ideal_answer)
+    )
+
+
+def mark_stale(question):
+    """
+    Invalide l'embedding d'une question dont la réponse idéale vient d'être modifiée.
+    """
+    if question.embedding is not None:
+        question.embedding.is_stale = True
+
+
+def refresh_question_embeddings(questions: list) -> int:
+    """
+    Calcule en un seul batch les embeddings manquants ou périmés des questions données.
+    Les lignes sont ajoutées à la session SQLAlchemy ; le commit reste à la charge de l'appelant.
+    Retourne le nombre d'embeddings recalculés.
+    """
+    to_refresh = [q for q in questions if q.ideal_answer and q.ideal_answer.strip() and not is_fresh(q)]
+    if not to_refresh:
+        return 0
+
+    embeddings = _encode([q.ideal_answer for q in to_refresh])
+    if embeddings is None:
+        print("AVERTISSEMENT: Modèle sémantique indisponible, embeddings des questions non calculés.")
+        return 0
+
+    for question, vector in zip(to_refresh, embeddings):
+        entry = question.embedding or QuestionEmbeddings(question_id=question.id)
+        entry.content_hash = content_hash(question.ideal_answer)
+        entry.model_name = SEMANTIC_MODEL_NAME
+        entry.embedding = np.asarray(vector, dtype=np.float32).tobytes()
+        entry.is_stale = False
+        question.embedding = entry
+        db.session.add(entry)
+    return len(to_refresh)
+
+
+def get_ideal_answer_embeddings(questions: list) -> dict:
+    """
+    Retourne {question_id: embedding} pour les réponses idéales des questions,
+    en recalculant au passage ceux qui manquent ou sont périmés.
+    """
+    refreshed = refresh_question_embeddings(questions)
+    if refreshed:
+        print(f"-> {refreshed} embedding(s) de réponse idéale (re)calculé(s).")
+    return {
+        q.id: np.frombuffer(q.embedding.embedding, dtype=np.float32)
+        for q in questions if is_fresh(q)
+    }
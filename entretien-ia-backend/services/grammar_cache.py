@@ -0,0 +1,99 @@
+import threading
+from collections import OrderedDict
+from flask import has_app_context
+from sqlalchemy.exc import IntegrityError
+from database.models import db, GrammarResults
+from utils.languagetool_client import normalize_text, text_hash
+
+
+class GrammarCache:
+    """
+    Cache des erreurs LanguageTool par réponse : LRU en mémoire, éventuellement adossé à la table
+    grammar_results. La clé combine l'empreinte du texte normalisé, la langue et la version de
+    LanguageTool : une mise à jour de LanguageTool invalide donc le cache.
+    Les compteurs hits / misses couvrent les deux niveaux.
+    """
+    def __init__(self, language: str, max_entries: int = 2048, persist: bool = True):
+        self.language = language
+        self.max_entries = max_entries
+        self.persist = persist
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, key, errors: list):
+        with self._lock:
+            self._entries[key] = errors
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_many(self, texts: list, version: str) -> list:
+        """
+        Erreurs mises en cache pour chaque texte (copies), None pour les textes absents.
+        """
+        keys = [(text_hash(normalize_text(text)), version) for text in texts]
+        results = [None] * len(texts)
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    results[i] = self._entries[key]
+
+        missing_hashes = {key[0] for key, result in zip(keys, results) if result is None}
+        if missing_hashes and self.persist and has_app_context():
+            stored = db.session.execute(
+                db.select(GrammarResults).filter(
+                    GrammarResults.text_hash.in_(missing_hashes),
+                    GrammarResults.language == self.language,
+                    GrammarResults.languagetool_version == version
+                )
+            ).scalars().all()
+            stored_errors = {entry.text_hash: entry.errors for entry in stored}
+            for i, key in enumerate(keys):
+                if results[i] is None and key[0] in stored_errors:
+                    results[i] = stored_errors[key[0]]
+                    self._remember(key, results[i])
+
+        with self._lock:
+            hit_count = sum(result is not None for result in results)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return [None if result is None else [dict(error) for error in result] for result in results]
+
+    def put_many(self, texts: list, version: str, errors_per_text: list):
+        new_entries = {}
+        for text, errors in zip(texts, errors_per_text):
+            key = (text_hash(normalize_text(text)), version)
+            self._remember(key, [dict(error) for error in errors])
+            new_entries[key[0]] = errors
+
+        if not (self.persist and has_app_context()):
+            return
+        # Savepoint par entrée : un doublon inséré par un autre worker ne doit pas annuler l'analyse en cours
+        for hash_value, errors in new_entries.items():
+            try:
+                with db.session.begin_nested():
+                    db.session.add(GrammarResults(
+                        text_hash=hash_value, language=self.language,
+                        languagetool_version=version, errors=errors
+                    ))
+            except IntegrityError:
+                pass
+
+    def get(self, text: str, version: str):
+        return self.get_many([text], version)[0]
+
+    def put(self, text: str, version: str, errors: list):
+        self.put_many([text], version, [errors])
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries)
+            }
@@ -0,0 +1,223 @@
+import ipaddress
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import Listener, Client
+
+import numpy as np
+
+METRICS_WINDOW = 10000
+
+
+def parse_address(address: str) -> tuple:
+    """
+    'hôte:port' -> ('hôte', port), format attendu par multiprocessing.connection.
+    """
+    host, _, port = address.rpartition(':')
+    return (host or 'localhost', int(port))
+
+
+def check_authkey(authkey: bytes) -> bytes:
+    """
+    multiprocessing.connection désérialise (pickle) chaque message reçu : sans clé secrète,
+    quiconque atteint le port peut exécuter du code. Aucune clé par défaut n'est donc fournie.
+    """
+    if not authkey:
+        raise ValueError("Erreur fatale: La variable d'environnement 'EMOTION_INFERENCE_AUTHKEY' n'est pas définie. Veuillez la définir dans le fichier .env.")
+    return authkey
+
+
+def is_loopback(host: str) -> bool:
+    """
+    Vrai si l'hôte désigne la boucle locale ('localhost', 127.0.0.0/8, ::1).
+    """
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class MicroBatcher:
+    """
+    File d'inférence partagée : les requêtes (lots de spectrogrammes de taille quelconque) arrivant
+    en même temps sont concaténées et envoyées au modèle en un seul appel, dans la limite de
+    `max_batch_size` exemples ou de `max_wait_ms` d'attente après la première requête.
+    Un seul thread appelle `predict_fn` : le graphe du modèle reste chaud et n'est jamais partagé.
+    """
+    def __init__(self, predict_fn, max_batch_size: int = 32, max_wait_ms: float = 10.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max_wait_ms / 1000
+        self._requests = queue.Queue()
+        self._latencies_ms = deque(maxlen=METRICS_WINDOW)
+        self._batch_sizes = deque(maxlen=METRICS_WINDOW)
+        self._request_count = 0
+        self._metrics_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name='inference-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, inputs: np.ndarray) -> Future:
+        future = Future()
+        self._requests.put((np.asarray(inputs), future, time.perf_counter()))
+        return future
+
+    def predict(self, inputs: np.ndarray, timeout: float = None) -> np.ndarray:
+        return self.submit(inputs).result(timeout=timeout)
+
+    def _collect_batch(self) -> list:
+        try:
+            first = self._requests.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch, size = [first], len(first[0])
+        deadline = time.perf_counter() + self.max_wait_s
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request[0])
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            sizes = [len(inputs) for inputs, _, _ in batch]
+            try:
+                outputs = np.asarray(self.predict_fn(np.concatenate([inputs for inputs, _, _ in batch], axis=0)))
+                split_outputs = np.split(outputs, np.cumsum(sizes)[:-1])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            now = time.perf_counter()
+            with self._metrics_lock:
+                self._batch_sizes.append(sum(sizes))
+                self._request_count += len(batch)
+                for (_, future, submitted_at), result in zip(batch, split_outputs):
+                    self._latencies_ms.append((now - submitted_at) * 1000)
+                    future.set_result(result)
+
+    def metrics(self) -> dict:
+        """
+        Latence (file d'attente + inférence) et taille des lots sur les dernières requêtes.
+        """
+        with self._metrics_lock:
+            latencies = np.array(self._latencies_ms)
+            batch_sizes = np.array(self._batch_sizes)
+            request_count = self._request_count
+        if not len(latencies):
+            return {"requests": request_count, "batches": 0}
+        return {
+            "requests": request_count,
+            "batches": int(len(batch_sizes)),
+            "latency_p50_ms": round(float(np.percentile(latencies, 50)), 2),
+            "latency_p99_ms": round(float(np.percentile(latencies, 99)), 2),
+            "batch_size_mean": round(float(batch_sizes.mean()), 2),
+            "batch_size_max": int(batch_sizes.max()),
+        }
+
+    def stop(self):
+        self._stopped.set()
+        self._worker.join(timeout=1)
+
+
+class InferenceServer:
+    """
+    Expose un MicroBatcher aux workers Celery via un socket local (multiprocessing.connection).
+    Messages : ('predict', tableau) -> ('ok', probabilités) ; ('metrics',) -> ('ok', dict).
+    Une adresse hors boucle locale est refusée sauf `allow_remote=True`.
+    """
+    def __init__(self, batcher: MicroBatcher, authkey: bytes, address=('localhost', 6010), allow_remote: bool = False):
+        check_authkey(authkey)
+        if not is_loopback(address[0]):
+            if not allow_remote:
+                raise ValueError(f"ERREUR: Le serveur d'inférence n'écoute que sur la boucle locale (adresse demandée : {address[0]}).")
+            print(f"AVERTISSEMENT: Serveur d'inférence exposé hors boucle locale ({address[0]}), seule la clé d'authentification le protège.")
+        self.batcher = batcher
+        self.listener = Listener(address, authkey=authkey)
+        self.address = self.listener.address
+
+    def _handle(self, connection):
+        with connection:
+            while True:
+                try:
+                    message = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if message[0] == 'predict':
+                        connection.send(('ok', self.batcher.predict(message[1])))
+                    elif message[0] == 'metrics':
+                        connection.send(('ok', self.batcher.metrics()))
+                    else:
+                        connection.send(('error', f"Commande inconnue : {message[0]}"))
+                except Exception as e:
+                    connection.send(('error', str(e)))
+
+    def serve_forever(self):
+        print(f"[Inférence] Serveur à l'écoute sur {self.address}...")
+        while True:
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def close(self):
+        self.listener.close()
+        self.batcher.stop()
+
+
+class InferenceClient:
+    """
+    Client du serveur d'inférence, une connexion persistante par processus worker.
+    Les erreurs de connexion sont propagées (OSError / EOFError) pour que l'appelant bascule en local.
+    """
+    def __init__(self, address, authkey: bytes):
+        self.address = parse_address(address) if isinstance(address, str) else address
+        check_authkey(authkey)
+        if not is_loopback(self.address[0]):
+            print(f"AVERTISSEMENT: Serveur d'inférence hors boucle locale ({self.address[0]}), les échanges ne sont pas chiffrés.")
+        self.authkey = authkey
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _request(self, message):
+        with self._lock:
+            if self._connection is None:
+                self._connection = Client(self.address, authkey=self.authkey)
+            try:
+                self._connection.send(message)
+                status, payload = self._connection.recv()
+            except (OSError, EOFError):
+                self._connection.close()
+                self._connection = None
+                raise
+        if status != 'ok':
+            raise RuntimeError(f"Erreur du serveur d'inférence : {payload}")
+        return payload
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        return self._request(('predict', np.asarray(inputs, dtype=np.float32)))
+
+    def metrics(self) -> dict:
+        return self._request(('metrics',))
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,138 @@
+import os
+import subprocess
+import tempfile
+import uuid
+import numpy as np
+import soundfile as sf
+from flask import current_app, has_app_context
+from utils.decoded_audio import DecodedAudio, DEFAULT_SAMPLE_RATE
+
+# 'pipe' : PCM float32 lu sur la sortie standard de ffmpeg, sans fichier
+# 'memmap' : PCM float32 écrit sur un tmpfs puis projeté en mémoire
+# 'wav' : WAV temporaire (comportement historique, utilisé en repli)
+DECODE_MODES = ('pipe', 'memmap', 'wav')
+PIPE_BLOCK_SIZE = 1024 * 1024
+
+
+def _setting(name: str, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return default
+
+
+def _ffmpeg_decode_command(source_path: str, output: str, output_format: str) -> list:
+    return ["ffmpeg", "-nostdin", "-v", "error", "-i", source_path, "-vn",
+            "-ar", str(DEFAULT_SAMPLE_RATE), "-ac", "1", "-f", output_format, "-y", output]
+
+
+def convert_to_wav(source_path: str, output_dir: str = None) -> str:
+    """
+    Convertit un fichier média en un fichier WAV mono 16kHz temporaire.
+    Le nom est unique (deux tâches sur le même upload ne se marchent pas dessus) et le fichier
+    est créé dans le répertoire temporaire du système plutôt que sur le volume des uploads.
+    """
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(f"Fichier source introuvable pour la conversion: {source_path}")
+
+    filename_without_ext = os.path.splitext(os.path.basename(source_path))[0]
+    fd, temp_wav_path = tempfile.mkstemp(prefix=f"{filename_without_ext}_", suffix="_temp.wav", dir=output_dir)
+    os.close(fd)
+
+    command = _ffmpeg_decode_command(source_path, temp_wav_path, "wav")
+
+    print(f"Exécution de la conversion : {' '.join(command)}")
+    try:
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        print(f"Conversion en WAV réussie : {temp_wav_path}")
+        return temp_wav_path
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        os.remove(temp_wav_path)
+        raise Exception(f"La conversion avec ffmpeg a échoué. Assurez-vous que ffmpeg est installé et dans le PATH. Erreur: {e}")
+
+
+def _decode_with_wav(source_path: str) -> DecodedAudio:
+    temp_wav_path = convert_to_wav(source_path, output_dir=_setting('MEDIA_TEMP_DIR', None))
+    try:
+        samples, sr = sf.read(temp_wav_path, dtype='float32', always_2d=False)
+    finally:
+        if os.path.exists(temp_wav_path):
+            os.remove(temp_wav_path)
+            print(f" Fichier temporaire supprimé : {temp_wav_path}")
+
+    if samples.ndim > 1:
+        samples = samples.T
+    return DecodedAudio(samples, sr, source_path=source_path)
+
+
+def _decode_with_pipe(source_path: str) -> DecodedAudio:
+    """
+    ffmpeg écrit du PCM float32 little-endian sur stdout, accumulé directement dans un bytearray :
+    aucun octet ne passe par le disque.
+    """
+    command = _ffmpeg_decode_command(source_path, "pipe:1", "f32le")
+    buffer = bytearray()
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as process:
+        for block in iter(lambda: process.stdout.read(PIPE_BLOCK_SIZE), b''):
+            buffer += block
+        return_code = process.wait()
+    if return_code != 0:
+        raise RuntimeError(f"ffmpeg a terminé avec le code {return_code}")
+
+    usable_bytes = len(buffer) - len(buffer) % 4
+    samples = np.frombuffer(buffer, dtype='<f4', count=usable_bytes // 4)
+    return DecodedAudio(samples, DEFAULT_SAMPLE_RATE, source_path=source_path)
+
+
+def _decode_with_memmap(source_path: str) -> DecodedAudio:
+    """
+    ffmpeg écrit le PCM float32 brut sur un tmpfs (mémoire vive), projeté ensuite avec np.memmap.
+    Le fichier est supprimé aussitôt : la projection reste valide jusqu'à la fin de l'analyse.
+    """
+    tmpfs_dir = _setting('MEDIA_TMPFS_DIR', '/dev/shm')
+    if not os.path.isdir(tmpfs_dir):
+        raise FileNotFoundError(f"Répertoire tmpfs introuvable : {tmpfs_dir}")
+    raw_path = os.path.join(tmpfs_dir, f"decode_{uuid.uuid4().hex}.f32")
+
+    try:
+        subprocess.run(_ffmpeg_decode_command(source_path, raw_path, "f32le"),
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if os.path.getsize(raw_path) < 4:
+            samples = np.zeros(0, dtype=np.float32)
+        else:
+            samples = np.memmap(raw_path, dtype='<f4', mode='c')
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+    return DecodedAudio(samples, DEFAULT_SAMPLE_RATE, source_path=source_path)
+
+
+DECODERS = {
+    'pipe': _decode_with_pipe,
+    'memmap': _decode_with_memmap,
+    'wav': _decode_with_wav,
+}
+
+
+def decode_audio(source_path: str, mode: str = None) -> DecodedAudio:
+    """
+    Décode une seule fois le média de la session (un seul appel ffmpeg) en un DecodedAudio
+    mono float32 à 16 kHz partagé par tous les agents.
+    Le mode vient de MEDIA_DECODE_MODE ; en cas d'échec, on se replie sur le WAV temporaire.
+    """
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(f"Fichier source introuvable pour la conversion: {source_path}")
+
+    mode = mode or _setting('MEDIA_DECODE_MODE', 'pipe')
+    if mode not in DECODE_MODES:
+        print(f"AVERTISSEMENT: Mode de décodage '{mode}' inconnu. Utilisation du mode 'wav'.")
+        mode = 'wav'
+
+    if mode != 'wav':
+        try:
+            decoded_audio = DECODERS[mode](source_path)
+            print(f"-> Décodage ffmpeg en mode '{mode}' ({decoded_audio.duration:.1f} s d'audio).")
+            return decoded_audio
+        except (OSError, RuntimeError, subprocess.CalledProcessError) as e:
+            print(f"AVERTISSEMENT: Décodage en mode '{mode}' impossible ({e}). Repli sur un WAV temporaire.")
+
+    return _decode_with_wav(source_path)
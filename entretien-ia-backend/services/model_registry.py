@@ -0,0 +1,227 @@
+import os
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app, has_app_context
+from agents.NLPAgent import NLPAgent
+from agents.AudioAgent import AudioAgent
+from agents.EmotionAgent import EmotionAgent
+from agents.RapportAgent import RapportAgent
+from agents.VideoAgent import VideoAgent
+from utils import model_store
+
+
+def _setting(name: str, default):
+    """
+    Lit un réglage dans la configuration Flask, ou dans Config hors contexte applicatif
+    (processus enfants lancés par les pools d'analyse).
+    """
+    if has_app_context():
+        return current_app.config.get(name, default)
+    from config import Config
+    return getattr(Config, name, default)
+
+
+def _build_nlp_agent():
+    from services.rag_reference_cache import RagReferenceCache
+    from services.grammar_cache import GrammarCache
+    nlp_agent = NLPAgent(
+        model_size=_setting('WHISPER_MODEL_SIZE', 'small'),
+        engine=_setting('WHISPER_ENGINE', 'sequential'),
+        beam_size=_setting('WHISPER_BEAM_SIZE', 5),
+        vad_filter=_setting('WHISPER_VAD_FILTER', True),
+        cpu_threads=_setting('WHISPER_CPU_THREADS', 0),
+        num_workers=_setting('WHISPER_NUM_WORKERS', 1),
+        batch_size=_setting('WHISPER_BATCH_SIZE', 8)
+    )
+    nlp_agent.grammar_server_url = _setting('LANGUAGETOOL_URL', '') or None
+    nlp_agent.grammar_cache = GrammarCache(
+        nlp_agent.grammar_tool_lang, max_entries=_setting('GRAMMAR_CACHE_SIZE', 2048),
+        persist=_setting('GRAMMAR_CACHE_PERSIST', True)
+    )
+    nlp_agent.rag_reference_cache = RagReferenceCache(
+        nlp_agent.llm_model_name_rag, max_entries=_setting('RAG_REFERENCE_CACHE_SIZE', 512)
+    )
+    return nlp_agent
+
+
+def _build_emotion_agent():
+    address = _setting('EMOTION_INFERENCE_ADDRESS', '')
+    backend = _setting('EMOTION_CNN_BACKEND', 'auto')
+    if not address:
+        return EmotionAgent(backend=backend)
+    from services.inference_server import InferenceClient
+    authkey = (_setting('EMOTION_INFERENCE_AUTHKEY', None) or '').encode()
+    print(f"[Registre] EmotionAgent relié au serveur d'inférence {address}.")
+    return EmotionAgent(inference_client=InferenceClient(address, authkey=authkey), backend=backend)
+
+
+# Fabriques des agents, dans l'ordre historique retourné par get_agents()
+AGENT_FACTORIES = {
+    'nlp': _build_nlp_agent,
+    'audio': lambda: AudioAgent(
+        pitch_engine=_setting('PITCH_ENGINE', 'yin'),
+        vad_backend=_setting('VAD_BACKEND', 'iterator'),
+        vad_torch_threads=_setting('VAD_TORCH_THREADS', 0),
+        vad_batch_streams=_setting('VAD_BATCH_STREAMS', 64)
+    ),
+    'emotion': _build_emotion_agent,
+    'rapport': RapportAgent,
+    'video': lambda: VideoAgent(sampling_mode=_setting('VIDEO_SAMPLING_MODE', 'read')),
+}
+
+_agents = {}
+_load_stats = {}
+_process_pools = {}
+_owner_pid = None
+_lock = threading.RLock()
+
+
+def _current_rss_mb() -> float:
+    """
+    Mémoire résidente actuelle du processus (en Mo).
+    Lit /proc/self/statm sous Linux, sinon retombe sur le pic mesuré par getrusage.
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _reset_if_forked():
+    """
+    Les modèles chargés avant un fork (torch, MediaPipe, JVM) ne sont pas fiables
+    dans le processus enfant : chaque worker Celery recharge donc ses propres instances.
+    """
+    global _owner_pid
+    if _owner_pid != os.getpid():
+        _agents.clear()
+        _load_stats.clear()
+        _process_pools.clear()
+        _owner_pid = os.getpid()
+
+
+def _measure(label: str, loader):
+    rss_before = _current_rss_mb()
+    start = time.perf_counter()
+    result = loader()
+    _load_stats[label] = {
+        "load_time_s": round(time.perf_counter() - start, 2),
+        "rss_delta_mb": round(_current_rss_mb() - rss_before, 1),
+    }
+    return result
+
+
+def get_agent(name: str):
+    """
+    Retourne l'instance partagée de l'agent demandé, en la créant une seule fois par processus.
+    """
+    if name not in AGENT_FACTORIES:
+        raise KeyError(f"Agent inconnu : '{name}'. Agents disponibles : {list(AGENT_FACTORIES)}")
+
+    with _lock:
+        _reset_if_forked()
+        if name not in _agents:
+            print(f"[Registre] Chargement de l'agent '{name}' pour le processus {os.getpid()}...")
+            _agents[name] = _measure(name, AGENT_FACTORIES[name])
+        return _agents[name]
+
+
+def peek_agent(name: str):
+    """
+    Retourne l'agent s'il est déjà chargé dans ce processus, sans le créer.
+    """
+    with _lock:
+        _reset_if_forked()
+        return _agents.get(name)
+
+
+def _preload_agents(names: tuple):
+    for name in names:
+        get_agent(name)
+
+
+def get_process_pool(name: str, max_workers: int, agent_names: tuple = ()) -> ProcessPoolExecutor:
+    """
+    Pool de processus 'spawn' (évite de dupliquer les threads torch du parent) créé une seule fois
+    par processus et réutilisé d'une analyse à l'autre. Chaque processus enfant charge les agents
+    `agent_names` depuis son propre registre au démarrage, puis les garde pour toute sa durée de vie.
+    """
+    with _lock:
+        _reset_if_forked()
+        if name not in _process_pools:
+            _process_pools[name] = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=_preload_agents, initargs=(tuple(agent_names),)
+            )
+        return _process_pools[name]
+
+
+def discard_process_pool(name: str):
+    """
+    Arrête et oublie un pool inutilisable (processus enfant tombé, création refusée) ;
+    le prochain get_process_pool() en recrée un.
+    """
+    with _lock:
+        pool = _process_pools.pop(name, None)
+    if pool:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def get_agents():
+    """
+    Retourne les agents partagés dans l'ordre attendu par analysis_service :
+    (nlp, audio, emotion, rapport, video).
+    """
+    return tuple(get_agent(name) for name in AGENT_FACTORIES)
+
+
+def warm_up():
+    """
+    Vérifie le magasin local de modèles (models/manifest.json) puis charge tous les agents ainsi que
+    leurs modèles paresseux (sémantique, grammaire, RAG, classifieur d'émotions) pour que la première
+    tâche ne paie pas le démarrage à froid. L'agent vidéo n'est pas chargé quand la branche vidéo
+    tourne dans un processus dédié (ANALYSIS_VIDEO_BRANCH='process'), qui a le sien.
+    """
+    print(f"[Registre] Préchauffage des modèles (processus {os.getpid()})...")
+    # En mode hors ligne, un modèle manquant fait échouer le worker immédiatement
+    _measure('model_store.check', model_store.ensure_available)
+    for name in AGENT_FACTORIES:
+        if not (name == 'video' and _setting('ANALYSIS_VIDEO_BRANCH', 'thread') == 'process'):
+            get_agent(name)
+    nlp_agent, emotion_agent = get_agent('nlp'), get_agent('emotion')
+
+    warm_up_steps = {
+        'nlp.semantic': nlp_agent._initialize_semantic_model,
+        'nlp.grammar': nlp_agent._initialize_grammar_tool,
+        'nlp.rag': nlp_agent._initialize_rag_chain,
+        'emotion.classifier': emotion_agent._load_model,
+    }
+    with _lock:
+        for label, loader in warm_up_steps.items():
+            if label in _load_stats:
+                continue
+            try:
+                _measure(label, loader)
+            except Exception as e:
+                print(f"AVERTISSEMENT: Préchauffage de '{label}' impossible : {e}")
+
+    return report_load_stats()
+
+
+def report_load_stats() -> dict:
+    """
+    Affiche et retourne le temps de chargement et la mémoire résidente ajoutée par chaque modèle.
+    """
+    with _lock:
+        stats = {label: dict(values) for label, values in _load_stats.items()}
+
+    print(f"[Registre] Modèles chargés (processus {os.getpid()}, RSS total {_current_rss_mb():.0f} Mo) :")
+    for label, values in stats.items():
+        print(f"  - {label:<20}: {values['load_time_s']:>6.2f} s | +{values['rss_delta_mb']:.1f} Mo")
+    return stats
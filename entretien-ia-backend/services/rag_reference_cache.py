@@ -0,0 +1,67 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import has_app_context
+from sqlalchemy.exc import IntegrityError
+from database.models import db, RagReferences
+
+
+class RagReferenceCache:
+    """
+    Cache des réponses de référence RAG : LRU en mémoire devant la table rag_references.
+    La clé combine l'intitulé de la question, la version de la base vectorielle et le modèle
+    génératif : reconstruire l'index avec scripts/create_vector_db.py invalide donc le cache.
+    """
+    def __init__(self, llm_model: str, max_entries: int = 512):
+        self.llm_model = llm_model
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _question_hash(question: str) -> str:
+        return hashlib.sha256((question or '').strip().encode('utf-8')).hexdigest()
+
+    def _remember(self, key, reference: str):
+        with self._lock:
+            self._entries[key] = reference
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, question: str, version: str):
+        if not version:
+            return None
+        key = (self._question_hash(question), version)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        if not has_app_context():
+            return None
+        entry = db.session.execute(
+            db.select(RagReferences).filter_by(question_hash=key[0], vector_db_version=version, llm_model=self.llm_model)
+        ).scalar_one_or_none()
+        if entry is None:
+            return None
+        self._remember(key, entry.reference_text)
+        return entry.reference_text
+
+    def put(self, question: str, version: str, reference: str):
+        if not version or not reference:
+            return
+        key = (self._question_hash(question), version)
+        self._remember(key, reference)
+
+        if not has_app_context():
+            return
+        # Savepoint : un doublon inséré par un autre worker ne doit pas annuler l'analyse en cours
+        try:
+            with db.session.begin_nested():
+                db.session.add(RagReferences(
+                    question_hash=key[0], vector_db_version=version,
+                    llm_model=self.llm_model, reference_text=reference
+                ))
+        except IntegrityError:
+            pass
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import update
+from database.models import db, Sessions, Reports, Answers, AudioFeatures, EmotionScores, ProfilsPonderation
+from agents.RapportAgent import SCORE_COMPONENTS, merge_weights, engagement_score, combine_scores
+
+
+def _scores_frame(session_ids: list) -> pd.DataFrame:
+    """
+    Composantes sur 100 de la note globale de chaque session, lues dans les tables déjà remplies
+    par l'analyse (aucun modèle n'est rechargé). Index : session_id.
+    """
+    answers = db.session.execute(
+        db.select(
+            Answers.session_id,
+            db.func.avg(Answers.score_pertinence).label('relevance'),
+            db.func.avg(Answers.score_grammaire).label('clarity')
+        ).where(Answers.session_id.in_(session_ids)).group_by(Answers.session_id)
+    ).all()
+    fluency = db.session.execute(
+        db.select(AudioFeatures.session_id, AudioFeatures.fluency_score).where(AudioFeatures.session_id.in_(session_ids))
+    ).all()
+    emotions = db.session.execute(
+        db.select(EmotionScores.session_id, EmotionScores.scores).where(EmotionScores.session_id.in_(session_ids))
+    ).all()
+
+    frame = pd.DataFrame(index=pd.Index(session_ids, name='session_id'))
+    frame = frame.join(pd.DataFrame(answers, columns=['session_id', 'relevance', 'clarity']).set_index('session_id'))
+    frame = frame.join(pd.DataFrame(fluency, columns=['session_id', 'fluency']).set_index('session_id'))
+    emotion_rows = [
+        (session_id, (scores or {}).get('calme', 0) + (scores or {}).get('heureux', 0),
+         (scores or {}).get('colère', 0) + (scores or {}).get('peur', 0))
+        for session_id, scores in emotions
+    ]
+    emotion_frame = pd.DataFrame(emotion_rows, columns=['session_id', 'calm_happy', 'anger_fear']).set_index('session_id')
+    frame = frame.join(emotion_frame).astype(float).fillna(0.0)
+    frame[['relevance', 'clarity']] *= 100
+    frame['engagement'] = engagement_score(frame['calm_happy'].to_numpy(), frame['anger_fear'].to_numpy())
+    return frame
+
+
+def rescore_profile(profile_id: int) -> int:
+    """
+    Recalcule Reports.note_globale de toutes les sessions rattachées au profil, en une passe
+    vectorisée sur les scores stockés, après une modification de ses poids. Seule l'étape de
+    fusion est refaite : transcription, pertinence et émotions ne sont pas relancées.
+    Retourne le nombre de rapports mis à jour ; le commit est laissé à l'appelant.
+    """
+    profile = db.session.get(ProfilsPonderation, profile_id)
+    if not profile:
+        return 0
+
+    reports = db.session.execute(
+        db.select(Reports.id, Reports.session_id).join(Sessions, Sessions.id == Reports.session_id)
+        .where(Sessions.profil_ponderation_id == profile_id)
+    ).all()
+    if not reports:
+        return 0
+
+    session_ids = [session_id for _, session_id in reports]
+    frame = _scores_frame(session_ids)
+    notes = np.round(combine_scores(
+        {key: frame[key].to_numpy() for key in SCORE_COMPONENTS},
+        merge_weights(profile.poids)
+    ), 2)
+    notes_by_session = dict(zip(frame.index, notes))
+
+    db.session.execute(update(Reports), [
+        {'id': report_id, 'note_globale': float(notes_by_session[session_id])}
+        for report_id, session_id in reports
+    ])
+    print(f"-> {len(reports)} note(s) globale(s) recalculée(s) pour le profil '{profile.nom_profil}'.")
+    return len(reports)
@@ -0,0 +1,150 @@
+import bisect
+from collections import namedtuple
+import numpy as np
+
+# Segment de transcription en temps absolu (mêmes attributs que les segments faster-whisper lus par le routeur)
+TranscriptSegment = namedtuple('TranscriptSegment', ['start', 'end', 'text'])
+
+
+def segment_midpoint(start: float, end: float) -> float:
+    """
+    Instant qui rattache un segment de transcription à une fenêtre, partagé par le recollage
+    des fenêtres et par le routage de leurs segments : un segment à cheval sur deux questions
+    va à celle qui contient son centre.
+    """
+    return (start + end) / 2
+
+
+def question_window(events: list, index: int, duration: float) -> tuple:
+    """
+    Fenêtre [début, fin) de la question `index` de la timeline.
+    La dernière question se termine à la fin du média.
+    """
+    start_time = events[index]['timestamp']
+    end_time = events[index + 1]['timestamp'] if index + 1 < len(events) else duration
+    return start_time, end_time
+
+
+def transcription_windows(events: list, duration: float) -> list:
+    """
+    Découpe le média en fenêtres contiguës pour la transcription par question : une fenêtre par
+    question, précédée de l'introduction éventuelle avant la première question.
+    """
+    windows = [question_window(events, i, duration) for i in range(len(events))]
+    if windows and windows[0][0] > 0:
+        windows.insert(0, (0.0, windows[0][0]))
+    return [(start, end) for start, end in windows if end > start]
+
+
+def stitch_window_segments(segments, window: tuple, offset: float) -> list:
+    """
+    Ramène en temps absolu les segments d'une fenêtre transcrite avec chevauchement
+    (`offset` = début réel de l'extrait envoyé à Whisper) et ne garde que ceux dont le centre
+    tombe dans la fenêtre [début, fin) : un segment présent dans deux fenêtres voisines
+    grâce au chevauchement n'est conservé qu'une fois.
+    """
+    start_time, end_time = window
+    stitched = []
+    for segment in segments:
+        absolute_start, absolute_end = offset + segment.start, offset + segment.end
+        if start_time <= segment_midpoint(absolute_start, absolute_end) < end_time:
+            stitched.append(TranscriptSegment(absolute_start, absolute_end, segment.text))
+    return stitched
+
+
+class SegmentRouter:
+    """
+    Répartit les segments de transcription dans la fenêtre qui contient leur début au fur et à mesure
+    que Whisper les produit (recherche dichotomique sur les timestamps de la timeline). Avec
+    `by_midpoint=True` (segments issus de stitch_window_segments), c'est leur centre qui compte,
+    comme au recollage. Les segments arrivant dans l'ordre chronologique, une fenêtre est close dès
+    qu'un segment la dépasse : sa réponse peut alors être analysée sans attendre la fin de la transcription.
+    """
+    def __init__(self, events: list, duration: float, by_midpoint: bool = False):
+        self.events = events
+        self.duration = duration
+        self.by_midpoint = by_midpoint
+        self.starts = [event['timestamp'] for event in events]
+        self.buckets = [[] for _ in events]
+        self.transcript_parts = []
+        self._next_window_to_close = 0
+
+    def window(self, index: int) -> tuple:
+        return question_window(self.events, index, self.duration)
+
+    def _close_windows_before(self, index: int):
+        while self._next_window_to_close < min(index, len(self.buckets)):
+            closed = self._next_window_to_close
+            self._next_window_to_close += 1
+            yield closed, " ".join(self.buckets[closed])
+            self.buckets[closed] = []
+
+    def route(self, segments):
+        """
+        Consomme les segments (générateur faster-whisper) et produit (index_question, texte_réponse)
+        pour chaque fenêtre, dans l'ordre de la timeline, dès qu'elle est close.
+        """
+        for segment in segments:
+            text = segment.text.strip()
+            self.transcript_parts.append(text)
+
+            instant = segment_midpoint(segment.start, segment.end) if self.by_midpoint else segment.start
+            index = bisect.bisect_right(self.starts, instant) - 1
+            yield from self._close_windows_before(index)
+            if index < 0:
+                continue
+            if index == len(self.starts) - 1 and instant >= self.duration:
+                continue
+            self.buckets[index].append(text)
+
+        yield from self._close_windows_before(len(self.buckets))
+
+    @property
+    def full_transcription(self) -> str:
+        return " ".join(self.transcript_parts)
+
+
+def summarize_emotion_timeline(emotion_timeline: dict, events: list) -> dict:
+    """
+    Agrège les probabilités fenêtrées d'un agent émotionnel : moyenne globale, moyenne par question
+    (chaque fenêtre est rattachée à la question qui contient son centre) et timeline compacte
+    (indice de l'émotion dominante et scores arrondis par fenêtre) à stocker dans emotion_scores.
+    """
+    labels = emotion_timeline['labels']
+    probabilities = np.asarray(emotion_timeline['probabilities'], dtype=np.float64)
+    starts = np.asarray(emotion_timeline['starts'], dtype=np.float64)
+    if probabilities.size == 0:
+        return None
+
+    def describe(scores: np.ndarray) -> tuple:
+        return labels[int(np.argmax(scores))], {label: round(float(p), 4) for label, p in zip(labels, scores)}
+
+    dominant_emotion, global_scores = describe(probabilities.mean(axis=0))
+
+    centers = starts + emotion_timeline['window_seconds'] / 2
+    question_indices = np.searchsorted([event['timestamp'] for event in events], centers, side='right') - 1
+    scores_by_question = {}
+    for i, event in enumerate(events):
+        in_question = question_indices == i
+        if not in_question.any():
+            continue
+        question_dominant, question_scores = describe(probabilities[in_question].mean(axis=0))
+        scores_by_question[str(event['questionId'])] = {
+            "dominant_emotion": question_dominant,
+            "scores": question_scores,
+            "window_count": int(in_question.sum())
+        }
+
+    return {
+        "dominant_emotion": dominant_emotion,
+        "scores": global_scores,
+        "scores_by_question": scores_by_question,
+        "timeline": {
+            "labels": labels,
+            "window_seconds": round(float(emotion_timeline['window_seconds']), 3),
+            "hop_seconds": round(float(emotion_timeline['hop_seconds']), 3),
+            "starts": [round(float(start), 2) for start in starts],
+            "dominant": [int(index) for index in probabilities.argmax(axis=1)],
+            "scores": np.round(probabilities, 3).tolist()
+        }
+    }
@@ -1,5 +1,6 @@
 from extensions import celery
-from services import analysis_service
+from database.models import db, Questions
+from services import analysis_service, embedding_service
 
 @celery.task(name='tasks.run_analysis_task')
 def run_analysis_task(session_id: int):
@@ -10,4 +11,29 @@ def run_analysis_task(session_id: int):
         return {"status": "success", "session_id": session_id}
     except Exception as e:
         print(f"TÂCHE CELERY ÉCHOUÉE : Erreur lors de l'analyse de la session {session_id}: {e}")
-        return {"status": "failure", "session_id": session_id, "error": str(e)}
\ No newline at end of file
+        return {"status": "failure", "session_id": session_id, "error": str(e)}
+
+@celery.task(name='tasks.analyze_segment_task')
+def analyze_segment_task(segment_id: int):
+    print(f"TÂCHE CELERY REÇUE : Analyse du segment {segment_id}")
+    result = analysis_service.analyze_segment(segment_id)
+    if result is None:
+        print(f"TÂCHE CELERY ÉCHOUÉE : Analyse du segment {segment_id}.")
+        return {"status": "failure", "segment_id": segment_id}
+    print(f"TÂCHE CELERY TERMINÉE : Segment {segment_id} analysé.")
+    return {"status": "success", "segment_id": segment_id}
+
+@celery.task(name='tasks.refresh_question_embedding_task')
+def refresh_question_embedding_task(question_id: int):
+    question = db.session.get(Questions, question_id)
+    if not question:
+        return {"status": "not_found", "question_id": question_id}
+    try:
+        refreshed = embedding_service.refresh_question_embeddings([question])
+        db.session.commit()
+        print(f"TÂCHE CELERY TERMINÉE : Embedding de la question {question_id} à jour ({refreshed} recalculé).")
+        return {"status": "success", "question_id": question_id, "refreshed": refreshed}
+    except Exception as e:
+        db.session.rollback()
+        print(f"TÂCHE CELERY ÉCHOUÉE : Embedding de la question {question_id}: {e}")
+        return {"status": "failure", "question_id": question_id, "error": str(e)}
@@ -1,4 +1,6 @@
 import pytest
+import numpy as np
+import torch
 from agents.AudioAgent import AudioAgent
 
 # On peut utiliser pytest.mark.parametrize pour tester plusieurs scénarios
@@ -28,4 +30,67 @@ def test_calculate_fluency_score(speech_duration, total_duration, pause_count, a
     score = agent._calculate_fluency_score(speech_duration, total_duration, pause_count, avg_pause)
     
     # 3. Assert
-    assert score == expected_score
\ No newline at end of file
+    assert score == expected_score
+
+
+def test_vocal_metrics_from_global_vad_intervals():
+    """
+    Valide les métriques d'une question calculées par arithmétique d'intervalles
+    sur la passe VAD globale (intervalles rognés à la fenêtre de la question).
+    """
+    agent = AudioAgent()
+    speech_intervals = np.array([[0, 16000], [32000, 48000], [70000, 90000]])
+
+    full = agent.vocal_metrics(speech_intervals, 0, 64000, "un deux trois quatre cinq six sept huit neuf dix")
+    window = agent.vocal_metrics(speech_intervals, 8000, 40000, "un deux trois")
+
+    assert full["speech_rate"] == pytest.approx(300.0)
+    assert full["pause_count"] == 1
+    assert full["average_pause_duration"] == pytest.approx(1.0)
+    assert full["fluency_score"] == pytest.approx(43.5)
+    assert window["speech_rate"] == pytest.approx(180.0)
+    assert window["pause_count"] == 1
+
+
+def energy_vad(audio, frame_length=512, threshold=0.01):
+    """
+    VAD déterministe par énergie (trames de 512 échantillons, comme Silero) : isole l'écart dû
+    au découpage en fenêtres de celui du modèle, qui n'est pas l'objet du test.
+    """
+    y = audio.squeeze().numpy()
+    frames = y[:len(y) // frame_length * frame_length].reshape(-1, frame_length)
+    active = np.concatenate([[False], np.sqrt((frames ** 2).mean(axis=1)) > threshold, [False]])
+    edges = np.flatnonzero(np.diff(active.astype(np.int8)))
+    return (edges.reshape(-1, 2) * frame_length).astype(np.int64)
+
+def test_global_vad_metrics_match_per_chunk_analysis(monkeypatch):
+    """
+    Valide que les métriques d'une question tirées de la passe VAD globale (intervalles rognés,
+    tranche de la courbe de pitch) restent dans la tolérance de l'ancienne analyse par morceau
+    (analyze_audio_chunk : VAD et pitch recalculés sur l'audio de la question).
+    """
+    agent = AudioAgent()
+    if not agent.model:
+        pytest.skip("Silero-VAD indisponible : analyze_audio_chunk renvoie les valeurs par défaut.")
+    monkeypatch.setattr(agent, 'detect_speech', energy_vad)
+    sr = agent.sr
+    t = np.arange(30 * sr) / sr
+    y = np.zeros_like(t, dtype=np.float32)
+    for (start, end), f0 in zip([(1, 4), (5, 9), (11, 14), (15.5, 19), (21, 27)], [140, 150, 180, 170, 210]):
+        span = (t >= start) & (t < end)
+        y[span] = 0.3 * np.sin(2 * np.pi * f0 * t[span])
+    wav = torch.from_numpy(y).unsqueeze(0)
+    texts = ["un deux trois quatre cinq six", "sept huit neuf dix onze", "douze treize quatorze"]
+
+    speech_intervals = agent.detect_speech(wav)
+    pitch_track = agent.compute_pitch_track(wav)
+    for (start, end), text in zip([(0, 10), (10, 20), (20, 30)], texts):
+        from_global = agent.vocal_metrics(speech_intervals, start * sr, end * sr, text,
+                                          pitch_track=pitch_track.window(start, end))
+        per_chunk = agent.analyze_audio_chunk(wav[:, start * sr:end * sr], text)
+
+        assert from_global["pause_count"] == per_chunk["pause_count"]
+        assert from_global["average_pause_duration"] == pytest.approx(per_chunk["average_pause_duration"], abs=0.05)
+        assert from_global["speech_rate"] == pytest.approx(per_chunk["speech_rate"], rel=0.02)
+        assert from_global["fluency_score"] == pytest.approx(per_chunk["fluency_score"], abs=1.0)
+        assert from_global["pitch_mean"] == pytest.approx(per_chunk["pitch_mean"], rel=0.02)
@@ -0,0 +1,23 @@
+import numpy as np
+from services.checkpoint_service import PipelineCheckpoints
+
+
+def test_checkpoint_is_invalidated_by_media_or_inputs(db_session, sample_session):
+    """
+    Valide qu'une étape sauvegardée est relue à l'identique (tableaux NumPy convertis en listes)
+    tant que le média et les entrées de l'étape ne changent pas.
+    """
+    inputs = {'events': [{"questionId": 1, "timestamp": 0}], 'settings': {'VAD_BACKEND': 'batched'}}
+    checkpoints = PipelineCheckpoints(sample_session.id, "a" * 64)
+    checkpoints.save('audio_features', inputs, {'speech_intervals': np.array([[0, 1600]]), 'f0': np.float32(120.5)})
+
+    assert checkpoints.load('audio_features', inputs) == {'speech_intervals': [[0, 1600]], 'f0': 120.5}
+    assert checkpoints.load('audio_features', {**inputs, 'settings': {'VAD_BACKEND': 'iterator'}}) is None
+    assert checkpoints.load('transcription', inputs) is None
+    assert PipelineCheckpoints(sample_session.id, "b" * 64).load('audio_features', inputs) is None
+
+    # Un nouveau média remplace la ligne de l'étape au lieu d'en ajouter une
+    PipelineCheckpoints(sample_session.id, "b" * 64).save('audio_features', inputs, {'speech_intervals': []})
+    assert checkpoints.load('audio_features', inputs) is None
+    assert len(sample_session.artifacts) == 1
+    assert PipelineCheckpoints(sample_session.id, "c" * 64, enabled=False).load('audio_features', inputs) is None
@@ -0,0 +1,39 @@
+import pickle
+import numpy as np
+from utils.decoded_audio import DecodedAudio, load_signal
+
+
+def make_audio(duration_s=2.0, sr=16000):
+    t = np.arange(int(duration_s * sr)) / sr
+    return DecodedAudio(0.5 * np.sin(2 * np.pi * 220 * t), sr)
+
+def test_slice_copies_the_window():
+    """
+    Valide qu'une fenêtre extraite a la bonne taille et ne référence pas le buffer complet.
+    """
+    audio = make_audio()
+    chunk = audio.slice(0.5, 1.0)
+
+    assert len(chunk) == 8000
+    assert chunk.samples.dtype == np.float32
+    assert not np.shares_memory(chunk.samples, audio.samples)
+    assert chunk.tensor().shape == (1, 8000)
+
+def test_resampled_view_is_computed_once():
+    audio = make_audio()
+
+    first = audio.at_rate(22050)
+    second = load_signal(audio, 22050)
+
+    assert first is second
+    assert abs(len(first) - 2 * 22050) <= 1
+    assert audio.at_rate(16000) is audio.samples
+
+def test_decoded_audio_is_picklable():
+    audio = make_audio(duration_s=0.5)
+    audio.at_rate(22050)
+
+    restored = pickle.loads(pickle.dumps(audio))
+
+    np.testing.assert_array_equal(restored.samples, audio.samples)
+    assert restored.at_rate(22050) is restored.at_rate(22050)
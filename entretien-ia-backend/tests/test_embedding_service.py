@@ -0,0 +1,40 @@
+import numpy as np
+from database.models import Questions, QuestionEmbeddings
+from agents.NLPAgent import SEMANTIC_MODEL_NAME
+from services import embedding_service
+
+
+def _question_with_embedding(db_session, ideal_answer):
+    question = Questions(intitule="Parlez-moi de vous.", ideal_answer=ideal_answer)
+    db_session.add(question)
+    db_session.commit()
+    question.embedding = QuestionEmbeddings(
+        question_id=question.id,
+        content_hash=embedding_service.content_hash(ideal_answer),
+        model_name=SEMANTIC_MODEL_NAME,
+        embedding=np.ones(4, dtype=np.float32).tobytes()
+    )
+    db_session.commit()
+    return question
+
+def test_embedding_is_fresh_until_ideal_answer_changes(db_session):
+    """
+    Valide que l'embedding stocké est invalidé dès que le texte de la réponse idéale change.
+    """
+    question = _question_with_embedding(db_session, "Une réponse idéale.")
+    assert embedding_service.is_fresh(question)
+
+    question.ideal_answer = "Une réponse idéale reformulée."
+    assert not embedding_service.is_fresh(question)
+
+def test_mark_stale_and_read_back(db_session):
+    question = _question_with_embedding(db_session, "Une réponse idéale.")
+    embeddings = embedding_service.get_ideal_answer_embeddings([question])
+    assert np.allclose(embeddings[question.id], np.ones(4))
+
+    embedding_service.mark_stale(question)
+    assert not embedding_service.is_fresh(question)
+
+def test_content_hash_ignores_surrounding_whitespace():
+    assert embedding_service.content_hash("  Réponse ") == embedding_service.content_hash("Réponse")
+    assert embedding_service.content_hash(None) == embedding_service.content_hash("")
@@ -0,0 +1,75 @@
+import numpy as np
+import librosa
+from agents.EmotionAgentML import EmotionAgent
+from agents.EmotionAgent import EmotionAgent as CNNEmotionAgent, HOP_LENGTH
+from utils.decoded_audio import DecodedAudio
+from utils.audio_windows import window_starts, window_means
+
+
+def reference_features(y, sr, n_mfcc=40):
+    """Extraction historique : un appel librosa.feature.* indépendant par famille."""
+    mfccs = np.mean(librosa.feature.mfcc(y=y, sr=sr, n_mfcc=n_mfcc).T, axis=0)
+    chroma = np.mean(librosa.feature.chroma_stft(y=y, sr=sr).T, axis=0)
+    mel = np.mean(librosa.feature.melspectrogram(y=y, sr=sr).T, axis=0)
+    contrast = np.mean(librosa.feature.spectral_contrast(y=y, sr=sr).T, axis=0)
+    return np.hstack((mfccs, chroma, mel, contrast))
+
+def test_shared_stft_features_match_reference():
+    """
+    Valide que l'extraction à STFT unique produit exactement le vecteur 40+12+128+7
+    attendu par le modèle joblib déjà entraîné.
+    """
+    agent = EmotionAgent()
+    rng = np.random.default_rng(0)
+    t = np.arange(3 * agent.sr) / agent.sr
+    y = (0.4 * np.sin(2 * np.pi * 196 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+
+    features = agent.extract_features(DecodedAudio(y, agent.sr))
+    expected = reference_features(y, agent.sr)
+
+    assert features.shape == (187,)
+    np.testing.assert_allclose(features, expected, rtol=1e-5, atol=1e-5)
+
+def test_window_means_match_direct_means():
+    """
+    Valide les moyennes fenêtrées par somme cumulée, y compris la dernière fenêtre alignée sur la fin.
+    """
+    frames = np.random.default_rng(1).standard_normal((5, 23))
+
+    starts = window_starts(frames.shape[1], window_frames=6, hop_frames=4)
+    means = window_means(frames, starts, window_frames=6)
+
+    assert list(starts) == [0, 4, 8, 12, 16, 17]
+    for start, mean in zip(starts, means):
+        np.testing.assert_allclose(mean, frames[:, start:start + 6].mean(axis=1))
+
+def test_cnn_timeline_uses_configured_window():
+    """
+    Valide que l'agent CNN découpe la timeline selon window_seconds, chaque fenêtre étant
+    complétée jusqu'à la taille d'entrée du CNN (174 trames), et borne les fenêtres trop longues.
+    """
+    class FakeModel:
+        def __init__(self):
+            self.batches = []
+
+        def predict(self, batch, verbose=0):
+            self.batches.append(batch)
+            return np.full((len(batch), 2), 0.5)
+
+    class FakeEncoder:
+        classes_ = np.array(['calme', 'peur'])
+
+    agent = CNNEmotionAgent()
+    agent.cnn_model, agent.label_encoder = FakeModel(), FakeEncoder()
+    y = np.random.default_rng(0).uniform(-0.5, 0.5, 10 * agent.sr).astype(np.float32)
+
+    timeline = agent.predict_emotion_timeline(DecodedAudio(y, agent.sr), window_seconds=2.0, hop_seconds=1.0)
+
+    window_frames = int(round(2.0 * agent.sr / HOP_LENGTH))
+    assert timeline["window_seconds"] == window_frames * HOP_LENGTH / agent.sr
+    assert agent.cnn_model.batches[0].shape[1:] == (128, 174, 1)
+    # Les trames ajoutées au-delà de la fenêtre sont des zéros, comme dans predict_emotion
+    assert not agent.cnn_model.batches[0][:, :, window_frames:].any()
+
+    long_window = agent.predict_emotion_timeline(DecodedAudio(y, agent.sr), window_seconds=10.0)
+    assert long_window["window_seconds"] == 174 * HOP_LENGTH / agent.sr
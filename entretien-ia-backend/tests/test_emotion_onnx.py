@@ -0,0 +1,21 @@
+import os
+import numpy as np
+import pytest
+from agents.EmotionAgent import CNN_MODEL_PATH, ONNX_MODEL_PATH, OnnxCNNModel
+
+pytest.importorskip("onnxruntime")
+pytestmark = pytest.mark.skipif(
+    not (os.path.exists(CNN_MODEL_PATH) and os.path.exists(ONNX_MODEL_PATH)),
+    reason="Modèle CNN ou export ONNX absent (lancer train_emotion_cnn.py puis export_emotion_onnx.py)."
+)
+
+def test_onnx_matches_keras_outputs():
+    """
+    Valide que l'export ONNX donne les mêmes probabilités que le modèle Keras d'origine.
+    """
+    keras_models = pytest.importorskip("tensorflow.keras.models")
+    keras_model = keras_models.load_model(CNN_MODEL_PATH)
+    onnx_model = OnnxCNNModel(ONNX_MODEL_PATH)
+    batch = np.random.default_rng(0).uniform(-80, 0, size=(8, 128, 174, 1)).astype(np.float32)
+
+    np.testing.assert_allclose(onnx_model.predict(batch), keras_model.predict(batch, verbose=0), atol=1e-4)
@@ -0,0 +1,31 @@
+from services.grammar_cache import GrammarCache
+
+ERRORS = [{"message": "Accord", "correction": "allé", "context": "Je suis aller", "offset": 8, "length": 5}]
+
+
+def test_result_is_keyed_by_normalized_text_and_version(db_session):
+    """
+    Valide qu'un résultat est resservi pour le même texte aux blancs près, mais pas
+    pour une autre version de LanguageTool, et que les compteurs suivent les accès.
+    """
+    cache = GrammarCache("fr-FR")
+    cache.put("Je suis aller au marché.", "6.4", ERRORS)
+    db_session.commit()
+
+    assert cache.get("  Je suis  aller au\nmarché. ", "6.4") == ERRORS
+    assert cache.get("Je suis aller au marché.", "6.5") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    # Un nouveau worker (mémoire vide) relit le résultat depuis la base
+    fresh_cache = GrammarCache("fr-FR")
+    assert fresh_cache.get_many(["Je suis aller au marché.", "Autre réponse."], "6.4") == [ERRORS, None]
+    assert fresh_cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+
+def test_lru_eviction_without_persistence(db_session):
+    cache = GrammarCache("fr-FR", max_entries=1, persist=False)
+    cache.put("Réponse A", "6.4", ERRORS)
+    cache.put("Réponse B", "6.4", [])
+
+    assert cache.get("Réponse A", "6.4") is None
+    assert cache.get("Réponse B", "6.4") == []
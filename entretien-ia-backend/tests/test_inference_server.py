@@ -0,0 +1,64 @@
+import threading
+import numpy as np
+import pytest
+from services.inference_server import MicroBatcher, InferenceServer, InferenceClient, is_loopback
+
+
+def fake_predict(recorded_batch_sizes):
+    """Faux modèle : renvoie la somme de chaque exemple et note la taille des lots reçus."""
+    def predict(batch):
+        recorded_batch_sizes.append(len(batch))
+        return batch.reshape(len(batch), -1).sum(axis=1, keepdims=True)
+    return predict
+
+def test_micro_batcher_groups_concurrent_requests():
+    """
+    Valide que des requêtes simultanées sont regroupées en un seul appel au modèle
+    et que chaque appelant reçoit bien ses propres résultats.
+    """
+    batch_sizes = []
+    batcher = MicroBatcher(fake_predict(batch_sizes), max_batch_size=64, max_wait_ms=200)
+    inputs = [np.full((2, 3), i, dtype=np.float32) for i in range(6)]
+
+    futures = [batcher.submit(x) for x in inputs]
+    results = [future.result(timeout=5) for future in futures]
+    batcher.stop()
+
+    for i, result in enumerate(results):
+        np.testing.assert_allclose(result, [[3 * i], [3 * i]])
+    assert max(batch_sizes) > 2
+    metrics = batcher.metrics()
+    assert metrics["requests"] == 6
+    assert metrics["latency_p99_ms"] >= metrics["latency_p50_ms"]
+
+def test_inference_server_round_trip():
+    batcher = MicroBatcher(fake_predict([]), max_batch_size=8, max_wait_ms=1)
+    server = InferenceServer(batcher, address=('localhost', 0), authkey=b'test')
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = InferenceClient(server.address, authkey=b'test')
+    try:
+        result = client.predict(np.ones((3, 4)))
+        np.testing.assert_allclose(result, [[4], [4], [4]])
+        assert client.metrics()["requests"] == 1
+    finally:
+        client.close()
+        server.close()
+
+def test_inference_endpoints_require_authkey_and_loopback():
+    """
+    Sans clé, ni le serveur ni le client ne sont créés ; le serveur refuse une adresse
+    hors boucle locale tant que allow_remote n'est pas demandé.
+    """
+    batcher = MicroBatcher(fake_predict([]), max_batch_size=8, max_wait_ms=1)
+    try:
+        with pytest.raises(ValueError):
+            InferenceServer(batcher, authkey=b'', address=('localhost', 0))
+        with pytest.raises(ValueError):
+            InferenceServer(batcher, authkey=b'test', address=('0.0.0.0', 0))
+        with pytest.raises(ValueError):
+            InferenceClient('localhost:6010', authkey=b'')
+    finally:
+        batcher.stop()
+    assert is_loopback('localhost') and is_loopback('127.0.0.1') and is_loopback('::1')
+    assert not is_loopback('') and not is_loopback('0.0.0.0') and not is_loopback('10.0.0.5')
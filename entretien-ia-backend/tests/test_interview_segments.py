@@ -0,0 +1,60 @@
+from database.models import Questions, InterviewSegments
+from services.analysis_service import _load_analyzed_segments, _segment_record, _update_current_segment
+
+
+def test_only_analyzed_segments_of_current_attempt_are_reused(db_session, sample_session):
+    """
+    Valide que run_analysis ne réutilise que les segments analysés de la tentative courante,
+    à la position de la timeline qui porte bien leur question et qui a commencé au même instant.
+    """
+    first, second = Questions(intitule="Présentez-vous."), Questions(intitule="Vos motivations ?")
+    db_session.add_all([first, second])
+    db_session.commit()
+    sample_session.tentatives_realisees = 1
+    events = [{"questionId": first.id, "timestamp": 0}, {"questionId": second.id, "timestamp": 30},
+              {"questionId": first.id, "timestamp": 75}]
+
+    def segment(question, index, tentative=1, statut='analyzed', timestamp=None):
+        return InterviewSegments(session_id=sample_session.id, question_id=question.id, tentative=tentative,
+                                 question_index=index, fichier="1/segment.webm",
+                                 statut=statut, transcription="Je suis développeuse.", score_pertinence=0.8,
+                                 score_grammaire=0.95, erreurs_grammaire=[], speech_rate=130.0, pause_count=2,
+                                 average_pause_duration=0.6,
+                                 timestamp=events[index]['timestamp'] if timestamp is None else timestamp)
+
+    db_session.add_all([
+        segment(first, 0),
+        segment(first, 1),  # question inattendue à cette position
+        segment(second, 1, tentative=2),  # tentative suivante
+        segment(first, 2, timestamp=62),  # enregistré à un autre instant que sa question
+    ])
+    db_session.commit()
+
+    stored = _load_analyzed_segments(sample_session, events)
+    assert list(stored) == [0]
+
+    record = _segment_record(stored[0])
+    assert record["question_id"] == first.id
+    assert record["transcription"] == "Je suis développeuse."
+    assert record["average_pause_duration"] == 0.6
+
+def test_results_are_not_written_on_a_replaced_segment(db_session, sample_session):
+    """
+    Valide qu'une analyse lancée sur un fichier n'écrit rien si la question a été renvoyée
+    entre-temps (upload_segment remplace le fichier de la même ligne).
+    """
+    question = Questions(intitule="Présentez-vous.")
+    db_session.add(question)
+    db_session.commit()
+    segment = InterviewSegments(session_id=sample_session.id, question_id=question.id, tentative=1,
+                                question_index=0, fichier="1/nouveau.webm", statut='uploaded', timestamp=0)
+    db_session.add(segment)
+    db_session.commit()
+
+    assert not _update_current_segment(segment.id, "1/ancien.webm", {'statut': 'analyzed', 'transcription': "Ancienne réponse."})
+    db_session.refresh(segment)
+    assert (segment.statut, segment.transcription) == ('uploaded', None)
+
+    assert _update_current_segment(segment.id, "1/nouveau.webm", {'statut': 'analyzed', 'transcription': "Nouvelle réponse."})
+    db_session.refresh(segment)
+    assert (segment.statut, segment.transcription) == ('analyzed', "Nouvelle réponse.")
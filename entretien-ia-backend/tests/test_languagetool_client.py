@@ -0,0 +1,56 @@
+from utils.languagetool_client import LanguageToolClient, TEXT_SEPARATOR, CONTEXT_CHARS
+
+
+class _FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def _match(offset, length, message="Erreur"):
+    return {"offset": offset, "length": length, "message": message,
+            "replacements": [{"value": "correction"}], "context": {"text": "contexte"}}
+
+
+def test_check_many_splits_matches_by_offset(monkeypatch):
+    """
+    Valide qu'une session part en une seule requête (doublons envoyés une fois) et que
+    les matches sont redistribués par offset vers leur réponse.
+    """
+    first, second = "Je suis aller au marcher.", "C'est des bon fruits."
+    second_start = len(first) + len(TEXT_SEPARATOR)
+    posted = []
+
+    client = LanguageToolClient("http://localhost:8081")
+
+    def fake_post(url, timeout, data):
+        posted.append(data['text'])
+        if data['text'] == first + TEXT_SEPARATOR + second:
+            return _FakeResponse({"matches": [_match(8, 5), _match(second_start + 9, 3),
+                                              _match(len(first) - 1, 4)]})
+        return _FakeResponse({"matches": []})
+
+    monkeypatch.setattr(client.session, 'post', fake_post)
+
+    results = client.check_many([first, second, first])
+    assert len(posted) == 1
+    assert [error['offset'] for error in results[0]] == [8]
+    assert [error['offset'] for error in results[1]] == [9]
+    assert results[2] == results[0]
+    assert results[0][0]['correction'] == "correction"
+    # Contexte découpé dans la réponse : rien de la réponse voisine
+    assert results[0][0]['context'] == first
+    assert results[1][0]['context'] == second
+
+def test_match_context_is_clipped_to_the_answer(monkeypatch):
+    long_answer = "a" * 60 + " erreur " + "b" * 60
+    client = LanguageToolClient("http://localhost:8081")
+    monkeypatch.setattr(client.session, 'post', lambda url, timeout, data: _FakeResponse({"matches": [_match(61, 6)]}))
+
+    context = client.check(long_answer)[0]['context']
+    assert context == "..." + long_answer[61 - CONTEXT_CHARS:67 + CONTEXT_CHARS] + "..."
@@ -0,0 +1,74 @@
+import pytest
+from unittest import mock
+from services import model_registry
+
+
+@pytest.fixture
+def fake_factories(monkeypatch):
+    """Remplace les vrais agents par des objets légers pour tester le registre."""
+    created = []
+
+    def make(name):
+        def factory():
+            created.append(name)
+            return object()
+        return factory
+
+    monkeypatch.setattr(model_registry, 'AGENT_FACTORIES', {n: make(n) for n in ['nlp', 'audio', 'emotion', 'rapport', 'video']})
+    monkeypatch.setattr(model_registry, '_agents', {})
+    monkeypatch.setattr(model_registry, '_load_stats', {})
+    return created
+
+def test_get_agent_loads_once_per_process(fake_factories):
+    """
+    Valide qu'un même agent n'est instancié qu'une seule fois et partagé entre les appels.
+    """
+    first = model_registry.get_agent('audio')
+    second = model_registry.get_agent('audio')
+
+    assert first is second
+    assert fake_factories.count('audio') == 1
+
+def test_get_agents_keeps_historical_order(fake_factories):
+    agents = model_registry.get_agents()
+
+    assert len(agents) == 5
+    assert fake_factories == ['nlp', 'audio', 'emotion', 'rapport', 'video']
+    assert set(model_registry.report_load_stats()) == {'nlp', 'audio', 'emotion', 'rapport', 'video'}
+
+def test_get_agent_unknown_name(fake_factories):
+    with pytest.raises(KeyError):
+        model_registry.get_agent('inconnu')
+
+def test_warm_up_only_calls_existing_loaders(monkeypatch):
+    """
+    Valide que warm_up() n'appelle que des chargeurs qui existent sur les vraies classes d'agents :
+    chaque agent est remplacé par un mock à la signature de sa classe (create_autospec).
+    """
+    agent_classes = {
+        'nlp': model_registry.NLPAgent, 'audio': model_registry.AudioAgent, 'emotion': model_registry.EmotionAgent,
+        'rapport': model_registry.RapportAgent, 'video': model_registry.VideoAgent
+    }
+    monkeypatch.setattr(model_registry, 'AGENT_FACTORIES', {
+        name: (lambda agent_class=agent_class: mock.create_autospec(agent_class, instance=True))
+        for name, agent_class in agent_classes.items()
+    })
+    monkeypatch.setattr(model_registry, '_agents', {})
+    monkeypatch.setattr(model_registry, '_load_stats', {})
+
+    stats = model_registry.warm_up()
+
+    assert {'nlp.semantic', 'nlp.grammar', 'nlp.rag', 'emotion.classifier'} <= set(stats)
+
+def test_process_pool_is_reused_until_discarded(monkeypatch):
+    """
+    Valide que le pool de processus d'analyse est partagé entre les analyses, puis recréé après discard_process_pool().
+    """
+    monkeypatch.setattr(model_registry, '_process_pools', {})
+    pool = model_registry.get_process_pool('answers', 2, ('audio',))
+
+    assert model_registry.get_process_pool('answers', 2, ('audio',)) is pool
+    model_registry.discard_process_pool('answers')
+    new_pool = model_registry.get_process_pool('answers', 2, ('audio',))
+    assert new_pool is not pool
+    model_registry.discard_process_pool('answers')
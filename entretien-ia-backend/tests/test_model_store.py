@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from utils import model_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """
+    Magasin temporaire avec un seul modèle déclaré, un fichier indexé.
+    """
+    monkeypatch.setattr(model_store, 'MODELS_DIR', str(tmp_path))
+    monkeypatch.delenv('MODELS_OFFLINE', raising=False)
+    model_dir = tmp_path / 'semantic-model'
+    model_dir.mkdir()
+    (model_dir / 'config.json').write_text('{"dim": 384}')
+    manifest = {"version": 1, "models": {"semantic": {"type": "huggingface", "source": "org/semantic",
+                                                      "path": "semantic-model", "files": {}}}}
+    (tmp_path / 'manifest.json').write_text(json.dumps(manifest))
+    manifest['models']['semantic']['files'] = model_store.compute_file_index(str(model_dir))
+    model_store.save_manifest(manifest)
+    return model_dir
+
+
+def test_resolve_prefers_local_copy(store):
+    assert model_store.resolve('semantic', 'org/semantic') == str(store)
+    assert model_store.resolve('inconnu', 'org/inconnu') == 'org/inconnu'
+
+
+def test_offline_mode_fails_fast_on_missing_or_corrupted_model(store, monkeypatch):
+    monkeypatch.setenv('MODELS_OFFLINE', 'true')
+    with pytest.raises(model_store.ModelStoreError):
+        model_store.resolve('inconnu', 'org/inconnu')
+
+    assert model_store.ensure_available(['semantic']) == {'semantic': []}
+
+    # Même taille, contenu différent : seul le contrôle complet le détecte
+    (store / 'config.json').write_text('{"dim": 768}')
+    assert model_store.verify('semantic') == []
+    assert model_store.verify('semantic', full_checksum=True) == ["checksum invalide : config.json"]
+    with pytest.raises(model_store.ModelStoreError):
+        model_store.ensure_available(['semantic'], full_checksum=True)
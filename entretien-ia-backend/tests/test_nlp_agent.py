@@ -53,4 +53,24 @@ def test_analyze_relevance_with_empty_inputs(nlp_agent):
     assert nlp_agent.analyze_relevance(question, "") == 0.0
     assert nlp_agent.analyze_relevance("", "Une réponse") == 0.0
     assert nlp_agent.analyze_relevance(question, None) == 0.0
-    assert nlp_agent.analyze_relevance(None, "Une réponse") == 0.0
\ No newline at end of file
+    assert nlp_agent.analyze_relevance(None, "Une réponse") == 0.0
+
+def test_analyze_relevance_batch_matches_single_calls(nlp_agent):
+    """
+    Valide que le scoring en batch donne les mêmes scores que les appels unitaires,
+    dans le même ordre, et 0.0 pour les paires incomplètes.
+    """
+    question = "Quelles sont vos expériences avec les bases de données SQL et NoSQL ?"
+    pairs = [
+        (question, "J'ai beaucoup travaillé avec PostgreSQL et MongoDB."),
+        (question, "J'aime beaucoup travailler en équipe."),
+        (question, ""),
+        (None, "Une réponse"),
+    ]
+
+    batch_scores = nlp_agent.analyze_relevance_batch(pairs)
+
+    assert len(batch_scores) == len(pairs)
+    for (reference, response), batch_score in zip(pairs, batch_scores):
+        assert batch_score == pytest.approx(nlp_agent.analyze_relevance(reference, response), abs=0.01)
+    assert batch_scores[2:] == [0.0, 0.0]
@@ -0,0 +1,31 @@
+import numpy as np
+from utils.pitch import yin_f0, PitchTrack
+
+SR = 16000
+
+def tone(frequency, duration_s):
+    t = np.arange(int(duration_s * SR)) / SR
+    return 0.5 * np.sin(2 * np.pi * frequency * t)
+
+def test_yin_finds_fundamental_and_ignores_silence():
+    """
+    Valide la f0 estimée sur un son pur et l'absence de pitch sur le silence.
+    """
+    y = np.concatenate([tone(200, 1.0), np.zeros(SR)])
+
+    f0 = yin_f0(y, SR, hop_length=256)
+    voiced = f0[f0 > 0]
+
+    assert abs(np.median(voiced) - 200) < 2
+    assert np.all(f0[-20:] == 0)
+
+def test_pitch_track_window_stats_match_slice():
+    y = np.concatenate([tone(150, 1.0), tone(300, 1.0)])
+    track = PitchTrack(yin_f0(y, SR, hop_length=256), SR, 256)
+
+    low_mean, _ = track.window(0.1, 0.9).stats()
+    high_mean, _ = track.window(1.1, 1.9).stats()
+
+    assert abs(low_mean - 150) < 3
+    assert abs(high_mean - 300) < 5
+    assert PitchTrack(np.zeros(10), SR, 256).stats() == (0.0, 0.0)
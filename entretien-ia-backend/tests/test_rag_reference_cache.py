@@ -0,0 +1,27 @@
+from services.rag_reference_cache import RagReferenceCache
+
+
+def test_reference_is_reused_for_same_vector_db_version(db_session):
+    """
+    Valide qu'une référence générée est relue depuis le cache (mémoire puis base)
+    tant que la version de la base vectorielle ne change pas.
+    """
+    cache = RagReferenceCache("google/flan-t5-base")
+    cache.put("Quelles sont nos valeurs ?", "v1", "Innovation, Collaboration, Intégrité.")
+    db_session.commit()
+
+    assert cache.get("Quelles sont nos valeurs ?", "v1") == "Innovation, Collaboration, Intégrité."
+    assert cache.get("Quelles sont nos valeurs ?", "v2") is None
+
+    # Un nouveau worker (mémoire vide) relit la référence depuis la base
+    fresh_cache = RagReferenceCache("google/flan-t5-base")
+    assert fresh_cache.get("Quelles sont nos valeurs ?", "v1") == "Innovation, Collaboration, Intégrité."
+
+def test_lru_eviction_falls_back_to_database(db_session):
+    cache = RagReferenceCache("google/flan-t5-base", max_entries=1)
+    cache.put("Question A", "v1", "Référence A")
+    cache.put("Question B", "v1", "Référence B")
+    db_session.commit()
+    assert len(cache._entries) == 1
+
+    assert cache.get("Question A", "v1") == "Référence A"
@@ -0,0 +1,44 @@
+import pytest
+from agents.RapportAgent import RapportAgent
+from database.models import Questions, Answers, AudioFeatures, EmotionScores, Reports, Sessions
+from services.rescoring_service import rescore_profile
+
+
+def test_rescore_profile_matches_report_agent(db_session, sample_session, sample_profile):
+    """
+    Valide que le recalcul en lot donne la même note que RapportAgent à partir des scores stockés,
+    et qu'il suit les nouveaux poids du profil. Une session sans données vaut l'engagement neutre (50).
+    """
+    question = Questions(intitule="Présentez-vous.")
+    empty_session = Sessions(user_id=sample_session.user_id, recruteur_id=sample_session.recruteur_id,
+                             poste_vise="Test Post", profil_ponderation_id=sample_profile.id)
+    db_session.add_all([question, empty_session])
+    db_session.commit()
+    db_session.add_all([
+        Answers(session_id=sample_session.id, question_id=question.id, score_pertinence=0.7, score_grammaire=0.8),
+        Answers(session_id=sample_session.id, question_id=question.id, score_pertinence=0.9, score_grammaire=None),
+        AudioFeatures(session_id=sample_session.id, fluency_score=60.0),
+        EmotionScores(session_id=sample_session.id, scores={'calme': 0.4, 'heureux': 0.2, 'peur': 0.1}),
+        Reports(session_id=sample_session.id, note_globale=0.0),
+        Reports(session_id=empty_session.id, note_globale=0.0),
+    ])
+    db_session.commit()
+    analysis_results = {
+        'answers_analysis': [
+            {'score_pertinence': 0.7, 'score_grammaire': 0.8},
+            {'score_pertinence': 0.9, 'score_grammaire': None}
+        ],
+        'vocal_analysis': {'fluency_score': 60.0},
+        'emotion_analysis': {'scores': {'calme': 0.4, 'heureux': 0.2, 'peur': 0.1}}
+    }
+
+    for poids in (sample_profile.poids, {'relevance': 10, 'clarity': 10, 'fluency': 40, 'engagement': 40}):
+        sample_profile.poids = poids
+        db_session.commit()
+
+        assert rescore_profile(sample_profile.id) == 2
+        db_session.commit()
+
+        expected = RapportAgent().calculate_global_score(sample_session.id, analysis_results)
+        assert sample_session.report.note_globale == pytest.approx(expected)
+        assert empty_session.report.note_globale == pytest.approx(50 * poids['engagement'] / 100)
@@ -0,0 +1,120 @@
+from collections import namedtuple
+from services.timeline_service import (
+    SegmentRouter, question_window, summarize_emotion_timeline, transcription_windows, stitch_window_segments
+)
+
+Segment = namedtuple('Segment', ['start', 'end', 'text'])
+
+EVENTS = [
+    {"questionId": 1, "timestamp": 0},
+    {"questionId": 2, "timestamp": 10},
+    {"questionId": 3, "timestamp": 20},
+]
+
+def test_question_window_last_question_ends_with_media():
+    assert question_window(EVENTS, 0, 35.0) == (0, 10)
+    assert question_window(EVENTS, 2, 35.0) == (20, 35.0)
+
+def test_router_matches_full_scan_and_closes_windows_early():
+    """
+    Valide que le routage en flux donne les mêmes réponses que le balayage complet
+    historique (segment rattaché à la fenêtre qui contient son début, y compris quand il
+    déborde sur la question suivante), et que chaque fenêtre est livrée dès que Whisper la dépasse.
+    """
+    segments = [
+        Segment(1.0, 4.0, " Bonjour, "),
+        Segment(5.0, 9.5, "je m'appelle Léa. "),
+        Segment(9.6, 13.0, " Voilà."),
+        Segment(13.0, 15.0, " J'aime les défis."),
+        Segment(26.0, 30.0, " Merci."),
+    ]
+    full_scan = [
+        " ".join(segment.text.strip() for segment in segments if start <= segment.start < end)
+        for start, end in (question_window(EVENTS, i, 35.0) for i in range(len(EVENTS)))
+    ]
+    delivered = []
+
+    def tracked_segments():
+        for segment in segments:
+            delivered.append(segment)
+            yield segment
+
+    router = SegmentRouter(EVENTS, 35.0)
+    routed = []
+    for index, text in router.route(tracked_segments()):
+        routed.append((index, text, len(delivered)))
+
+    assert [(i, t) for i, t, _ in routed] == [
+        (0, "Bonjour, je m'appelle Léa. Voilà."),
+        (1, "J'aime les défis."),
+        (2, "Merci."),
+    ]
+    assert [t for _, t, _ in routed] == full_scan
+    # La réponse 0 est livrée au 4e segment, avant la fin de la transcription
+    assert routed[0][2] == 4
+    assert router.full_transcription == "Bonjour, je m'appelle Léa. Voilà. J'aime les défis. Merci."
+
+def test_router_yields_empty_windows_and_ignores_leading_segments():
+    segments = [Segment(-1.0, 0.0, "Avant."), Segment(25.0, 27.0, "Fin.")]
+    router = SegmentRouter(EVENTS, 35.0)
+
+    assert list(router.route(iter(segments))) == [(0, ""), (1, ""), (2, "Fin.")]
+
+def test_summarize_emotion_timeline_by_question():
+    """
+    Valide l'agrégation des fenêtres émotionnelles : chaque fenêtre est rattachée
+    à la question qui contient son centre.
+    """
+    emotion_timeline = {
+        "labels": ["calme", "peur"],
+        "starts": [0.0, 1.5, 3.0, 4.5],
+        "window_seconds": 3.0,
+        "hop_seconds": 1.5,
+        "probabilities": [[0.9, 0.1], [0.8, 0.2], [0.2, 0.8], [0.1, 0.9]],
+    }
+    events = [{"questionId": 7, "timestamp": 0.0}, {"questionId": 8, "timestamp": 4.0}]
+
+    summary = summarize_emotion_timeline(emotion_timeline, events)
+
+    assert summary["scores"] == {"calme": 0.5, "peur": 0.5}
+    assert summary["scores_by_question"]["7"]["dominant_emotion"] == "calme"
+    assert summary["scores_by_question"]["7"]["window_count"] == 2
+    assert summary["scores_by_question"]["8"]["dominant_emotion"] == "peur"
+    assert summary["timeline"]["dominant"] == [0, 0, 1, 1]
+
+
+def test_windowed_transcription_is_stitched_without_duplicates():
+    """
+    Valide que les segments de fenêtres transcrites avec chevauchement sont remis en temps
+    absolu et que le segment vu par deux fenêtres voisines n'est gardé qu'une fois.
+    """
+    events = [{"questionId": 1, "timestamp": 2.0}, {"questionId": 2, "timestamp": 10.0}]
+    windows = transcription_windows(events, 18.0)
+    assert windows == [(0.0, 2.0), (2.0, 10.0), (10.0, 18.0)]
+
+    # Fenêtres 2 et 3 extraites avec 0.5 s de chevauchement : [1.5, 10.5[ et [9.5, 18[
+    first = stitch_window_segments([Segment(0.5, 4.0, " Bonjour."), Segment(7.5, 8.9, " Au revoir.")], windows[1], 1.5)
+    second = stitch_window_segments([Segment(0.0, 0.9, " Au revoir."), Segment(1.0, 5.0, " Question deux.")], windows[2], 9.5)
+    stitched = first + second
+
+    assert [segment.text for segment in stitched] == [" Bonjour.", " Au revoir.", " Question deux."]
+    assert (stitched[0].start, stitched[2].end) == (2.0, 14.5)
+
+    router = SegmentRouter(events, 18.0, by_midpoint=True)
+    assert list(router.route(stitched)) == [(0, "Bonjour. Au revoir."), (1, "Question deux.")]
+
+def test_segment_straddling_a_boundary_goes_to_the_question_of_its_center():
+    """
+    Valide qu'en transcription par fenêtres, le recollage et le routage rattachent un segment à
+    cheval sur deux questions à la même question : celle qui contient son centre, pas son début.
+    La transcription globale garde le rattachement historique par le début du segment.
+    """
+    # Fenêtre de la question 2 extraite avec 0.5 s de chevauchement : [9.5, 20.5[
+    stitched = stitch_window_segments([Segment(0.0, 4.5, " Je commence."), Segment(5.0, 9.0, " Je continue.")], (10.0, 20.0), 9.5)
+    assert [(segment.start, segment.end) for segment in stitched] == [(9.5, 14.0), (14.5, 18.5)]
+
+    router = SegmentRouter(EVENTS, 35.0, by_midpoint=True)
+    assert list(router.route(stitched)) == [(0, ""), (1, "Je commence. Je continue."), (2, "")]
+    straddling = [Segment(8.0, 14.0, "À cheval.")]
+    assert list(SegmentRouter(EVENTS, 35.0, by_midpoint=True).route(straddling)) == [(0, ""), (1, "À cheval."), (2, "")]
+    assert list(SegmentRouter(EVENTS, 35.0).route(straddling)) == [(0, "À cheval."), (1, ""), (2, "")]
@@ -0,0 +1,21 @@
+import numpy as np
+from utils.vad import probabilities_to_segments
+
+def test_hysteresis_keeps_speech_between_thresholds_and_merges_short_silences():
+    """
+    Valide la conversion vectorisée des probabilités Silero en segments :
+    une probabilité entre les deux seuils prolonge la parole, un silence de 64 ms est fusionné.
+    """
+    probabilities = np.array([0.1] * 10 + [0.9] * 20 + [0.4] * 2 + [0.1] * 2 + [0.9] * 20 + [0.1] * 30)
+
+    segments = probabilities_to_segments(probabilities, sampling_rate=16000)
+
+    assert segments.tolist() == [[4640, 28128]]
+
+def test_short_speech_bursts_are_dropped():
+    probabilities = np.array([0.1] * 10 + [0.9] * 3 + [0.1] * 20 + [0.9] * 15 + [0.1] * 10)
+
+    segments = probabilities_to_segments(probabilities, sampling_rate=16000, speech_pad_ms=0)
+
+    assert segments.tolist() == [[33 * 512, 48 * 512]]
+    assert probabilities_to_segments(np.zeros(0)).shape == (0, 2)
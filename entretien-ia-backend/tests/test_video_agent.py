@@ -75,4 +75,23 @@ def test_classify_gaze_handles_errors_gracefully(video_agent):
     mock_invalid_landmarks = MagicMock()
     mock_invalid_landmarks.landmark = []
     direction = video_agent._classify_gaze_direction_by_face_center(mock_invalid_landmarks)
-    assert direction == "hors_champ"
\ No newline at end of file
+    assert direction == "hors_champ"
+
+def test_aggregate_gaze_by_question(video_agent):
+    """
+    Valide l'agrégation globale et par question, indépendante du mode d'échantillonnage.
+    """
+    gaze_events = [
+        {"timestamp": 0.0, "behavior": "Contact Visuel"},
+        {"timestamp": 0.5, "behavior": "Contact Visuel"},
+        {"timestamp": 1.0, "behavior": "Lecture"},
+        {"timestamp": 1.5, "behavior": "Lecture"},
+    ]
+    events_timeline = [{"questionId": 7, "timestamp": 0}, {"questionId": 9, "timestamp": 1.0}, {"questionId": 11, "timestamp": 5.0}]
+
+    result = video_agent._aggregate_gaze(gaze_events, events_timeline)
+
+    assert result["gaze_global_distribution"] == {"Contact Visuel": 50.0, "Lecture": 50.0}
+    assert result["gaze_by_question"]["7"] == {"Contact Visuel": 100.0}
+    assert result["gaze_by_question"]["9"] == {"Lecture": 100.0}
+    assert result["gaze_by_question"]["11"] == {"Distraction": 100.0}
@@ -0,0 +1,26 @@
+import numpy as np
+
+
+def window_starts(n_frames: int, window_frames: int, hop_frames: int) -> np.ndarray:
+    """
+    Indices de début des fenêtres glissantes couvrant toutes les trames :
+    une dernière fenêtre est alignée sur la fin si le pas ne tombe pas juste.
+    """
+    if n_frames <= window_frames:
+        return np.zeros(1, dtype=np.int64)
+    starts = np.arange(0, n_frames - window_frames + 1, max(1, hop_frames), dtype=np.int64)
+    if starts[-1] + window_frames < n_frames:
+        starts = np.append(starts, n_frames - window_frames)
+    return starts
+
+
+def window_means(frames: np.ndarray, starts: np.ndarray, window_frames: int) -> np.ndarray:
+    """
+    Moyenne de chaque fenêtre d'une matrice (n_features, n_trames) via une somme cumulée :
+    un seul passage sur les trames quel que soit le recouvrement. Retourne (n_fenêtres, n_features).
+    """
+    n_features, n_frames = frames.shape
+    cumulative = np.zeros((n_features, n_frames + 1), dtype=np.float64)
+    np.cumsum(frames, axis=1, out=cumulative[:, 1:])
+    ends = np.minimum(starts + window_frames, n_frames)
+    return ((cumulative[:, ends] - cumulative[:, starts]) / (ends - starts)).T
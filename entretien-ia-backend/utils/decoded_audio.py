@@ -0,0 +1,91 @@
+import threading
+import numpy as np
+
+DEFAULT_SAMPLE_RATE = 16000
+
+
+class DecodedAudio:
+    """
+    Audio d'une session décodé une seule fois : buffer mono float32 à 16 kHz,
+    partagé par tous les agents (Whisper, VAD, pitch, émotions).
+    Les vues à d'autres fréquences (22.05 kHz pour EmotionAgent) sont dérivées
+    paresseusement puis mises en cache.
+    """
+    def __init__(self, samples: np.ndarray, sample_rate: int = DEFAULT_SAMPLE_RATE, source_path: str = None):
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim > 1:
+            # Format (canaux, échantillons) de torchaudio
+            samples = samples.mean(axis=0).astype(np.float32)
+        self.samples = np.ascontiguousarray(samples)
+        self.sample_rate = sample_rate
+        self.source_path = source_path
+        self._resampled = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Le verrou n'est pas sérialisable (envoi vers les pools de processus)
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, audio_path: str, sample_rate: int = DEFAULT_SAMPLE_RATE):
+        """
+        Charge un fichier audio déjà décodable (WAV, FLAC...) et le ramène en mono à `sample_rate`.
+        """
+        import librosa
+        samples, _ = librosa.load(audio_path, sr=sample_rate, mono=True)
+        return cls(samples, sample_rate, source_path=audio_path)
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    def __len__(self):
+        return len(self.samples)
+
+    def tensor(self):
+        """
+        Vue PyTorch (1, N) du buffer, sans copie : format attendu par Silero-VAD.
+        """
+        import torch
+        return torch.from_numpy(self.samples).unsqueeze(0)
+
+    def at_rate(self, sample_rate: int) -> np.ndarray:
+        """
+        Retourne le signal rééchantillonné à `sample_rate`, calculé une seule fois par fréquence.
+        """
+        if sample_rate == self.sample_rate:
+            return self.samples
+        with self._lock:
+            if sample_rate not in self._resampled:
+                import librosa
+                self._resampled[sample_rate] = librosa.resample(
+                    self.samples, orig_sr=self.sample_rate, target_sr=sample_rate
+                ).astype(np.float32)
+            return self._resampled[sample_rate]
+
+    def slice(self, start_time: float, end_time: float = None) -> 'DecodedAudio':
+        """
+        Extrait la fenêtre [start_time, end_time[ (en secondes) dans un nouvel objet.
+        Le buffer est copié pour pouvoir être envoyé à un autre processus sans sérialiser l'audio complet.
+        """
+        start_sample = max(0, int(start_time * self.sample_rate))
+        end_sample = len(self.samples) if end_time is None else int(end_time * self.sample_rate)
+        return DecodedAudio(self.samples[start_sample:end_sample].copy(), self.sample_rate, source_path=self.source_path)
+
+
+def load_signal(audio, sample_rate: int) -> np.ndarray:
+    """
+    Retourne le signal mono à `sample_rate` à partir d'un DecodedAudio (sans nouveau décodage)
+    ou, pour les scripts et tests manuels des agents, d'un chemin de fichier.
+    """
+    if isinstance(audio, DecodedAudio):
+        return audio.at_rate(sample_rate)
+    import librosa
+    samples, _ = librosa.load(audio, sr=sample_rate, mono=True)
+    return samples
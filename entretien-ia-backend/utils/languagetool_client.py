@@ -0,0 +1,142 @@
+import hashlib
+import re
+import unicodedata
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Séparateur entre réponses dans une requête groupée : un saut de paragraphe, pour que
+# les règles de début de phrase et de ponctuation s'appliquent à chaque réponse comme seule
+TEXT_SEPARATOR = "\n\n"
+# Caractères gardés de part et d'autre d'une erreur dans son contexte (contextSize par défaut du serveur)
+CONTEXT_CHARS = 40
+
+
+def normalize_text(text: str) -> str:
+    """
+    Forme canonique d'une réponse (Unicode NFC, espaces fusionnés) : deux transcriptions
+    qui ne diffèrent que par les blancs partagent la même clé de cache et les mêmes offsets.
+    """
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text or '')).strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _match_context(text: str, offset: int, length: int) -> str:
+    """
+    Contexte d'une erreur découpé dans la réponse elle-même, au format du serveur ('...' aux coupures) :
+    celui renvoyé pour une requête groupée peut déborder sur les réponses voisines.
+    """
+    start, end = max(0, offset - CONTEXT_CHARS), min(len(text), offset + length + CONTEXT_CHARS)
+    return ("..." if start > 0 else "") + text[start:end] + ("..." if end < len(text) else "")
+
+
+def _format_match(match: dict, text: str, text_offset: int) -> dict:
+    """
+    Match de l'API HTTP /v2/check -> dictionnaire stocké dans Answers.erreurs_grammaire,
+    avec l'offset ramené au début de la réponse `text` et le contexte limité à celle-ci.
+    """
+    replacements = match.get('replacements') or []
+    offset = match['offset'] - text_offset
+    return {
+        "message": match.get('message', ''),
+        "correction": replacements[0]['value'] if replacements else "N/A",
+        "context": _match_context(text, offset, match['length']),
+        "offset": offset,
+        "length": match['length']
+    }
+
+
+class LanguageToolClient:
+    """
+    Client HTTP d'un serveur LanguageTool local et persistant (scripts/run_languagetool_server.py) :
+    la JVM démarre une seule fois pour tous les workers, qui gardent des connexions keep-alive
+    dans un pool requests. check_many() vérifie toutes les réponses d'une session en une requête.
+    """
+    def __init__(self, base_url: str, language: str = 'fr-FR', pool_size: int = 4, timeout: float = 30.0,
+                 max_request_chars: int = 50000):
+        self.base_url = base_url.rstrip('/')
+        self.language = language
+        self.timeout = timeout
+        self.max_request_chars = max_request_chars
+        self._version = None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=Retry(total=2, backoff_factor=0.2, allowed_methods=None))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def ping(self) -> bool:
+        try:
+            return self.session.get(f"{self.base_url}/v2/languages", timeout=self.timeout).ok
+        except requests.RequestException:
+            return False
+
+    def _post_check(self, text: str) -> dict:
+        response = self.session.post(f"{self.base_url}/v2/check", timeout=self.timeout,
+                                     data={"language": self.language, "text": text})
+        response.raise_for_status()
+        payload = response.json()
+        self._version = (payload.get('software') or {}).get('version') or self._version
+        return payload
+
+    def version(self) -> str:
+        """
+        Version du serveur LanguageTool (champ software.version des réponses), lue au besoin
+        par une vérification minimale.
+        """
+        if self._version is None:
+            self._post_check(".")
+        return self._version or 'inconnue'
+
+    def _check_group(self, texts: list) -> list:
+        """
+        Concatène les textes, fait un seul appel puis redistribue les matches selon leur offset.
+        Un match qui déborde sur le séparateur (réponse suivante) est ignoré.
+        """
+        bounds, cursor = [], 0
+        for text in texts:
+            bounds.append((cursor, cursor + len(text)))
+            cursor += len(text) + len(TEXT_SEPARATOR)
+
+        results = [[] for _ in texts]
+        for match in self._post_check(TEXT_SEPARATOR.join(texts)).get('matches', []):
+            for i, (start, end) in enumerate(bounds):
+                if start <= match['offset'] < end:
+                    if match['offset'] + match['length'] <= end:
+                        results[i].append(_format_match(match, texts[i], start))
+                    break
+        return results
+
+    def _groups(self, texts: list):
+        group, size = [], 0
+        for text in texts:
+            if group and size + len(text) > self.max_request_chars:
+                yield group
+                group, size = [], 0
+            group.append(text)
+            size += len(text) + len(TEXT_SEPARATOR)
+        if group:
+            yield group
+
+    def check_many(self, texts: list) -> list:
+        """
+        Liste des erreurs de chaque texte, dans l'ordre. Les doublons ne sont envoyés qu'une fois,
+        regroupés en requêtes d'au plus max_request_chars caractères.
+        """
+        unique_texts = list(OrderedDict.fromkeys(texts))
+        errors_by_text = {}
+        for group in self._groups(unique_texts):
+            errors_by_text.update(zip(group, self._check_group(group)))
+        return [[dict(error) for error in errors_by_text[text]] for text in texts]
+
+    def check(self, text: str) -> list:
+        return self.check_many([text])[0]
+
+    def close(self):
+        self.session.close()
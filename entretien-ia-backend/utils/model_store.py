@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+
+MODELS_DIR = os.getenv('MODELS_DIR') or os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'models'))
+MANIFEST_FILENAME = 'manifest.json'
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class ModelStoreError(Exception):
+    """Modèle absent ou corrompu dans le magasin local alors que le mode hors ligne est actif."""
+
+
+def is_offline() -> bool:
+    return os.getenv('MODELS_OFFLINE', 'False').lower() in ['true', 'on', '1']
+
+
+def manifest_path() -> str:
+    return os.path.join(MODELS_DIR, MANIFEST_FILENAME)
+
+
+def load_manifest() -> dict:
+    with open(manifest_path(), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict):
+    with open(manifest_path(), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+def _entry(name: str) -> dict:
+    try:
+        return load_manifest()['models'].get(name)
+    except (OSError, ValueError):
+        return None
+
+
+def local_path(name: str) -> str:
+    entry = _entry(name)
+    return os.path.join(MODELS_DIR, entry['path']) if entry else None
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compute_file_index(model_dir: str) -> dict:
+    """
+    {chemin relatif: {"size": octets, "sha256": empreinte}} pour tous les fichiers d'un modèle.
+    """
+    index = {}
+    for root, _, filenames in os.walk(model_dir):
+        for filename in sorted(filenames):
+            file_path = os.path.join(root, filename)
+            relative_path = os.path.relpath(file_path, model_dir).replace(os.sep, '/')
+            if relative_path.startswith('.git/') or '/.cache/' in f"/{relative_path}":
+                continue
+            index[relative_path] = {"size": os.path.getsize(file_path), "sha256": file_sha256(file_path)}
+    return index
+
+
+def verify(name: str, full_checksum: bool = False) -> list:
+    """
+    Liste des problèmes du modèle `name` dans le magasin (vide si tout est conforme).
+    Par défaut seules la présence et la taille des fichiers du manifeste sont contrôlées ;
+    `full_checksum` recalcule les sha256 (lent sur les gros modèles).
+    """
+    entry = _entry(name)
+    if entry is None:
+        return [f"'{name}' absent du manifeste"]
+    model_dir = os.path.join(MODELS_DIR, entry['path'])
+    if not os.path.isdir(model_dir):
+        return [f"répertoire manquant : {model_dir}"]
+
+    problems = []
+    for relative_path, expected in entry.get('files', {}).items():
+        file_path = os.path.join(model_dir, relative_path)
+        if not os.path.exists(file_path):
+            problems.append(f"fichier manquant : {relative_path}")
+        elif os.path.getsize(file_path) != expected['size']:
+            problems.append(f"taille inattendue : {relative_path}")
+        elif full_checksum and file_sha256(file_path) != expected['sha256']:
+            problems.append(f"checksum invalide : {relative_path}")
+    return problems
+
+
+def resolve(name: str, fallback: str) -> str:
+    """
+    Chemin local du modèle `name` s'il est présent dans le magasin, sinon `fallback`
+    (nom sur le hub, comportement historique). En mode hors ligne (MODELS_OFFLINE),
+    un modèle absent lève ModelStoreError au lieu de déclencher un téléchargement.
+    """
+    path = local_path(name)
+    if path and os.path.isdir(path):
+        return path
+    if is_offline():
+        raise ModelStoreError(f"Modèle '{name}' introuvable dans {MODELS_DIR} (mode hors ligne). "
+                              f"Lancez 'scripts/prefetch_models.py'.")
+    return fallback
+
+
+def ensure_available(names: list = None, full_checksum: bool = False) -> dict:
+    """
+    Contrôle au démarrage : retourne {nom: problèmes}. En mode hors ligne, lève ModelStoreError
+    dès qu'un modèle manque, pour que le worker échoue immédiatement plutôt qu'à la première tâche.
+    Active aussi les variables hors ligne de Hugging Face pour bloquer toute résolution réseau.
+    """
+    names = names or list(load_manifest()['models'])
+    report = {name: verify(name, full_checksum=full_checksum) for name in names}
+    broken = {name: problems for name, problems in report.items() if problems}
+
+    if is_offline():
+        os.environ.setdefault('HF_HUB_OFFLINE', '1')
+        os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+        if broken:
+            details = "; ".join(f"{name} ({', '.join(problems)})" for name, problems in broken.items())
+            raise ModelStoreError(f"Magasin de modèles incomplet : {details}")
+    for name, problems in broken.items():
+        print(f"AVERTISSEMENT: Modèle '{name}' non disponible localement ({', '.join(problems)}). Résolution via le hub.")
+    return report
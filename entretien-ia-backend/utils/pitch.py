@@ -0,0 +1,89 @@
+import numpy as np
+
+# Blocs de trames traités ensemble : borne la mémoire des FFT sur les longs entretiens
+BLOCK_FRAMES = 512
+
+
+def yin_f0(y: np.ndarray, sr: int, fmin: float = 75.0, fmax: float = 400.0, frame_length: int = 1024,
+           hop_length: int = 256, threshold: float = 0.15, silence_db: float = -50.0) -> np.ndarray:
+    """
+    Estimation de la fréquence fondamentale par YIN, vectorisée avec NumPy : la fonction de différence
+    de toutes les trames d'un bloc est obtenue par autocorrélation FFT et sommes cumulées d'énergie.
+    Retourne f0 (Hz) par trame de `hop_length` échantillons, 0 pour les trames non voisées ou silencieuses.
+    """
+    y = np.asarray(y, dtype=np.float32)
+    if len(y) < frame_length:
+        return np.zeros(0)
+
+    win_length = frame_length // 2
+    tau_min = max(1, int(np.floor(sr / fmax)))
+    tau_max = min(frame_length - win_length, int(np.ceil(sr / fmin)))
+    n_fft = 1 << int(np.ceil(np.log2(frame_length + win_length)))
+    taus = np.arange(tau_max + 1)
+
+    frames = np.lib.stride_tricks.sliding_window_view(y, frame_length)[::hop_length]
+    f0 = np.zeros(len(frames))
+
+    for block_start in range(0, len(frames), BLOCK_FRAMES):
+        block = frames[block_start:block_start + BLOCK_FRAMES].astype(np.float64)
+        rows = np.arange(len(block))
+
+        # r(tau) = somme_{j < W} x_j * x_{j+tau}, pour tous les tau en une FFT
+        spectrum = np.fft.rfft(block, n_fft)
+        head_spectrum = np.fft.rfft(block[:, :win_length], n_fft)
+        autocorrelation = np.fft.irfft(spectrum * np.conj(head_spectrum), n_fft)[:, :tau_max + 1]
+
+        # d(tau) = E(0) + E(tau) - 2 r(tau), les énergies glissantes venant d'une somme cumulée
+        cumulative_energy = np.zeros((len(block), frame_length + 1))
+        np.cumsum(block ** 2, axis=1, out=cumulative_energy[:, 1:])
+        energy_tau = cumulative_energy[:, taus + win_length] - cumulative_energy[:, taus]
+        difference = np.maximum(cumulative_energy[:, [win_length]] + energy_tau - 2 * autocorrelation, 0)
+
+        # Différence moyenne cumulée normalisée d'(tau)
+        normalized = np.ones_like(difference)
+        running_sum = np.cumsum(difference[:, 1:], axis=1)
+        normalized[:, 1:] = difference[:, 1:] * taus[1:] / np.maximum(running_sum, 1e-12)
+
+        # Premier minimum local sous le seuil dans [tau_min, tau_max[
+        search = normalized[:, tau_min:tau_max]
+        is_trough = (search[:, 1:-1] < search[:, :-2]) & (search[:, 1:-1] <= search[:, 2:]) & (search[:, 1:-1] < threshold)
+        has_pitch = is_trough.any(axis=1)
+        tau = is_trough.argmax(axis=1) + tau_min + 1
+
+        # Interpolation parabolique autour du minimum
+        before, center, after = normalized[rows, tau - 1], normalized[rows, tau], normalized[rows, tau + 1]
+        curvature = before - 2 * center + after
+        shift = np.divide(0.5 * (before - after), curvature, out=np.zeros_like(curvature), where=np.abs(curvature) > 1e-12)
+        period = tau + np.clip(shift, -1, 1)
+
+        level_db = 10 * np.log10(np.mean(block ** 2, axis=1) + 1e-12)
+        voiced = has_pitch & (level_db > silence_db)
+        f0[block_start:block_start + len(block)] = np.where(voiced, sr / period, 0.0)
+
+    return f0
+
+
+class PitchTrack:
+    """
+    Courbe de f0 calculée une seule fois sur tout l'enregistrement.
+    Les statistiques par question sont tirées de tranches de ce tableau.
+    """
+    def __init__(self, f0: np.ndarray, sample_rate: int, hop_length: int):
+        self.f0 = np.asarray(f0)
+        self.sample_rate = sample_rate
+        self.hop_length = hop_length
+
+    def window(self, start_time: float, end_time: float = None) -> 'PitchTrack':
+        frames_per_second = self.sample_rate / self.hop_length
+        start_frame = max(0, int(round(start_time * frames_per_second)))
+        end_frame = len(self.f0) if end_time is None else int(round(end_time * frames_per_second))
+        return PitchTrack(self.f0[start_frame:end_frame].copy(), self.sample_rate, self.hop_length)
+
+    def stats(self) -> tuple:
+        """
+        (moyenne, écart-type) de f0 sur les trames voisées, (0.0, 0.0) s'il n'y en a aucune.
+        """
+        voiced = self.f0[self.f0 > 0]
+        if not len(voiced):
+            return 0.0, 0.0
+        return float(np.mean(voiced)), float(np.std(voiced))
@@ -0,0 +1,89 @@
+import numpy as np
+
+# Taille de fenêtre attendue par Silero-VAD à 16 kHz
+WINDOW_SIZE_SAMPLES = 512
+
+
+def batched_speech_probabilities(model, samples, sampling_rate: int = 16000, max_streams: int = 64,
+                                 min_windows_per_stream: int = 200) -> np.ndarray:
+    """
+    Probabilités de parole Silero par fenêtre de 512 échantillons, calculées par lots :
+    l'audio est découpé en B flux contigus traités en parallèle (une ligne du lot par flux,
+    état récurrent propre à chaque flux via reset_states(B)). Chaque flux garde au moins
+    `min_windows_per_stream` fenêtres pour que l'état ait le temps de se stabiliser.
+    Retourne un tableau (n_fenêtres,) dans l'ordre chronologique.
+    """
+    import torch
+
+    samples = torch.as_tensor(samples, dtype=torch.float32).reshape(-1)
+    n_windows = int(np.ceil(len(samples) / WINDOW_SIZE_SAMPLES))
+    if n_windows == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    n_streams = int(max(1, min(max_streams, n_windows // min_windows_per_stream)))
+    steps = int(np.ceil(n_windows / n_streams))
+    padded = torch.zeros(n_streams * steps * WINDOW_SIZE_SAMPLES)
+    padded[:len(samples)] = samples
+    streams = padded.reshape(n_streams, steps, WINDOW_SIZE_SAMPLES)
+
+    probabilities = np.empty((n_streams, steps), dtype=np.float32)
+    with torch.inference_mode():
+        model.reset_states(n_streams)
+        for step in range(steps):
+            probabilities[:, step] = model(streams[:, step], sampling_rate).reshape(-1).numpy()
+        model.reset_states()
+
+    return probabilities.reshape(-1)[:n_windows]
+
+
+def probabilities_to_segments(probabilities: np.ndarray, sampling_rate: int = 16000, threshold: float = 0.5,
+                              neg_threshold: float = None, min_speech_duration_ms: int = 250,
+                              min_silence_duration_ms: int = 100, speech_pad_ms: int = 30,
+                              window_size_samples: int = WINDOW_SIZE_SAMPLES, total_samples: int = None) -> np.ndarray:
+    """
+    Conversion vectorisée des probabilités en intervalles de parole (n, 2) en échantillons, avec les
+    mêmes règles que get_speech_timestamps : hystérésis (entrée au-dessus de `threshold`, sortie
+    sous `neg_threshold`), fusion des silences trop courts, suppression des paroles trop courtes, marge.
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float32)
+    if neg_threshold is None:
+        neg_threshold = max(threshold - 0.15, 0.01)
+    if total_samples is None:
+        total_samples = len(probabilities) * window_size_samples
+    empty = np.zeros((0, 2), dtype=np.int64)
+    if not len(probabilities):
+        return empty
+
+    # Hystérésis : chaque fenêtre hérite du dernier événement franc (+1 entrée, -1 sortie)
+    events = np.where(probabilities >= threshold, 1, np.where(probabilities < neg_threshold, -1, 0))
+    last_event_index = np.maximum.accumulate(np.where(events != 0, np.arange(len(events)), -1))
+    is_speech = (last_event_index >= 0) & (events[np.maximum(last_event_index, 0)] == 1)
+
+    edges = np.diff(np.concatenate(([0], is_speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1) * window_size_samples
+    ends = np.minimum(np.flatnonzero(edges == -1) * window_size_samples, total_samples)
+    if not len(starts):
+        return empty
+
+    # Fusion des silences plus courts que min_silence_duration_ms
+    min_silence_samples = sampling_rate * min_silence_duration_ms / 1000
+    keep_gap = (starts[1:] - ends[:-1]) >= min_silence_samples
+    starts = starts[np.concatenate(([True], keep_gap))]
+    ends = ends[np.concatenate((keep_gap, [True]))]
+
+    # Suppression des paroles plus courtes que min_speech_duration_ms
+    long_enough = (ends - starts) >= sampling_rate * min_speech_duration_ms / 1000
+    starts, ends = starts[long_enough], ends[long_enough]
+    if not len(starts):
+        return empty
+
+    # Marge autour de chaque segment, sans chevauchement entre segments voisins
+    pad = int(sampling_rate * speech_pad_ms / 1000)
+    starts = np.maximum(starts - pad, 0)
+    ends = np.minimum(ends + pad, total_samples)
+    overlap = starts[1:] < ends[:-1]
+    middle = (starts[1:] + ends[:-1]) // 2
+    starts[1:] = np.where(overlap, middle, starts[1:])
+    ends[:-1] = np.where(overlap, middle, ends[:-1])
+
+    return np.stack((starts, ends), axis=1).astype(np.int64)
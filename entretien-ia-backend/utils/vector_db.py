@@ -0,0 +1,44 @@
+import datetime
+import hashlib
+import json
+import os
+
+VERSION_FILENAME = 'version.json'
+INDEX_FILENAMES = ('index.faiss', 'index.pkl')
+
+
+def compute_vector_db_version(vector_db_path: str) -> str:
+    """
+    Empreinte du contenu de l'index FAISS : change à chaque reconstruction de la base.
+    """
+    digest = hashlib.sha256()
+    for filename in INDEX_FILENAMES:
+        file_path = os.path.join(vector_db_path, filename)
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def write_vector_db_version(vector_db_path: str) -> str:
+    version = compute_vector_db_version(vector_db_path)
+    with open(os.path.join(vector_db_path, VERSION_FILENAME), 'w', encoding='utf-8') as f:
+        json.dump({"version": version, "created_at": datetime.datetime.now().isoformat(timespec='seconds')}, f)
+    return version
+
+
+def read_vector_db_version(vector_db_path: str) -> str:
+    """
+    Lit la version écrite par scripts/create_vector_db.py, ou la recalcule si le fichier est absent.
+    Retourne None si la base vectorielle n'existe pas.
+    """
+    if not os.path.exists(vector_db_path):
+        return None
+    version_path = os.path.join(vector_db_path, VERSION_FILENAME)
+    try:
+        with open(version_path, 'r', encoding='utf-8') as f:
+            return json.load(f)['version']
+    except (OSError, ValueError, KeyError):
+        return compute_vector_db_version(vector_db_path)
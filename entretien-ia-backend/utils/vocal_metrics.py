@@ -0,0 +1,84 @@
+import numpy as np
+
+# Fonctions sans modèle (NumPy seul) : appelables depuis un processus enfant sans charger Silero-VAD
+
+
+def default_vocal_metrics() -> dict:
+    return {
+        "speech_rate": 0.0, "pause_count": 0, "average_pause_duration": 0.0,
+        "pitch_mean": 0.0, "pitch_std": 0.0, "fluency_score": 0.0
+    }
+
+
+def fluency_score(speech_duration, total_duration, pause_count, avg_pause_duration):
+    if total_duration == 0: return 0
+    speech_ratio_score = (speech_duration / total_duration) * 100
+    pause_count_penalty = min(25, pause_count * 1.5)
+    pause_duration_penalty = min(25, avg_pause_duration * 5)
+    final_score = max(0, speech_ratio_score - pause_count_penalty - pause_duration_penalty)
+    return final_score
+
+
+def piptrack_stats(samples: np.ndarray, sample_rate: int) -> tuple:
+    """
+    (moyenne, écart-type) du pitch par librosa.piptrack : comportement historique du moteur 'piptrack'.
+    """
+    import librosa
+    pitches, _ = librosa.piptrack(y=np.asarray(samples, dtype=np.float32), sr=sample_rate, fmin=75, fmax=400)
+    valid_pitches = pitches[pitches > 0]
+    pitch_mean = np.mean(valid_pitches) if len(valid_pitches) > 0 else 0.0
+    pitch_std = np.std(valid_pitches) if len(valid_pitches) > 0 else 0.0
+    return pitch_mean, pitch_std
+
+
+def vocal_metrics(speech_intervals: np.ndarray, start_sample: int, end_sample: int, transcription_chunk: str,
+                  sample_rate: int, pause_threshold: float = 0.5, pitch_track=None, audio_chunk: np.ndarray = None) -> dict:
+    """
+    Métriques vocales de la fenêtre [start_sample, end_sample[ par arithmétique d'intervalles :
+    les intervalles de parole de la passe VAD globale sont rognés à la fenêtre, sans nouvelle inférence.
+    Le pitch vient de `pitch_track` (tranche de la courbe globale) ou, avec le moteur 'piptrack',
+    du signal `audio_chunk` de la fenêtre.
+    """
+    try:
+        # === ÉTAPE 1 : OBTENIR LES DURÉES ===
+        total_duration_seconds = (end_sample - start_sample) / sample_rate
+        if total_duration_seconds < 1.0: return default_vocal_metrics()
+
+        # === ÉTAPE 2 : INTERVALLES DE PAROLE DANS LA FENÊTRE ===
+        intervals = np.clip(np.asarray(speech_intervals, dtype=np.int64).reshape(-1, 2), start_sample, end_sample)
+        intervals = intervals[intervals[:, 1] > intervals[:, 0]]
+        if not len(intervals): return default_vocal_metrics()
+
+        # === ÉTAPE 3 : CALCUL DES MÉTRIQUES SUR LA FENÊTRE ===
+        word_count = len(transcription_chunk.strip().split())
+        speech_duration_seconds = np.sum(intervals[:, 1] - intervals[:, 0]) / sample_rate
+        if speech_duration_seconds < 0.5: return default_vocal_metrics()
+
+        speech_rate = word_count / (speech_duration_seconds / 60)
+
+        gaps = (intervals[1:, 0] - intervals[:-1, 1]) / sample_rate
+        pauses = gaps[gaps > pause_threshold]
+
+        pause_count = len(pauses)
+        average_pause_duration = np.mean(pauses) if pause_count else 0.0
+
+        if pitch_track is not None:
+            pitch_mean, pitch_std = pitch_track.stats()
+        elif audio_chunk is not None:
+            pitch_mean, pitch_std = piptrack_stats(audio_chunk, sample_rate)
+        else:
+            pitch_mean, pitch_std = 0.0, 0.0
+
+        score = fluency_score(speech_duration_seconds, total_duration_seconds, pause_count, average_pause_duration)
+
+        return {
+            "speech_rate": float(round(speech_rate, 2)),
+            "pause_count": int(pause_count),
+            "average_pause_duration": float(round(average_pause_duration, 2)),
+            "pitch_mean": float(round(pitch_mean, 2)),
+            "pitch_std": float(round(pitch_std, 2)),
+            "fluency_score": float(round(score, 2))
+        }
+    except Exception as e:
+        print(f" ERREUR critique dans vocal_metrics : {e}")
+        return default_vocal_metrics()
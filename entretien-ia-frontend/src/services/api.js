@@ -65,6 +65,29 @@ export const uploadFileWithEvents = (sessionId, file, events) => {
 };
 
 
+/**
+ * Uploade l'enregistrement d'une seule question pendant l'entretien, pour qu'il soit analysé sans attendre la fin.
+ * @param {number} sessionId L'ID de la session.
+ * @param {File} file L'enregistrement autonome de la question.
+ * @param {number} questionId L'ID de la question.
+ * @param {number} questionIndex La position de la question dans le tableau des événements.
+ * @param {number} timestamp Le début de la question dans l'enregistrement complet (secondes).
+ */
+export const uploadQuestionSegment = (sessionId, file, questionId, questionIndex, timestamp) => {
+  const formData = new FormData();
+  formData.append('file', file);
+  formData.append('question_id', questionId);
+  formData.append('question_index', questionIndex);
+  formData.append('timestamp', timestamp);
+
+  return apiClient.post(`/upload/${sessionId}/segment`, formData, {
+    headers: {
+      'Content-Type': 'multipart/form-data',
+    },
+  });
+};
+
+
 export const getMySessions = () => {
   return apiClient.get('/sessions/me');
 };